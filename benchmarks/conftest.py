@@ -0,0 +1,235 @@
+"""Shared fixtures for the Connee Alarm scale benchmarks.
+
+Synthetic hubs are generated from the DEVICE_TYPE_MAP catalog and served to a
+real ConneeAlarmApiClient through an in-memory session, so the measured code
+paths are the ones running in Home Assistant (minus the network).
+"""
+import asyncio
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant import config_entries  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.ajax.api import ConneeAlarmApiClient  # noqa: E402
+from custom_components.ajax.const import (  # noqa: E402
+    BATTERY_DEVICES,
+    DEVICE_CLASS_MAP,
+    DEVICE_TYPE_MAP,
+    TEMPERATURE_DEVICES,
+)
+from custom_components.ajax.coordinator import ConneeAlarmDataCoordinator  # noqa: E402
+from custom_components.ajax.metadata import ConneeAlarmMetadataCoordinator  # noqa: E402
+
+HUB_SIZES = (10, 100, 1000)
+HUB_ID = "0000BE4C"
+
+
+def _device_state(rng: random.Random, device_id: str, device_type: str) -> dict:
+    """Return a realistic state payload for a catalog device type."""
+    state = {
+        "deviceId": device_id,
+        "online": rng.random() > 0.02,
+        "signalLevel": rng.choice(("STRONG", "NORMAL", "WEAK")),
+        "firmwareVersion": f"5.{rng.randint(50, 60)}.0.{rng.randint(0, 9)}",
+        "tampered": False,
+    }
+    platform = DEVICE_TYPE_MAP[device_type]
+    device_class = DEVICE_CLASS_MAP.get(device_type)
+
+    if device_class == "door":
+        state["reedClosed"] = rng.random() > 0.1
+    elif device_class == "motion":
+        state["state"] = "ALARM" if rng.random() < 0.05 else "PASSIVE"
+    elif device_class == "moisture":
+        state["leakDetected"] = rng.random() < 0.02
+    elif device_class in ("smoke", "heat"):
+        state["smokeAlarmDetected"] = False
+        state["temperatureAlarmDetected"] = False
+    elif platform == "valve":
+        state["valveState"] = rng.choice(("OPEN", "CLOSED"))
+        state["motorState"] = "STOPPED"
+        state["extPower"] = True
+    elif platform == "switch":
+        state["switchState"] = rng.choice(("ON", "OFF"))
+        state["power"] = rng.randint(0, 2000)
+
+    if device_type in BATTERY_DEVICES:
+        state["batteryChargeLevelPercentage"] = rng.randint(5, 100)
+    if device_type in TEMPERATURE_DEVICES:
+        state["temperature"] = round(rng.uniform(15, 28), 1)
+    return state
+
+
+def make_hub(size: int) -> dict:
+    """Generate a synthetic hub with `size` devices cycling through the catalog."""
+    rng = random.Random(size)
+    device_types = sorted(
+        dtype for dtype, platform in DEVICE_TYPE_MAP.items() if platform != "alarm_control_panel"
+    )
+    devices = []
+    states = []
+    for index in range(size):
+        device_type = device_types[index % len(device_types)]
+        device_id = f"{index + 1:08X}"
+        devices.append({
+            "id": device_id,
+            "deviceName": f"{device_type} {index + 1}",
+            "deviceType": device_type,
+            "roomId": f"room-{index % 12}",
+            "roomName": f"Bench Room {index % 12}",
+        })
+        states.append(_device_state(rng, device_id, device_type))
+
+    hub_state = {
+        "id": HUB_ID,
+        "name": "Bench Hub",
+        "model": "Hub 2 Plus",
+        "address": {"street": "Via Bench", "houseNumber": "1", "city": "Benchville", "zipCode": "00100"},
+        "armState": "DISARMED",
+        "firmware": {"version": "2.30.1"},
+    }
+    return {"hub_state": hub_state, "devices": devices, "device_states": states}
+
+
+class _FakeResponse:
+    """Minimal aiohttp response stand-in (the client decodes the body on every call)."""
+
+    def __init__(self, body: bytes):
+        self.status = 200
+        self.content_length = len(body)
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _encode(payload) -> bytes:
+    """Encode a successful gateway response."""
+    return json.dumps({"success": True, "data": payload}).encode()
+
+
+class FakeGatewaySession:
+    """In-memory gateway answering the actions used by a poll cycle."""
+
+    def __init__(self, hub: dict):
+        data = {
+            "login": {"sessionToken": "bench-token", "userId": "bench-user"},
+            "get-user-hubs": [{"hubId": HUB_ID, "name": "Bench Hub"}],
+            "get-hub": hub["hub_state"],
+            "get-hub-devices": hub["devices"],
+            "get-all-device-states": hub["device_states"],
+        }
+        self._bodies = {
+            action: _encode(payload) for action, payload in data.items()
+        }
+        self._states = hub["device_states"]
+        # Projected get-all-device-states bodies, by requested field tuple
+        self._projected: dict = {}
+
+    def request(self, method, url, json=None, headers=None, timeout=None):
+        action = url.rsplit("action=", 1)[-1]
+        fields = (json or {}).get("fields")
+        if action == "get-all-device-states" and fields is not None:
+            key = tuple(fields)
+            if key not in self._projected:
+                wanted = set(fields)
+                self._projected[key] = _encode([
+                    {k: v for k, v in state.items() if k in wanted} for state in self._states
+                ])
+            return _FakeResponse(self._projected[key])
+        return _FakeResponse(self._bodies[action])
+
+
+def trace_memory(func) -> dict:
+    """Run `func` under tracemalloc and return peak/retained KiB.
+
+    The return value of `func` is kept alive until after the snapshot, so
+    "retained" is the memory the result holds on to (e.g. coordinator data
+    plus entity objects).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_kib": round(peak / 1024, 1), "retained_kib": round(retained / 1024, 1)}
+
+
+@pytest.fixture(scope="module")
+def event_loop_hass(tmp_path_factory):
+    """Event loop plus a bare HomeAssistant instance bound to it."""
+    loop = asyncio.new_event_loop()
+
+    async def _make_hass():
+        return HomeAssistant(str(tmp_path_factory.mktemp("config")))
+
+    hass = loop.run_until_complete(_make_hass())
+    yield loop, hass
+    loop.close()
+
+
+@pytest.fixture
+def make_coordinator(event_loop_hass):
+    """Factory returning a coordinator wired to a synthetic hub of the given size."""
+    loop, hass = event_loop_hass
+
+    def _factory(size: int) -> ConneeAlarmDataCoordinator:
+        entry = SimpleNamespace(
+            entry_id=f"bench_{size}",
+            title="Bench",
+            domain="ajax",
+            data={},
+            options={},
+            async_on_unload=lambda func: None,
+        )
+        api = ConneeAlarmApiClient(
+            session=FakeGatewaySession(make_hub(size)),
+            email="bench@example.com",
+            password="bench",
+            device_id="bench-device-id",
+        )
+        api.hub_id = HUB_ID
+        token = config_entries.current_entry.set(entry)
+        try:
+            coordinator = ConneeAlarmDataCoordinator(hass, api, HUB_ID)
+        finally:
+            config_entries.current_entry.reset(token)
+        return coordinator
+
+    return _factory
+
+
+def make_metadata(coordinator: ConneeAlarmDataCoordinator) -> ConneeAlarmMetadataCoordinator:
+    """Return a metadata coordinator seeded from the data coordinator, as setup does."""
+    token = config_entries.current_entry.set(coordinator.config_entry)
+    try:
+        metadata = ConneeAlarmMetadataCoordinator(coordinator.hass, coordinator)
+    finally:
+        config_entries.current_entry.reset(token)
+    metadata.async_seed()
+    return metadata
+
+
+def run(loop: asyncio.AbstractEventLoop, coro):
+    """Run a coroutine to completion on the benchmark loop."""
+    return loop.run_until_complete(coro)
@@ -0,0 +1,8 @@
+"""Device catalog: the maps the synthetic hubs (and the platforms) are built from."""
+from custom_components.ajax.const import validate_device_catalog
+
+
+def test_device_catalog_consistent():
+    """DEVICE_TYPE_MAP, DEVICE_CLASS_MAP and the battery/temperature sets agree."""
+    issues = validate_device_catalog()
+    assert not issues, issues
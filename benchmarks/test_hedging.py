@@ -0,0 +1,78 @@
+"""Hedging benchmarks: p99 latency of gateway reads with a long-tailed gateway."""
+import asyncio
+import random
+
+from custom_components.ajax.api import ConneeAlarmApiClient
+from custom_components.ajax.const import HEDGE_MAX_RATIO
+from custom_components.ajax.hedging import ReadHedger
+
+from .conftest import HUB_ID, FakeGatewaySession, make_hub, run
+
+READS = 400
+FAST_SECONDS = 0.001
+SLOW_SECONDS = 0.1  # the tail: SLOW_SHARE of the requests take this long
+SLOW_SHARE = 0.02
+
+
+class _DelayedResponse:
+    """Wraps a fake response with a gateway-side delay."""
+
+    def __init__(self, response, seconds: float):
+        self._response = response
+        self._seconds = seconds
+
+    async def __aenter__(self):
+        await asyncio.sleep(self._seconds)
+        return await self._response.__aenter__()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class LongTailSession(FakeGatewaySession):
+    """Fake gateway whose latency has a long tail."""
+
+    def __init__(self, hub: dict):
+        super().__init__(hub)
+        self._rng = random.Random(0)
+
+    def request(self, method, url, json=None, headers=None, timeout=None):
+        delay = SLOW_SECONDS if self._rng.random() < SLOW_SHARE else FAST_SECONDS
+        return _DelayedResponse(super().request(method, url, json, headers, timeout), delay)
+
+
+async def _read_latencies(hedged: bool) -> tuple[list, int]:
+    """Return the sorted get-hub latencies and the number of hedges sent."""
+    loop = asyncio.get_running_loop()
+    api = ConneeAlarmApiClient(
+        session=LongTailSession(make_hub(10)),
+        email="bench@example.com",
+        password="bench",
+        device_id="bench-device-id",
+    )
+    api.user_id = "bench-user"
+    if hedged:
+        # The benchmark gateway is 500x faster than the real one: scale the floor down
+        api.hedger = ReadHedger(api.metrics, min_delay=FAST_SECONDS)
+    latencies = []
+    for _ in range(READS):
+        start = loop.time()
+        await api.get_hub_state(HUB_ID)
+        latencies.append(loop.time() - start)
+    return sorted(latencies), sum(api.metrics.hedges.values())
+
+
+def test_hedged_read_p99(benchmark, event_loop_hass):
+    """Hedged reads cut the p99 latency for at most HEDGE_MAX_RATIO extra requests."""
+    loop, _hass = event_loop_hass
+    plain, _hedges = run(loop, _read_latencies(False))
+    results = []
+    benchmark.pedantic(lambda: results.append(run(loop, _read_latencies(True))), rounds=1, iterations=1)
+    hedged, hedges = results[-1]
+
+    p99 = int(0.99 * (READS - 1))
+    benchmark.extra_info["p99_ms"] = round(plain[p99] * 1000, 1)
+    benchmark.extra_info["hedged_p99_ms"] = round(hedged[p99] * 1000, 1)
+    benchmark.extra_info["hedges"] = hedges
+    assert hedged[p99] < plain[p99] / 2
+    assert hedges <= READS * HEDGE_MAX_RATIO + 2
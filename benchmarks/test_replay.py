@@ -0,0 +1,104 @@
+"""Replay benchmarks: poll cycles driven by captured gateway traffic.
+
+A synthetic hub is captured through the real client (as the ajax.capture service
+does), written to a capture file and replayed with no delay. Setting
+AJAX_REPLAY_FILE to a capture taken on a customer installation replays that
+instead:
+    AJAX_REPLAY_FILE=ajax_capture_20250101_120000.jsonl.gz pytest benchmarks -k replay
+"""
+import gzip
+import os
+
+import pytest
+
+from custom_components.ajax.replay import REDACTED, ReplaySession, TrafficCapture, load_capture
+
+from .conftest import HUB_SIZES, make_hub, run
+
+CAPTURED_CYCLES = 2
+
+
+def _capture_hub(loop, coordinator, path) -> list:
+    """Capture a few poll cycles of a coordinator and return the reloaded records."""
+    coordinator.api.capture = TrafficCapture()
+    for _ in range(CAPTURED_CYCLES):
+        coordinator.data = run(loop, coordinator._async_update_data())
+    coordinator.api.capture.write(str(path))
+    coordinator.api.capture = None
+    return load_capture(str(path))
+
+
+def _captured_hub_id(records: list) -> str:
+    """Return the hub polled in a capture."""
+    for record in records:
+        hub_id = record["request"].get("hubId")
+        if hub_id:
+            return hub_id
+    pytest.fail("No hub request in the capture")
+
+
+def test_capture_redacts_personal_data(event_loop_hass, make_coordinator, tmp_path):
+    """No name, address or credential of the captured hub is written to the file."""
+    loop, _hass = event_loop_hass
+    size = 100
+    coordinator = make_coordinator(size)
+    path = tmp_path / "capture.jsonl.gz"
+    records = _capture_hub(loop, coordinator, path)
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        text = file.read()
+
+    hub = make_hub(size)
+    address = hub["hub_state"]["address"]
+    private = {
+        coordinator.api.email,
+        coordinator.api.password,
+        coordinator.api.session_token,
+        coordinator.api.user_id,
+        hub["hub_state"]["name"],
+        *address.values(),
+        *(device["deviceName"] for device in hub["devices"]),
+        *(device["roomName"] for device in hub["devices"]),
+    }
+    leaked = sorted(value for value in private if value and f'"{value}"' in text)
+    assert not leaked, leaked
+
+    # Pseudonyms are stable within the capture: one per distinct room name
+    rooms = {
+        device["roomName"]
+        for record in records
+        if record["action"] == "get-hub-devices"
+        for device in record["response"]["data"]
+    }
+    assert len(rooms) == len({device["roomName"] for device in hub["devices"]})
+
+
+@pytest.mark.parametrize("size", HUB_SIZES)
+def test_replay_update_data(benchmark, event_loop_hass, make_coordinator, tmp_path, size):
+    """_async_update_data served from a capture of a synthetic hub."""
+    loop, _hass = event_loop_hass
+    coordinator = make_coordinator(size)
+    records = _capture_hub(loop, coordinator, tmp_path / "capture.jsonl.gz")
+    assert all(record["request"].get("sessionToken") in (None, REDACTED) for record in records)
+
+    coordinator.api.session = ReplaySession(records, time_scale=0)
+    benchmark.extra_info["devices"] = size
+    benchmark.extra_info["captured_calls"] = len(records)
+
+    benchmark(lambda: run(loop, coordinator._async_update_data()))
+    assert len(coordinator.state_store.states()) == size
+
+
+@pytest.mark.skipif(not os.environ.get("AJAX_REPLAY_FILE"), reason="AJAX_REPLAY_FILE not set")
+def test_replay_customer_capture(benchmark, event_loop_hass, make_coordinator):
+    """_async_update_data served from a customer capture (AJAX_REPLAY_FILE)."""
+    loop, _hass = event_loop_hass
+    records = load_capture(os.environ["AJAX_REPLAY_FILE"])
+    coordinator = make_coordinator(0)
+    coordinator.hub_id = coordinator.api.hub_id = _captured_hub_id(records)
+    coordinator.api.session = ReplaySession(records, time_scale=0)
+    coordinator.data = run(loop, coordinator._async_update_data())
+
+    benchmark.extra_info["captured_calls"] = len(records)
+    benchmark.extra_info["devices"] = len(coordinator.state_store)
+
+    benchmark(lambda: run(loop, coordinator._async_update_data()))
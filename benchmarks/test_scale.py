@@ -0,0 +1,134 @@
+"""Scale benchmarks: poll-cycle parse/merge and entity evaluation per hub size.
+
+Run with:
+    pytest benchmarks --benchmark-json=benchmarks/results.json
+"""
+import pytest
+
+from custom_components.ajax import alarm_control_panel, binary_sensor, sensor, switch, update, valve
+from custom_components.ajax.const import PLATFORM_STATE_FIELDS, state_projection
+from custom_components.ajax.timing import POLL_PHASES
+
+from .conftest import HUB_ID, HUB_SIZES, make_metadata, run, trace_memory
+
+# Properties HA reads on every state write
+EVALUATED_PROPERTIES = (
+    "native_value",
+    "is_on",
+    "is_closed",
+    "is_opening",
+    "is_closing",
+    "alarm_state",
+    "installed_version",
+    "latest_version",
+    "icon",
+    "extra_state_attributes",
+)
+
+
+def build_entities(coordinator) -> list:
+    """Create every entity the platforms would create for the coordinator data."""
+    api = coordinator.api
+    devices = coordinator.devices
+    entry = coordinator.config_entry
+    metadata = make_metadata(coordinator)
+    entities = [
+        alarm_control_panel.ConneeAlarmControlPanel(coordinator, api, HUB_ID),
+        sensor.ConneeAlarmConnectionSensor(coordinator, api, entry),
+        sensor.ConneeAlarmSensorCountSensor(coordinator, entry),
+        sensor.ConneeAlarmSensorOkSensor(coordinator, entry),
+        sensor.ConneeAlarmSensorAlarmSensor(coordinator, entry),
+        sensor.ConneeAlarmSensorOfflineSensor(coordinator, entry),
+        *(sensor.ConneeAlarmPollTimingSensor(coordinator, entry, phase) for phase in POLL_PHASES),
+        update.ConneeAlarmHubUpdate(metadata, coordinator.data["hub_state"], HUB_ID),
+    ]
+    entities.extend(binary_sensor._build_entities(coordinator, devices))
+    entities.extend(sensor._build_device_entities(coordinator, devices))
+    entities.extend(switch._build_entities(coordinator, devices, api))
+    entities.extend(valve._build_entities(coordinator, devices, api))
+    entities.extend(update._build_device_entities(metadata, devices))
+    return entities
+
+
+def evaluate(entities: list) -> int:
+    """Read every state property of every entity, as a state write would."""
+    reads = 0
+    for entity in entities:
+        for name in EVALUATED_PROPERTIES:
+            if hasattr(type(entity), name):
+                getattr(entity, name)
+                reads += 1
+    return reads
+
+
+@pytest.mark.parametrize("size", HUB_SIZES)
+def test_update_data(benchmark, event_loop_hass, make_coordinator, size):
+    """_async_update_data: gateway decode, state map build and merge."""
+    loop, _hass = event_loop_hass
+    coordinator = make_coordinator(size)
+    # First cycle logs in; keep it out of the measurement
+    coordinator.data = run(loop, coordinator._async_update_data())
+
+    benchmark.extra_info.update(
+        trace_memory(lambda: run(loop, coordinator._async_update_data()))
+    )
+    benchmark.extra_info["devices"] = size
+
+    coordinator.data = benchmark(lambda: run(loop, coordinator._async_update_data()))
+    assert len(coordinator.state_store.states()) == size
+
+
+@pytest.mark.parametrize("size", HUB_SIZES)
+def test_update_data_projected(benchmark, event_loop_hass, make_coordinator, size):
+    """_async_update_data polling only the hot state fields of every platform."""
+    loop, _hass = event_loop_hass
+    coordinator = make_coordinator(size)
+    coordinator.state_fields = state_projection(PLATFORM_STATE_FIELDS)
+    # First cycle logs in and fetches the full payload; keep it out of the measurement
+    coordinator.data = run(loop, coordinator._async_update_data())
+
+    benchmark.extra_info.update(
+        trace_memory(lambda: run(loop, coordinator._async_update_data()))
+    )
+    benchmark.extra_info["devices"] = size
+
+    coordinator.data = benchmark(lambda: run(loop, coordinator._async_update_data()))
+    assert len(coordinator.state_store.states()) == size
+    # Cold fields keep the value of the full fetch
+    assert all("signalLevel" in state for state in coordinator.state_store.states().values())
+
+
+@pytest.mark.parametrize("size", HUB_SIZES)
+def test_state_store(benchmark, event_loop_hass, make_coordinator, size):
+    """Memory held for the catalog and device states, and the on-demand dict view."""
+    loop, _hass = event_loop_hass
+    coordinator = make_coordinator(size)
+    coordinator.state_fields = state_projection(PLATFORM_STATE_FIELDS)
+
+    def _two_cycles():
+        # Full fetch, then a projected one merged in place
+        coordinator.data = run(loop, coordinator._async_update_data())
+        coordinator.data = run(loop, coordinator._async_update_data())
+        return coordinator
+
+    benchmark.extra_info.update(trace_memory(_two_cycles))
+    benchmark.extra_info["devices"] = size
+
+    states = benchmark(coordinator.state_store.states)
+    assert len(states) == size
+
+
+@pytest.mark.parametrize("size", HUB_SIZES)
+def test_entity_evaluation(benchmark, event_loop_hass, make_coordinator, size):
+    """Full property evaluation of every entity class."""
+    loop, _hass = event_loop_hass
+    coordinator = make_coordinator(size)
+    coordinator.data = run(loop, coordinator._async_update_data())
+
+    entities = build_entities(coordinator)
+    benchmark.extra_info.update(trace_memory(lambda: build_entities(coordinator)))
+    benchmark.extra_info["devices"] = size
+    benchmark.extra_info["entities"] = len(entities)
+
+    reads = benchmark(evaluate, entities)
+    assert reads >= len(entities)
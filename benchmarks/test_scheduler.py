@@ -0,0 +1,39 @@
+"""Scheduler benchmarks: how long a command waits for a slot while polls fill the gateway."""
+import asyncio
+
+import pytest
+
+from custom_components.ajax.const import GATEWAY_MAX_CONCURRENT, LANE_COMMAND, LANE_POLL
+from custom_components.ajax.scheduler import GatewayScheduler
+
+from .conftest import run
+
+POLL_SECONDS = 0.05  # gateway time of one poll request
+
+
+async def _command_wait(polls: int) -> float:
+    """Queue `polls` slow polls, then measure the slot wait of one command (seconds)."""
+    loop = asyncio.get_running_loop()
+    scheduler = GatewayScheduler()
+
+    async def _poll():
+        async with scheduler.slot(LANE_POLL):
+            await asyncio.sleep(POLL_SECONDS)
+
+    tasks = [loop.create_task(_poll()) for _ in range(polls)]
+    await asyncio.sleep(0)  # polls take their slots and queue
+    start = loop.time()
+    async with scheduler.slot(LANE_COMMAND):
+        waited = loop.time() - start
+    await asyncio.gather(*tasks)
+    return waited
+
+
+@pytest.mark.parametrize("polls", (GATEWAY_MAX_CONCURRENT, 4 * GATEWAY_MAX_CONCURRENT))
+def test_command_wait_under_poll_load(benchmark, event_loop_hass, polls):
+    """A command gets the reserved slot at once, however many polls are queued."""
+    loop, _hass = event_loop_hass
+    waits = []
+    benchmark.pedantic(lambda: waits.append(run(loop, _command_wait(polls))), rounds=3, iterations=1)
+    benchmark.extra_info["command_wait_ms"] = round(max(waits) * 1000, 2)
+    assert max(waits) < POLL_SECONDS / 2
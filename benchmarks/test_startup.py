@@ -0,0 +1,113 @@
+"""Startup benchmarks: integration import time and time-to-entities per hub size.
+
+Import time is measured with `python -X importtime` in a fresh interpreter that
+has already imported the Home Assistant core modules, as a running instance has:
+what remains is the cost of the integration itself.
+"""
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from custom_components.ajax import _get_platforms, _log_device_diagnostics
+from custom_components.ajax.const import state_projection
+
+from .conftest import HUB_SIZES, run
+from .test_scale import build_entities
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Budget for importing the integration package on top of the Home Assistant core
+# (30-37 ms measured, best of three)
+IMPORT_BUDGET_MS = 50
+
+# Diagnostics and option-gated modules, imported by the setup paths that use them
+LAZY_MODULES = (
+    "external_statistics",
+    "hedging",
+    "metrics_view",
+    "profiler",
+    "replay",
+    "websocket_api",
+)
+
+# Already imported by Home Assistant before it loads a custom integration
+_PRELOADED = (
+    "homeassistant.config_entries",
+    "homeassistant.components.http",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+)
+
+
+def _import_package(*args: str, then: str = "") -> subprocess.CompletedProcess:
+    """Import the package in a fresh interpreter with the core preloaded."""
+    code = (
+        f"import sys; sys.path.insert(0, {str(ROOT)!r}); "
+        + "; ".join(f"import {module}" for module in _PRELOADED)
+        + "; import custom_components.ajax"
+        + then
+    )
+    return subprocess.run(
+        [sys.executable, *args, "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+def _import_time_ms() -> float:
+    """Return the cumulative import time (ms) of the integration package."""
+    result = _import_package("-X", "importtime")
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        _self, cumulative, name = line.rsplit("|", 2)[-3:]
+        if name.strip() == "custom_components.ajax":
+            return int(cumulative) / 1000
+    pytest.fail("custom_components.ajax not in the importtime output")
+
+
+def test_import_time(benchmark):
+    """Import of the integration package (fresh interpreter, core preloaded)."""
+    samples = []
+    benchmark.pedantic(lambda: samples.append(_import_time_ms()), rounds=3, iterations=1)
+    # --benchmark-disable runs it once: the budget is always checked on the best of three
+    samples.extend(_import_time_ms() for _ in range(3 - len(samples)))
+    benchmark.extra_info["import_ms"] = round(min(samples), 1)
+    assert min(samples) < IMPORT_BUDGET_MS
+
+
+def test_diagnostics_imported_lazily():
+    """Importing the package leaves the diagnostics and option-gated modules out."""
+    result = _import_package(then="; print(*sorted(sys.modules))")
+    loaded = set(result.stdout.split())
+    assert not {f"custom_components.ajax.{module}" for module in LAZY_MODULES} & loaded
+
+
+def setup_entities(coordinator) -> list:
+    """Run the setup-time work of async_setup_entry and create every entity."""
+    type_counts = Counter(coordinator.state_store.raw_types)
+    _log_device_diagnostics(coordinator.devices, type_counts)
+    platforms = _get_platforms(type_counts, coordinator.state_store.state_keys())
+    coordinator.state_fields = state_projection(platforms)
+    return build_entities(coordinator)
+
+
+@pytest.mark.parametrize("size", HUB_SIZES)
+def test_time_to_entities(benchmark, event_loop_hass, make_coordinator, size):
+    """Setup from loaded data (snapshot or first refresh) to created entities."""
+    loop, _hass = event_loop_hass
+    coordinator = make_coordinator(size)
+    data = run(loop, coordinator._async_update_data())
+
+    def _setup():
+        # A fresh data version, as after loading the snapshot
+        coordinator.data = {**data}
+        return setup_entities(coordinator)
+
+    entities = benchmark(_setup)
+    benchmark.extra_info["devices"] = size
+    benchmark.extra_info["entities"] = len(entities)
+    assert len(entities) >= size
@@ -0,0 +1,30 @@
+"""Poll timing: percentiles reported by the timing sensors."""
+import pytest
+
+from custom_components.ajax.timing import RollingTimer
+
+
+@pytest.mark.parametrize(
+    ("samples", "pct", "expected"),
+    [
+        (1, 95, 1),
+        (20, 95, 19),
+        (20, 50, 10),
+        (60, 95, 57),
+        (100, 95, 95),
+        (100, 100, 100),
+        (100, 0, 1),
+    ],
+)
+def test_percentile_nearest_rank(samples, pct, expected):
+    """The p-th percentile is the ceil(p/100 * n)-th smallest sample."""
+    timer = RollingTimer(size=samples)
+    # Shuffled: the timer must sort its window
+    for value in sorted(range(1, samples + 1), key=lambda value: (value * 7919) % samples):
+        timer.add(float(value))
+    assert timer.percentile(pct) == expected
+
+
+def test_percentile_empty():
+    """No samples, no percentile."""
+    assert RollingTimer().percentile(95) is None
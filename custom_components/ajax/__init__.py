@@ -7,19 +7,43 @@ Repository: https://github.com/conneehome/ajax
 import asyncio
 import json
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 from pathlib import Path
 from collections import Counter
+from typing import Iterable
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .const import DOMAIN, DEVICE_TYPE_MAP, DEVICE_CLASS_MAP, BATTERY_DEVICES, TEMPERATURE_DEVICES
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_HUB_ID,
+    CONF_LONG_POLL,
+    CONF_HEDGED_READS,
+    DATA_HANDOVER,
+    DEVICE_TYPE_MAP,
+    HANDOVER_TTL,
+    SNAPSHOT_STORAGE_VERSION,
+    SNAPSHOT_STORAGE_KEY,
+    SIGNAL_ENTRY_UNLOADED,
+    SIGNAL_NEW_DEVICES,
+    STATISTICS_STORAGE_KEY,
+    STATISTICS_STORAGE_VERSION,
+    normalize_device_type,
+    state_projection,
+)
 from .coordinator import ConneeAlarmDataCoordinator
+from .metadata import ConneeAlarmMetadataCoordinator
 from .api import ConneeAlarmApiClient
+from .backoff import async_get_backoff_store
 from .panel import async_register_panel
+from .scheduler import async_get_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,106 +64,73 @@ def _log_build_info() -> None:
         _LOGGER.debug("Build info not available: %s", err)
 
 
-def _validate_device_catalog() -> None:
-    """
-    Validate consistency of device catalog at startup.
-    Logs warnings for any misconfigurations to help developers maintain the catalog.
-    """
-    issues = []
-
-    # 1. Check that all binary_sensor types have a DEVICE_CLASS_MAP entry
-    binary_sensor_types = [k for k, v in DEVICE_TYPE_MAP.items() if v == "binary_sensor"]
-    for dtype in binary_sensor_types:
-        if dtype not in DEVICE_CLASS_MAP:
-            issues.append(f"binary_sensor '{dtype}' missing from DEVICE_CLASS_MAP")
-
-    # 2. Check that all battery devices exist in DEVICE_TYPE_MAP
-    for dtype in BATTERY_DEVICES:
-        if dtype not in DEVICE_TYPE_MAP:
-            issues.append(f"BATTERY_DEVICES entry '{dtype}' not in DEVICE_TYPE_MAP")
-
-    # 3. Check that all temperature devices exist in DEVICE_TYPE_MAP
-    for dtype in TEMPERATURE_DEVICES:
-        if dtype not in DEVICE_TYPE_MAP:
-            issues.append(f"TEMPERATURE_DEVICES entry '{dtype}' not in DEVICE_TYPE_MAP")
-
-    # 4. Check that temperature devices are NOT hub types
-    for dtype in TEMPERATURE_DEVICES:
-        if DEVICE_TYPE_MAP.get(dtype) == "alarm_control_panel":
-            issues.append(f"TEMPERATURE_DEVICES entry '{dtype}' is a hub (alarm_control_panel)")
-
-    # Log results
-    if issues:
-        _LOGGER.warning("CATALOG VALIDATION: Found %d issues:", len(issues))
-        for issue in issues[:20]:  # Limit to 20 to avoid log spam
-            _LOGGER.warning("  - %s", issue)
-        if len(issues) > 20:
-            _LOGGER.warning("  ... and %d more issues", len(issues) - 20)
-    else:
-        _LOGGER.debug("CATALOG VALIDATION: All device maps are consistent.")
-
+def _log_device_diagnostics(devices: list, type_counts: Counter) -> None:
+    """Log device diagnostics to help troubleshoot missing entities.
 
-def _log_device_diagnostics(devices: list) -> None:
-    """Log device diagnostics to help troubleshoot missing entities."""
+    Runs on every setup, so only the summary and unknown types are logged by
+    default; the per-type breakdown and name samples need debug logging.
+    """
     if not devices:
         _LOGGER.warning("DIAG: No devices received from API!")
         return
 
-    _LOGGER.info("DIAG: Total devices received from API: %d", len(devices))
-
-    # Count device types
-    type_counter: Counter = Counter()
-    unknown_types: list = []
-    name_samples: list = []
-
-    for d in devices:
-        dtype = d.get("type") or d.get("deviceType") or "MISSING_TYPE"
-        dtype = str(dtype).strip()
-        type_counter[dtype] += 1
-        if dtype not in DEVICE_TYPE_MAP and dtype != "MISSING_TYPE":
-            unknown_types.append(dtype)
-
-        # Log name resolution for first few devices
-        if len(name_samples) < 5:
-            device_name = d.get("deviceName")
-            name_field = d.get("name")
-            label_field = d.get("label")
-            resolved = device_name or name_field or label_field or dtype
-            name_samples.append({
-                "deviceName": device_name,
-                "name": name_field,
-                "label": label_field,
-                "resolved": resolved,
-                "type": dtype,
-            })
-
-    # Log summary
-    for dtype, count in type_counter.most_common():
-        mapped = DEVICE_TYPE_MAP.get(dtype, "UNMAPPED (fallback sensor)")
-        _LOGGER.info("DIAG:   %s x%d -> %s", dtype, count, mapped)
+    _LOGGER.info(
+        "DIAG: Total devices received from API: %d (%d types)", len(devices), len(type_counts)
+    )
 
+    unknown_types = [dtype for dtype in type_counts if dtype and dtype not in DEVICE_TYPE_MAP]
     if unknown_types:
         _LOGGER.warning(
             "DIAG: Unknown device types (not in DEVICE_TYPE_MAP, will use fallback): %s",
-            list(set(unknown_types)),
+            unknown_types,
         )
-    else:
-        _LOGGER.info("DIAG: All device types are mapped.")
 
-    # Log name resolution samples
-    _LOGGER.info("DIAG: Name resolution samples (first 5 devices):")
-    for sample in name_samples:
-        _LOGGER.info(
+    if not _LOGGER.isEnabledFor(logging.DEBUG):
+        return
+
+    for dtype, count in type_counts.most_common():
+        mapped = DEVICE_TYPE_MAP.get(dtype, "UNMAPPED (fallback sensor)")
+        _LOGGER.debug("DIAG:   %s x%d -> %s", dtype or "MISSING_TYPE", count, mapped)
+
+    _LOGGER.debug("DIAG: Name resolution samples (first 5 devices):")
+    for d in devices[:5]:
+        _LOGGER.debug(
             "DIAG:   type=%s | deviceName=%s | name=%s | label=%s | RESOLVED=%s",
-            sample["type"],
-            sample["deviceName"],
-            sample["name"],
-            sample["label"],
-            sample["resolved"],
+            d["type"] or "MISSING_TYPE",
+            d.get("deviceName"),
+            d.get("name"),
+            d.get("label"),
+            d["deviceName"] or d["type"] or "MISSING_TYPE",
         )
 
 
-PLATFORMS = [Platform.ALARM_CONTROL_PANEL, Platform.BINARY_SENSOR, Platform.SENSOR, Platform.VALVE, Platform.SWITCH, Platform.UPDATE]
+# Always forwarded: hub panel, gateway/summary sensors and hub firmware exist for every hub
+BASE_PLATFORMS = {Platform.ALARM_CONTROL_PANEL, Platform.SENSOR, Platform.UPDATE}
+# Forwarded only when the catalog contains a device of that kind
+DEVICE_PLATFORMS = {Platform.BINARY_SENSOR, Platform.VALVE, Platform.SWITCH}
+
+# Door-like state fields that make binary_sensor expose unknown device types
+_CONTACT_STATE_KEYS = ("reedClosed", "openState", "magneticState", "contactState")
+
+
+def _get_platforms(device_types: Iterable[str], state_keys: Iterable[str] = ()) -> set:
+    """Return the platforms needed for the given (distinct, raw) device types.
+
+    state_keys: the state fields reported by the hub's devices.
+    """
+    platforms = set(BASE_PLATFORMS)
+
+    for raw in device_types:
+        # valve/switch match the raw type, binary_sensor the normalized one
+        for device_type in (raw, normalize_device_type(raw)):
+            platform = DEVICE_TYPE_MAP.get(device_type)
+            if platform in DEVICE_PLATFORMS:
+                platforms.add(Platform(platform))
+
+    if Platform.BINARY_SENSOR not in platforms and not set(_CONTACT_STATE_KEYS).isdisjoint(state_keys):
+        platforms.add(Platform.BINARY_SENSOR)
+
+    return platforms
 
 
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
@@ -170,14 +161,21 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     return True
 
 
+def _pop_handover(hass: HomeAssistant, device_id: str, hub_id: str | None) -> dict | None:
+    """Return (and consume) the config flow handover for this entry, if still fresh."""
+    handover = hass.data.get(DATA_HANDOVER, {}).pop(device_id, None)
+    if handover is None:
+        return None
+    age = (datetime.now() - handover["created_at"]).total_seconds()
+    if handover["hub_id"] != hub_id or age > HANDOVER_TTL:
+        return None
+    _LOGGER.debug("Using config flow session for device_id %s", device_id[:8])
+    return handover
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Connee Alarm from a config entry."""
     import uuid
-    
-    hass.data.setdefault(DOMAIN, {})
-
-    _log_build_info()
-    _validate_device_catalog()
 
     # Get or generate persistent device_id
     device_id = entry.data.get("device_id")
@@ -186,53 +184,170 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         device_id = str(uuid.uuid4())
         _LOGGER.warning("device_id missing after migration, generated: %s", device_id[:8])
 
-    session = async_get_clientsession(hass)
-    api = ConneeAlarmApiClient(
-        session=session,
-        email=entry.data["email"],
-        password=entry.data["password"],
-        device_id=device_id,
-    )
+    hub_id = entry.data.get(CONF_HUB_ID)
 
-    _LOGGER.info("Initializing Connee Alarm with device_id: %s", device_id[:8])
+    # Right after the config flow: reuse its logged-in client, hub list and first
+    # snapshot instead of repeating the same gateway calls. Popped before anything
+    # can raise, so a failed setup does not leave the live client in hass.data.
+    handover = _pop_handover(hass, device_id, hub_id)
 
-    # Login to API (with backoff protection)
-    if not await api.login():
-        _LOGGER.error(
-            "Failed to login to Connee Alarm API. "
-            "If this persists, check credentials or wait for any Ajax ban to expire."
-        )
-        return False
-
-    # Get hubs
-    hubs = await api.get_hubs()
-    if not hubs:
-        _LOGGER.error(
-            "No hubs found for this account. "
-            "Ensure the account has been invited to the hub in the Ajax app."
+    hass.data.setdefault(DOMAIN, {})
+
+    _log_build_info()
+
+    if handover:
+        api = handover["api"]
+    else:
+        session = async_get_clientsession(hass)
+        api = ConneeAlarmApiClient(
+            session=session,
+            email=entry.data["email"],
+            password=entry.data["password"],
+            device_id=device_id,
         )
-        return False
 
-    # Use first hub or configured hub
-    hub_id = entry.data.get("hub_id") or hubs[0].get("id")
-    api.hub_id = hub_id
+    # Shared with the other entries: global concurrency, login turns and poll phases
+    api.scheduler = async_get_scheduler(hass)
+    # A ban that started before a restart/reload is honoured, not logged into again
+    (await async_get_backoff_store(hass)).async_restore(api)
+    # Reads slower than their p95 get a second request (hedged_reads option)
+    api.hedger = None
+    if entry.options.get(CONF_HEDGED_READS):
+        from .hedging import ReadHedger
+
+        api.hedger = ReadHedger(api.metrics)
+
+    _LOGGER.info("Initializing Connee Alarm with device_id: %s", device_id[:8])
 
-    # Create coordinator
     coordinator = ConneeAlarmDataCoordinator(hass, api, hub_id)
-    await coordinator.async_config_entry_first_refresh()
 
-    # Diagnostics: log device info
-    devices = coordinator.data.get("devices", [])
-    _log_device_diagnostics(devices)
+    if handover:
+        coordinator.async_seed_from_flow(
+            handover["hubs"], handover["snapshot"], handover["logged_in_at"]
+        )
+        from_cache = False
+    else:
+        # Fast path: create entities from the last good snapshot and let the first live
+        # refresh (which also logs in) run in the background, so startup does not
+        # depend on the gateway being reachable
+        from_cache = bool(hub_id) and await coordinator.async_load_snapshot()
+
+    if from_cache or coordinator.data:
+        api.hub_id = hub_id
+    else:
+        # Login to API (with backoff protection), unless the config flow just did
+        if not api.session_token and api.backoff_remaining_seconds:
+            # Home Assistant retries the setup later; the retries make no gateway call
+            raise ConfigEntryNotReady(
+                f"Gateway in backoff for {api.backoff_remaining_seconds}s"
+            )
+        if not api.session_token and not await api.login():
+            _LOGGER.error(
+                "Failed to login to Connee Alarm API. "
+                "If this persists, check credentials or wait for any Ajax ban to expire."
+            )
+            return False
+
+        # Get hubs
+        hubs = coordinator.hubs or await api.get_hubs()
+        if not hubs:
+            _LOGGER.error(
+                "No hubs found for this account. "
+                "Ensure the account has been invited to the hub in the Ajax app."
+            )
+            return False
+
+        # Use first hub or configured hub
+        hub_id = hub_id or hubs[0].get("id")
+        api.hub_id = hub_id
+        coordinator.hub_id = hub_id
+        coordinator.hubs = hubs
+
+        await coordinator.async_config_entry_first_refresh()
+
+    # One pass over the catalog: the rest of the setup works on the distinct types,
+    # a few dozen whatever the hub size
+    type_counts = Counter(coordinator.state_store.raw_types)
+    _log_device_diagnostics(coordinator.devices, type_counts)
+
+    platforms = _get_platforms(type_counts, coordinator.state_store.state_keys())
+    _LOGGER.debug("Forwarding setup to platforms: %s", sorted(platforms))
+    # Polls only ask for the state fields the entities of these platforms read
+    coordinator.state_fields = state_projection(platforms)
+
+    # Firmware/hardware info for the update entities, seeded from the data above and
+    # polled on its own slow cadence
+    metadata = ConneeAlarmMetadataCoordinator(hass, coordinator)
+    metadata.async_seed()
 
     hass.data[DOMAIN][entry.entry_id] = {
         "api": api,
         "coordinator": coordinator,
+        "metadata": metadata,
         "hub_id": hub_id,
         "device_id": device_id,
+        "platforms": platforms,
     }
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
+
+    @callback
+    def _async_forward_new_platforms(new_devices: list) -> None:
+        """Late-forward platforms for device kinds that were not on the hub before."""
+        # Same contact-state fallback as the initial forward, over the updated states
+        missing = _get_platforms(
+            {d["type"] for d in new_devices}, coordinator.state_store.state_keys()
+        ) - platforms
+        if not missing:
+            return
+        # Claim them right away so a following refresh does not forward twice; the
+        # platform setup builds entities for the new devices from coordinator data
+        platforms.update(missing)
+        coordinator.state_fields = state_projection(platforms)
+        _LOGGER.info("Forwarding setup to new platforms: %s", sorted(missing))
+        entry.async_create_task(
+            hass, hass.config_entries.async_forward_entry_setups(entry, missing)
+        )
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_DEVICES.format(entry.entry_id), _async_forward_new_platforms
+        )
+    )
+
+    # Track enrolment changes on every refresh: the first call records the devices
+    # the platforms have just created, later calls add/remove entities on the fly
+    coordinator.async_sync_devices()
+    entry.async_on_unload(coordinator.async_add_listener(coordinator.async_sync_devices))
+
+    if entry.options.get(CONF_EXTERNAL_STATISTICS):
+        from .external_statistics import async_setup_external_statistics
+
+        unload_statistics = await async_setup_external_statistics(hass, coordinator)
+        if unload_statistics:
+            entry.async_on_unload(unload_statistics)
+
+    if entry.options.get(CONF_LONG_POLL):
+        coordinator.async_start_long_poll()
+        entry.async_on_unload(coordinator.async_stop_long_poll)
+
+    # Options change entity definitions (state classes): reload to apply them
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
+    if from_cache:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
+
+    # Diagnostics are imported here rather than with the package; the services
+    # import their modules only when called
+    from .metrics_view import async_setup_metrics_view
+    from .services import async_setup_services
+    from .websocket_api import async_setup_websocket_api
+
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    async_setup_metrics_view(hass)
 
     # Register sidebar dashboard panel
     await async_register_panel(hass)
@@ -240,11 +355,28 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    platforms = hass.data[DOMAIN][entry.entry_id]["platforms"]
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        # Websocket subscriptions to this entry's coordinator would never hear from it again
+        async_dispatcher_send(hass, SIGNAL_ENTRY_UNLOADED.format(entry.entry_id))
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached snapshot and open statistics hour when the config entry is deleted."""
+    for version, key in (
+        (SNAPSHOT_STORAGE_VERSION, SNAPSHOT_STORAGE_KEY),
+        (STATISTICS_STORAGE_VERSION, STATISTICS_STORAGE_KEY),
+    ):
+        await Store(hass, version, key.format(entry.entry_id)).async_remove()
@@ -14,7 +14,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN, MANUFACTURER
+from .const import DOMAIN, HUB_ENDPOINTS, MANUFACTURER
 from .coordinator import ConneeAlarmDataCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -53,6 +53,8 @@ class ConneeAlarmControlPanel(CoordinatorEntity, AlarmControlPanelEntity):
         self._hub_id = hub_id
         self._attr_unique_id = f"ajax_{hub_id}_panel"
         self._attr_name = "Pannello Allarme"
+        # Transitional state shown while an arm/disarm command is in flight
+        self._pending_state: AlarmControlPanelState | None = None
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -79,9 +81,17 @@ class ConneeAlarmControlPanel(CoordinatorEntity, AlarmControlPanelEntity):
     def code_required(self) -> bool:
         return False
 
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the staleness marker while the hub state is served from its last good value."""
+        return self.coordinator.stale_attributes(HUB_ENDPOINTS)
+
     @property
     def alarm_state(self) -> AlarmControlPanelState | None:
         """Return current alarm state."""
+        if self._pending_state is not None:
+            return self._pending_state
+
         hub_state = self.coordinator.data.get("hub_state", {})
         arm_state = str(hub_state.get("armState", hub_state.get("state", "unknown"))).upper()
         
@@ -115,30 +125,31 @@ class ConneeAlarmControlPanel(CoordinatorEntity, AlarmControlPanelEntity):
         # Default to disarmed for unknown states
         return AlarmControlPanelState.DISARMED
 
+    async def _async_send_arm_command(self, arm_state: str, pending: AlarmControlPanelState) -> None:
+        """Send an arm/disarm command, showing a transitional state until it is applied."""
+        self._pending_state = pending
+        self.async_write_ha_state()
+        try:
+            success, error_msg, response = await self._api.arm_hub(self._hub_id, arm_state)
+            if not success:
+                raise HomeAssistantError(f"Errore Ajax: {error_msg}. Prova a ricaricare l'integrazione.")
+            await self.coordinator.async_apply_arm_result(response)
+        finally:
+            self._pending_state = None
+            self.async_write_ha_state()
+
     async def async_alarm_disarm(self, code: str | None = None) -> None:
         """Disarm the alarm."""
-        success, error_msg = await self._api.arm_hub(self._hub_id, "DISARM")
-        if not success:
-            raise HomeAssistantError(f"Errore Ajax: {error_msg}. Prova a ricaricare l'integrazione.")
-        await self.coordinator.async_request_refresh()
+        await self._async_send_arm_command("DISARM", AlarmControlPanelState.DISARMING)
 
     async def async_alarm_arm_away(self, code: str | None = None) -> None:
         """Arm the alarm in away mode."""
-        success, error_msg = await self._api.arm_hub(self._hub_id, "ARM")
-        if not success:
-            raise HomeAssistantError(f"Errore Ajax: {error_msg}. Prova a ricaricare l'integrazione.")
-        await self.coordinator.async_request_refresh()
+        await self._async_send_arm_command("ARM", AlarmControlPanelState.ARMING)
 
     async def async_alarm_arm_home(self, code: str | None = None) -> None:
         """Arm the alarm in home mode."""
-        success, error_msg = await self._api.arm_hub(self._hub_id, "PARTIAL_ARM")
-        if not success:
-            raise HomeAssistantError(f"Errore Ajax: {error_msg}. Prova a ricaricare l'integrazione.")
-        await self.coordinator.async_request_refresh()
+        await self._async_send_arm_command("PARTIAL_ARM", AlarmControlPanelState.ARMING)
 
     async def async_alarm_arm_night(self, code: str | None = None) -> None:
         """Arm the alarm in night mode."""
-        success, error_msg = await self._api.arm_hub(self._hub_id, "NIGHT_ARM")
-        if not success:
-            raise HomeAssistantError(f"Errore Ajax: {error_msg}. Prova a ricaricare l'integrazione.")
-        await self.coordinator.async_request_refresh()
+        await self._async_send_arm_command("NIGHT_ARM", AlarmControlPanelState.ARMING)
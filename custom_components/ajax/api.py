@@ -1,12 +1,42 @@
 """Connee Alarm API Client."""
+import json
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from time import perf_counter
+from typing import Optional, Dict, Any, List, Sequence
 import asyncio
+from contextlib import nullcontext
 
 from aiohttp import ClientSession, ClientTimeout
 
-from .const import CONNEE_GATEWAY_URL, TOKEN_REFRESH_INTERVAL, VERSION
+from .const import (
+    CONNEE_GATEWAY_URL,
+    HEDGED_ACTIONS,
+    LANE_COMMAND,
+    LANE_INTERACTIVE,
+    LANE_POLL,
+    LOGIN_STORM_LIMIT,
+    LOGIN_STORM_WINDOW,
+    LONG_POLL_TIMEOUT,
+    POLL_ACTIONS,
+    TOKEN_REFRESH_INTERVAL,
+    VERSION,
+)
+from .models import (
+    ConneeAlarmApiError,
+    Device,
+    DeviceState,
+    Hub,
+    PayloadError,
+    decode_device_states,
+    decode_devices,
+    decode_hub_state,
+    decode_hubs,
+    decode_session,
+    decode_state_changes,
+)
+from .metrics import GatewayMetrics
+from .timing import PHASE_DECODE, PhaseTimings
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,6 +45,24 @@ BACKOFF_INITIAL_SECONDS = 60  # 1 minute initial backoff
 BACKOFF_MAX_SECONDS = 900  # 15 minutes max backoff
 BACKOFF_MULTIPLIER = 2
 
+REQUEST_TIMEOUT = 30  # seconds
+# Extra seconds a long-poll may take beyond the wait the gateway was asked for
+LONG_POLL_GRACE = 10
+
+
+def _decode(body: bytes) -> Any:
+    """Decode a response body (None when empty, like aiohttp's json())."""
+    return json.loads(body) if body.strip() else None
+
+
+def _raise_for_error(action: str, result: Any) -> None:
+    """Raise ConneeAlarmApiError if the gateway returned an error payload."""
+    if isinstance(result, dict) and "error" in result:
+        raise ConneeAlarmApiError(
+            f"{action}: {result.get('message', 'Unknown error')}",
+            auth_failed=result.get("auth_failed", False),
+        )
+
 
 class ConneeAlarmApiClient:
     """Client for Connee Alarm API."""
@@ -44,9 +92,16 @@ class ConneeAlarmApiClient:
         self._login_lock = False  # Prevent concurrent login attempts
         self._backoff_until: Optional[datetime] = None  # Backoff timer
         self._consecutive_failures = 0  # Track failures for exponential backoff
+        self._login_attempts: List[datetime] = []  # Recent logins (restart-loop guard)
         self._last_error: Optional[str] = None  # Last error message for diagnostics
         self._connection_status: str = self.STATUS_DISCONNECTED
         self._auth_failed: bool = False  # Track permanent auth failure for ConfigEntryAuthFailed
+        self.timings = PhaseTimings()  # Poll-phase timings (shared with the coordinator)
+        self.metrics = GatewayMetrics()  # Prometheus metrics (shared with the coordinator)
+        self.capture = None  # replay.TrafficCapture set by the ajax.capture service
+        self.scheduler = None  # scheduler.GatewayScheduler shared by all config entries
+        self.backoff_store = None  # backoff.BackoffStore persisting the backoff state
+        self.hedger = None  # hedging.ReadHedger when the hedged_reads option is on
 
     @property
     def connection_status(self) -> str:
@@ -73,6 +128,11 @@ class ConneeAlarmApiClient:
             return "Connesso al gateway Connee"
         return "Non connesso"
 
+    @property
+    def backoff_until(self) -> Optional[datetime]:
+        """Return the end of the current backoff period, or None."""
+        return self._backoff_until if self._is_in_backoff() else None
+
     @property
     def backoff_remaining_seconds(self) -> int:
         """Return seconds remaining in backoff, or 0 if not in backoff."""
@@ -100,21 +160,127 @@ class ConneeAlarmApiClient:
             self._consecutive_failures,
             self._backoff_until.isoformat()
         )
+        self.metrics.backoff()
+        self._persist_backoff()
 
     def _clear_backoff(self) -> None:
         """Clear backoff on success."""
+        if not self._consecutive_failures and self._backoff_until is None:
+            return
         self._consecutive_failures = 0
         self._backoff_until = None
+        self._persist_backoff()
+
+    def backoff_state(self) -> Dict[str, Any]:
+        """Return the backoff state to persist (timestamps, DST-safe)."""
+        return {
+            "backoff_until": self._backoff_until.timestamp() if self._backoff_until else None,
+            "consecutive_failures": self._consecutive_failures,
+            "login_attempts": [attempt.timestamp() for attempt in self._login_attempts],
+        }
+
+    def restore_backoff_state(self, state: Dict[str, Any]) -> None:
+        """Apply a persisted backoff state (from before a restart or reload)."""
+        backoff_until = state.get("backoff_until")
+        self._backoff_until = datetime.fromtimestamp(backoff_until) if backoff_until else None
+        self._consecutive_failures = int(state.get("consecutive_failures") or 0)
+        self._login_attempts = [
+            datetime.fromtimestamp(attempt) for attempt in state.get("login_attempts") or []
+        ]
+        if self._is_in_backoff():
+            _LOGGER.warning(
+                "Restored gateway backoff (attempt %d): no requests until %s",
+                self._consecutive_failures,
+                self._backoff_until.isoformat(),
+            )
+
+    def _persist_backoff(self) -> None:
+        """Schedule a write of the backoff state, if a store is attached."""
+        if self.backoff_store is not None:
+            self.backoff_store.async_save(self)
+
+    def _is_login_storm(self) -> bool:
+        """Record a login attempt; True if too many happened recently (restart loop)."""
+        now = datetime.now()
+        window_start = now - timedelta(seconds=LOGIN_STORM_WINDOW)
+        self._login_attempts = [a for a in self._login_attempts if a > window_start]
+        if len(self._login_attempts) >= LOGIN_STORM_LIMIT:
+            return True
+        self._login_attempts.append(now)
+        self._persist_backoff()
+        return False
+
+    async def _post(
+        self,
+        action: str,
+        url: str,
+        request_body: Dict,
+        headers: Dict,
+        long_poll: bool = False,
+        lane: int = LANE_POLL,
+    ) -> tuple[int, Any]:
+        """POST one gateway request and return (HTTP status, decoded JSON).
+
+        Runs in a slot of the shared gateway scheduler (if any), in the given lane,
+        so the clients of all config entries together stay under its concurrency
+        limit. Long-polls are idle on the gateway side and do not take a slot.
+        """
+        capture = self.capture
+        start = perf_counter()
+        scheduled = self.scheduler is not None and not long_poll
+        try:
+            async with self.scheduler.slot(lane) if scheduled else nullcontext():
+                if long_poll:
+                    timeout = ClientTimeout(total=LONG_POLL_TIMEOUT + LONG_POLL_GRACE)
+                else:
+                    timeout = ClientTimeout(total=REQUEST_TIMEOUT)
+                async with self.session.request(
+                    "POST", url, json=request_body, headers=headers, timeout=timeout
+                ) as resp:
+                    body = await resp.read()
+                    status = resp.status
+                    size = resp.content_length
+            # The decode phase times json.loads alone (the body is read above), and
+            # only for the reads of a poll cycle
+            if action in POLL_ACTIONS and not long_poll:
+                with self.timings.measure(PHASE_DECODE):
+                    result = _decode(body)
+            else:
+                result = _decode(body)
+        except asyncio.TimeoutError:
+            elapsed = perf_counter() - start
+            self.metrics.request(action, "timeout", elapsed, None)
+            if capture is not None:
+                capture.record(action, request_body, -1, None, elapsed * 1000)
+            raise
+        except Exception:
+            self.metrics.request(action, "error", perf_counter() - start, None)
+            raise
+        elapsed = perf_counter() - start
+        self.metrics.request(action, status, elapsed, size)
+        if self.hedger is not None:
+            self.hedger.observe(action, elapsed)
+        if capture is not None:
+            capture.record(action, request_body, status, result, elapsed * 1000)
+        return status, result
 
     async def _call_gateway(
         self,
         action: str,
         body: Optional[Dict] = None,
+        long_poll: bool = False,
+        lane: int = LANE_POLL,
         _retry_after_relogin: bool = False,
     ) -> Any:
-        """Call Connee Gateway API with automatic re-authentication on token errors."""
+        """Call Connee Gateway API with automatic re-authentication on token errors.
+
+        `lane` is the scheduler lane (LANE_COMMAND, LANE_INTERACTIVE, LANE_POLL).
+        Commands on a live session pass the backoff gate: they are user-initiated
+        and rare, and a 429 answer to one still extends the backoff. Reads in
+        HEDGED_ACTIONS go through the hedger, if set (hedged_reads option).
+        """
         # Check backoff before making requests
-        if self._is_in_backoff():
+        if self._is_in_backoff() and not (lane == LANE_COMMAND and self.session_token):
             remaining = (self._backoff_until - datetime.now()).total_seconds()
             _LOGGER.warning(
                 "In backoff period. %d seconds remaining. Skipping request: %s",
@@ -138,83 +304,88 @@ class ConneeAlarmApiClient:
         request_body["deviceId"] = self.device_id
 
         try:
-            timeout = ClientTimeout(total=30)
-            async with self.session.request(
-                "POST", url, json=request_body, headers=headers, timeout=timeout
-            ) as resp:
-                result = await resp.json()
-
-                # Check for session token errors - attempt auto re-login
-                is_token_error = False
-                if isinstance(result, dict):
-                    error_msg_lower = str(result.get("message", "")).lower()
-                    error_lower = str(result.get("error", "")).lower()
-                    is_token_error = (
-                        "session token required" in error_msg_lower or
-                        "session token required" in error_lower or
-                        "unauthorized" in error_msg_lower or
-                        "invalid token" in error_msg_lower or
-                        "token expired" in error_msg_lower
-                    )
+            if self.hedger is not None and action in HEDGED_ACTIONS and not long_poll:
+                status, result = await self.hedger.run(
+                    action,
+                    lambda: self._post(action, url, request_body, headers, long_poll, lane),
+                )
+            else:
+                status, result = await self._post(action, url, request_body, headers, long_poll, lane)
+
+            # Check for session token errors - attempt auto re-login
+            is_token_error = False
+            if isinstance(result, dict):
+                error_msg_lower = str(result.get("message", "")).lower()
+                error_lower = str(result.get("error", "")).lower()
+                is_token_error = (
+                    "session token required" in error_msg_lower or
+                    "session token required" in error_lower or
+                    "unauthorized" in error_msg_lower or
+                    "invalid token" in error_msg_lower or
+                    "token expired" in error_msg_lower
+                )
 
-                # Handle 401/403 or token errors with automatic re-login
-                if resp.status in (401, 403) or is_token_error:
-                    error_msg = result.get("message", f"HTTP {resp.status}") if isinstance(result, dict) else f"HTTP {resp.status}"
+            # Handle 401/403 or token errors with automatic re-login
+            if status in (401, 403) or is_token_error:
+                error_msg = result.get("message", f"HTTP {status}") if isinstance(result, dict) else f"HTTP {status}"
+                
+                # If we haven't already retried after re-login, attempt it now
+                if not _retry_after_relogin and action != "login":
+                    _LOGGER.info(
+                        "Token/auth error detected (%s). Attempting automatic re-login...",
+                        error_msg
+                    )
+                    # Clear current token
+                    self.session_token = None
+                    self.token_expires = None
                     
-                    # If we haven't already retried after re-login, attempt it now
-                    if not _retry_after_relogin and action != "login":
-                        _LOGGER.info(
-                            "Token/auth error detected (%s). Attempting automatic re-login...",
-                            error_msg
+                    # Attempt re-login
+                    login_success = await self.login()
+                    if login_success:
+                        _LOGGER.info("Re-login successful. Retrying original request: %s", action)
+                        self.metrics.retry(action)
+                        # Retry the original request with new token
+                        return await self._call_gateway(
+                            action, body, long_poll, lane, _retry_after_relogin=True
                         )
-                        # Clear current token
-                        self.session_token = None
-                        self.token_expires = None
-                        
-                        # Attempt re-login
-                        login_success = await self.login()
-                        if login_success:
-                            _LOGGER.info("Re-login successful. Retrying original request: %s", action)
-                            # Retry the original request with new token
-                            return await self._call_gateway(action, body, _retry_after_relogin=True)
-                        else:
-                            _LOGGER.error("Re-login failed. Cannot complete request: %s", action)
-                            self._auth_failed = True  # Mark auth as permanently failed
-                            return {"error": 401, "message": "Re-login failed", "auth_failed": True}
-                    
-                    # Already retried or it's a login action - set backoff
-                    self._last_error = f"{resp.status}: {error_msg}"
-                    _LOGGER.error(
-                        "Auth/rate limit error (HTTP %d): %s. Activating backoff.",
-                        resp.status,
-                        result
-                    )
-                    self._set_backoff()
-                    return {"error": resp.status, "message": error_msg, "auth_failed": True}
-
-                # Handle rate limiting
-                if resp.status == 429:
-                    error_msg = result.get("message", "Rate limited") if isinstance(result, dict) else "Rate limited"
-                    self._last_error = f"429: {error_msg}"
-                    _LOGGER.error("Rate limit error (HTTP 429): %s. Activating backoff.", result)
-                    self._set_backoff()
-                    return {"error": 429, "message": error_msg}
-
-                if resp.status == 200 and isinstance(result, dict) and result.get("success"):
-                    self._clear_backoff()  # Success - clear any backoff
-                    self._last_error = None  # Clear error on success
-                    self._connection_status = self.STATUS_CONNECTED
-                    self._auth_failed = False  # Clear auth failed flag on success
-                    return result.get("data")
-
-                if isinstance(result, dict):
-                    error_msg = result.get("error", f"HTTP {resp.status}")
-                else:
-                    error_msg = f"HTTP {resp.status}"
-
-                self._last_error = str(error_msg)
-                _LOGGER.error("Gateway error: %s", error_msg)
-                return {"error": resp.status, "message": error_msg}
+                    else:
+                        _LOGGER.error("Re-login failed. Cannot complete request: %s", action)
+                        self._auth_failed = True  # Mark auth as permanently failed
+                        return {"error": 401, "message": "Re-login failed", "auth_failed": True}
+                
+                # Already retried or it's a login action - set backoff
+                self._last_error = f"{status}: {error_msg}"
+                _LOGGER.error(
+                    "Auth/rate limit error (HTTP %d): %s. Activating backoff.",
+                    status,
+                    result
+                )
+                self._set_backoff()
+                return {"error": status, "message": error_msg, "auth_failed": True}
+
+            # Handle rate limiting
+            if status == 429:
+                error_msg = result.get("message", "Rate limited") if isinstance(result, dict) else "Rate limited"
+                self._last_error = f"429: {error_msg}"
+                _LOGGER.error("Rate limit error (HTTP 429): %s. Activating backoff.", result)
+                self._set_backoff()
+                return {"error": 429, "message": error_msg}
+
+            if status == 200 and isinstance(result, dict) and result.get("success"):
+                self._clear_backoff()  # Success - clear any backoff
+                self._last_error = None  # Clear error on success
+                self._connection_status = self.STATUS_CONNECTED
+                self._auth_failed = False  # Clear auth failed flag on success
+                return result.get("data")
+
+            if isinstance(result, dict):
+                error_msg = result.get("error", f"HTTP {status}")
+            else:
+                error_msg = f"HTTP {status}"
+
+            self._last_error = str(error_msg)
+            _LOGGER.error("Gateway error: %s", error_msg)
+            return {"error": status, "message": error_msg}
         except asyncio.TimeoutError:
             self._last_error = "Request timeout"
             _LOGGER.error("Gateway request timeout for action: %s", action)
@@ -247,8 +418,22 @@ class ConneeAlarmApiClient:
             )
             return False
 
+        # Restarts and reloads during a ban would otherwise log in again each time
+        if self._is_login_storm():
+            _LOGGER.error(
+                "Cannot login: %d logins in the last %ds. Activating backoff.",
+                len(self._login_attempts),
+                LOGIN_STORM_WINDOW,
+            )
+            self._last_error = "Too many logins"
+            self._set_backoff()
+            return False
+
         self._login_lock = True
         try:
+            if self.scheduler is not None:
+                # Space out the logins of all config entries (startup, token expiry)
+                await self.scheduler.async_login_turn()
             result = await self._call_gateway(
                 "login",
                 {
@@ -256,20 +441,18 @@ class ConneeAlarmApiClient:
                     "password": self.password,
                     "deviceId": self.device_id,
                 },
+                lane=LANE_INTERACTIVE,
             )
 
             if isinstance(result, dict) and "error" not in result:
-                self.session_token = (
-                    result.get("sessionToken")
-                    or result.get("token")
-                    or result.get("session", {}).get("token")
-                )
-                self.user_id = (
-                    result.get("userId")
-                    or result.get("user_id")
-                    or result.get("id")
-                    or result.get("user", {}).get("id")
-                )
+                try:
+                    session = decode_session(result)
+                except PayloadError as err:
+                    _LOGGER.error("Login failed: %s", err)
+                    self.metrics.login(False)
+                    return False
+                self.session_token = session.token
+                self.user_id = session.user_id
 
                 if self.session_token:
                     self.token_expires = datetime.now() + timedelta(
@@ -277,10 +460,12 @@ class ConneeAlarmApiClient:
                     )
                     self._clear_backoff()
                     _LOGGER.info("Login successful via Connee Gateway (device: %s)", self.device_id[:8])
+                    self.metrics.login(True)
                     return True
 
             error_msg = result.get("message", "Login failed") if isinstance(result, dict) else "Login failed"
             _LOGGER.error("Login failed: %s", error_msg)
+            self.metrics.login(False)
             return False
         finally:
             self._login_lock = False
@@ -292,7 +477,7 @@ class ConneeAlarmApiClient:
         self.token_expires = None
         return await self.login()
 
-    async def get_hubs(self) -> List[Dict[str, Any]]:
+    async def get_hubs(self) -> List[Hub]:
         """Get user hubs."""
         if not self.user_id:
             return []
@@ -300,34 +485,22 @@ class ConneeAlarmApiClient:
         result = await self._call_gateway("get-user-hubs", {
             "userId": self.user_id,
             "email": self.email,  # Pass email to update last_used_at
-        })
+        }, lane=LANE_INTERACTIVE)
 
         if isinstance(result, dict) and "error" in result:
             return []
 
-        hubs_raw = []
-        if isinstance(result, list):
-            hubs_raw = result
-        elif isinstance(result, dict):
-            hubs_raw = result.get("hubs") or result.get("data") or []
-
-        hubs = []
-        for h in hubs_raw:
-            hub_id = h.get("hubId") or h.get("id") or h.get("deviceId")
-            if hub_id:
-                hubs.append({
-                    "id": hub_id,
-                    "hubId": hub_id,
-                    "name": h.get("name") or h.get("hubName") or f"Hub {hub_id}",
-                    **h,
-                })
-        return hubs
-
-    async def get_hub_devices(self, hub_id: str) -> List[Dict[str, Any]]:
-        """Get hub devices."""
-        if not self.user_id:
+        try:
+            return decode_hubs(result)
+        except PayloadError as err:
+            _LOGGER.error("Unexpected hub list: %s", err)
             return []
 
+    async def get_hub_devices(self, hub_id: str, lane: int = LANE_POLL) -> List[Device]:
+        """Get hub devices. Raises ConneeAlarmApiError if the call fails."""
+        if not self.user_id:
+            raise ConneeAlarmApiError("get-hub-devices: User ID not set")
+
         result = await self._call_gateway(
             "get-hub-devices",
             {
@@ -335,20 +508,16 @@ class ConneeAlarmApiClient:
                 "hubId": hub_id,
                 "email": self.email,  # Pass email to update last_used_at
             },
+            lane=lane,
         )
 
-        if isinstance(result, list):
-            return result
-        if isinstance(result, dict) and "error" in result:
-            return []
-
-        devices = result.get("devices") or result.get("data") or []
-        return devices if isinstance(devices, list) else []
+        _raise_for_error("get-hub-devices", result)
+        return decode_devices(result)
 
-    async def get_hub_state(self, hub_id: str) -> Dict[str, Any]:
-        """Get hub state."""
+    async def get_hub_state(self, hub_id: str, lane: int = LANE_POLL) -> Dict[str, Any]:
+        """Get hub state. Raises ConneeAlarmApiError if the call fails."""
         if not self.user_id:
-            return {}
+            raise ConneeAlarmApiError("get-hub: User ID not set")
 
         result = await self._call_gateway(
             "get-hub",
@@ -357,43 +526,73 @@ class ConneeAlarmApiClient:
                 "hubId": hub_id,
                 "email": self.email,  # Pass email to update last_used_at
             },
+            lane=lane,
         )
 
-        if isinstance(result, dict) and "error" in result:
-            return {}
-        return result if isinstance(result, dict) else {}
+        _raise_for_error("get-hub", result)
+        return decode_hub_state(result)
 
-    async def get_device_states(self, hub_id: str) -> List[Dict[str, Any]]:
-        """Get device states."""
+    def _device_states_body(self, hub_id: str, fields: Sequence[str] | None) -> Dict[str, Any]:
+        """Return the get-all-device-states request body. Raises if not logged in."""
         if not self.user_id:
-            return []
-        result = await self._call_gateway("get-all-device-states", {
+            raise ConneeAlarmApiError("get-all-device-states: User ID not set")
+        body = {
             "userId": self.user_id,
             "hubId": hub_id,
             "email": self.email,  # Pass email to update last_used_at
-        })
-        if "error" in result:
-            return []
-        return result if isinstance(result, list) else result.get("data", [])
-
-    async def arm_hub(self, hub_id: str, arm_state: str) -> tuple[bool, str]:
-        """Arm/disarm hub. Returns (success, error_message)."""
+        }
+        if fields is not None:
+            body["fields"] = fields
+        return body
+
+    async def get_device_states(
+        self, hub_id: str, fields: Sequence[str] | None = None, lane: int = LANE_POLL
+    ) -> List[DeviceState]:
+        """Get device states. Raises ConneeAlarmApiError if the call fails.
+
+        With `fields` the gateway returns only those keys of each state.
+        """
+        body = self._device_states_body(hub_id, fields)
+        result = await self._call_gateway("get-all-device-states", body, lane=lane)
+        _raise_for_error("get-all-device-states", result)
+        return decode_device_states(result)
+
+    async def wait_device_states(
+        self, hub_id: str, cursor: str | None, fields: Sequence[str] | None = None
+    ) -> tuple[str | None, List[DeviceState] | None]:
+        """Long-poll device states. Raises ConneeAlarmApiError if the call fails.
+
+        The gateway holds the request until a state changes after `cursor` or
+        LONG_POLL_TIMEOUT passes. Returns (next cursor, states); states is None
+        when nothing changed, cursor is None when the gateway does not support
+        long-polling (it answered at once with a plain state list).
+        """
+        # The same request as get_device_states, with the wait and the cursor added
+        body = self._device_states_body(hub_id, fields)
+        body["waitSeconds"] = LONG_POLL_TIMEOUT
+        body["cursor"] = cursor
+        result = await self._call_gateway("get-all-device-states", body, long_poll=True)
+        _raise_for_error("get-all-device-states", result)
+        return decode_state_changes(result)
+
+    async def arm_hub(self, hub_id: str, arm_state: str) -> tuple[bool, str, Dict[str, Any]]:
+        """Arm/disarm hub. Returns (success, error_message, response data)."""
         if not self.user_id:
-            return False, "User ID not set"
+            return False, "User ID not set", {}
         
         result = await self._call_gateway("arm-hub", {
             "userId": self.user_id,
             "hubId": hub_id,
             "armState": arm_state,
-        })
+        }, lane=LANE_COMMAND)
         
         if isinstance(result, dict) and "error" in result:
             error_msg = result.get("message", "Unknown error")
             is_auth_failed = result.get("auth_failed", False)
             _LOGGER.error("arm_hub failed: %s (auth_failed=%s)", error_msg, is_auth_failed)
-            return False, error_msg
+            return False, error_msg, {}
         
-        return True, ""
+        return True, "", result if isinstance(result, dict) else {}
 
     async def control_valve(self, device_id: str, valve_state: str) -> bool:
         """Control WaterStop valve (OPEN/CLOSED)."""
@@ -408,7 +607,7 @@ class ConneeAlarmApiClient:
             "hubId": self.hub_id,
             "targetDeviceId": device_id,
             "valveState": valve_state,
-        })
+        }, lane=LANE_COMMAND)
         
         if isinstance(result, dict) and "error" in result:
             _LOGGER.error("Valve control failed: %s", result.get("message", "Unknown error"))
@@ -431,7 +630,7 @@ class ConneeAlarmApiClient:
             "hubId": self.hub_id,
             "targetDeviceId": device_id,
             "switchState": state_str,
-        })
+        }, lane=LANE_COMMAND)
         
         if isinstance(result, dict) and "error" in result:
             _LOGGER.error("Switch control failed: %s", result.get("message", "Unknown error"))
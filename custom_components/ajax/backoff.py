@@ -0,0 +1,93 @@
+"""Gateway backoff state persisted across restarts and reloads.
+
+The backoff of a client (end of the backoff period, consecutive failures and
+recent login attempts) is kept in one Store shared by all config entries, keyed
+by account and installation device_id. A client restored at setup honours a ban
+that started before the restart, so restart or reload loops do not turn into
+login storms against the gateway.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Dict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    BACKOFF_SAVE_DELAY,
+    BACKOFF_STORAGE_KEY,
+    BACKOFF_STORAGE_VERSION,
+    DATA_BACKOFF,
+    LOGIN_STORM_WINDOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _client_key(email: str, device_id: str) -> str:
+    """Return the storage key of a client (the email is not stored in clear)."""
+    account = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:16]
+    return f"{account}:{device_id}"
+
+
+def _is_expired(state: Dict[str, Any], now: float) -> bool:
+    """Return True if a persisted state no longer affects anything."""
+    return (state.get("backoff_until") or 0) < now and all(
+        attempt < now - LOGIN_STORM_WINDOW for attempt in state.get("login_attempts") or []
+    )
+
+
+class BackoffStore:
+    """Backoff state of every gateway client, persisted in .storage."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize."""
+        self._store: Store = Store(hass, BACKOFF_STORAGE_VERSION, BACKOFF_STORAGE_KEY)
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the persisted states (once)."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                self._states = await self._store.async_load() or {}
+            except Exception as err:
+                _LOGGER.warning("Could not load persisted backoff state: %s", err)
+            self._loaded = True
+
+    @callback
+    def async_restore(self, api) -> None:
+        """Apply the persisted state of a client and persist its changes from now on."""
+        state = self._states.get(_client_key(api.email, api.device_id))
+        if state:
+            api.restore_backoff_state(state)
+        api.backoff_store = self
+
+    @callback
+    def async_save(self, api) -> None:
+        """Record the state of a client and schedule a write."""
+        self._states[_client_key(api.email, api.device_id)] = api.backoff_state()
+        self._store.async_delay_save(self._data_to_save, BACKOFF_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Dict[str, Any]]:
+        """Return the states to write, without the ones that have expired."""
+        now = time.time()
+        self._states = {
+            key: state for key, state in self._states.items() if not _is_expired(state, now)
+        }
+        return self._states
+
+
+async def async_get_backoff_store(hass: HomeAssistant) -> BackoffStore:
+    """Return the loaded backoff store shared by all config entries."""
+    store = hass.data.get(DATA_BACKOFF)
+    if store is None:
+        store = hass.data[DATA_BACKOFF] = BackoffStore(hass)
+    await store.async_load()
+    return store
@@ -7,102 +7,44 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 
-from .const import DOMAIN, MANUFACTURER, DEVICE_CLASS_MAP, DEVICE_TYPE_MAP
+from .const import (
+    DOMAIN,
+    MANUFACTURER,
+    DEVICE_CLASS_MAP,
+    DEVICE_TYPE_MAP,
+    SIGNAL_NEW_DEVICES,
+    DEVICE_ENDPOINTS,
+    normalize_device_type,
+)
 from .coordinator import ConneeAlarmDataCoordinator
+from .models import Device
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _get_device_type(device: dict) -> str:
+def _get_device_type(device: Device) -> str:
     """Return a normalized device type string."""
-    raw = (
-        device.get("type")
-        or device.get("deviceType")
-        or (device.get("device") or {}).get("type")
-        or (device.get("device") or {}).get("deviceType")
-        or ""
-    )
-    raw = str(raw).strip()
-
-    # Common aliases seen in Ajax payloads
-    aliases = {
-        "DoorProtectG3": "DoorProtect",
-        "DoorProtect G3": "DoorProtect",
-        "FireProtect2": "FireProtect 2",
-        "FireProtect 2": "FireProtect 2",
-        "KeyPadTouchscreen": "KeyPadTouchScreen",
-        "KeyPadTouchScreen": "KeyPadTouchScreen",
-        "ReX2": "ReX 2",
-    }
-
-    raw = aliases.get(raw, raw)
-
-    # Normalize common suffixes/variants from API (e.g. "DoorProtect Jeweller")
-    raw_clean = raw.replace("(", " ").replace(")", " ").replace("-", " ")
-    raw_clean = " ".join(raw_clean.split())
-    raw_lower = raw_clean.lower()
-
-    if raw_lower.startswith("doorprotect"):
-        if "fibra" in raw_lower:
-            return "DoorProtect Fibra"
-        if "plus" in raw_lower:
-            return "DoorProtect Plus"
-        if "g3" in raw_lower:
-            return "DoorProtect G3"
-        return "DoorProtect"
-
-    return raw_clean
-
-
-def _get_display_name(device: dict, device_type: str) -> str:
+    return normalize_device_type(device["type"])
+
+
+def _get_display_name(device: Device, device_type: str) -> str:
     """Best-effort display name."""
     # Prefer user-assigned name, fallback to model/type
-    return (
-        device.get("deviceName")
-        or device.get("name")
-        or device.get("label")
-        or device.get("device", {}).get("name")
-        or device_type
-    )
-def _get_device_id(device: dict) -> str | None:
-    """Extract device id from different Ajax payload shapes."""
-    raw_id = (
-        device.get("id")
-        or device.get("deviceId")
-        or device.get("device_id")
-        or (device.get("device") or {}).get("id")
-        or (device.get("device") or {}).get("deviceId")
-        or (device.get("device") or {}).get("device_id")
-    )
-    if raw_id is None:
-        return None
-    raw_id = str(raw_id).strip()
-    return raw_id or None
+    return device["deviceName"] or device_type
 
 
-async def async_setup_entry(
-    hass: HomeAssistant,
-    entry: ConfigEntry,
-    async_add_entities: AddEntitiesCallback,
-) -> None:
-    """Set up Connee Alarm binary sensors."""
-    data = hass.data[DOMAIN][entry.entry_id]
-    coordinator = data["coordinator"]
-
+def _build_entities(coordinator: ConneeAlarmDataCoordinator, devices: list) -> list:
+    """Create binary sensor entities for the given devices."""
     entities = []
-    devices = coordinator.data.get("devices", [])
-    states = coordinator.data.get("device_states", {})
 
     for device in devices:
-        device_id = _get_device_id(device)
-        if not device_id:
-            continue
-
+        device_id = device["id"]
         device_type = _get_device_type(device)
         platform = DEVICE_TYPE_MAP.get(device_type)
 
@@ -112,13 +54,42 @@ async def async_setup_entry(
             continue
 
         # Fallback: if state payload contains door-like fields, expose it anyway
-        state = states.get(device_id, {}) if isinstance(states, dict) else {}
+        state = coordinator.device_state(device_id)
         if any(k in state for k in ("reedClosed", "openState", "magneticState", "contactState")):
             entities.append(ConneeAlarmBinarySensor(coordinator, device))
 
+    return entities
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Connee Alarm binary sensors."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+
+    devices = coordinator.devices
+    entities = _build_entities(coordinator, devices)
+
     _LOGGER.info("Setting up %d binary_sensor entities (devices=%d)", len(entities), len(devices))
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new_devices(new_devices: list) -> None:
+        """Add entities for devices enrolled after setup."""
+        new_entities = _build_entities(coordinator, new_devices)
+        if new_entities:
+            _LOGGER.info("Adding %d binary_sensor entities for new devices", len(new_entities))
+            async_add_entities(new_entities)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_DEVICES.format(entry.entry_id), _async_add_new_devices
+        )
+    )
+
 
 class ConneeAlarmBinarySensor(CoordinatorEntity, BinarySensorEntity):
     """Connee Alarm binary sensor."""
@@ -126,11 +97,12 @@ class ConneeAlarmBinarySensor(CoordinatorEntity, BinarySensorEntity):
     _attr_has_entity_name = True
     _attr_name = "Stato"
 
-    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: dict):
+    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: Device):
         """Initialize."""
         super().__init__(coordinator)
-        self._device = device
-        self._device_id = _get_device_id(device)
+        # Name fields of the setup-time payload, shown for troubleshooting
+        self._name_candidates = (device["deviceName"], device.get("name"))
+        self._device_id = device["id"]
         self._device_type = _get_device_type(device)
 
         display_name = _get_display_name(device, self._device_type)
@@ -145,14 +117,14 @@ class ConneeAlarmBinarySensor(CoordinatorEntity, BinarySensorEntity):
         )
 
         device_class = DEVICE_CLASS_MAP.get(self._device_type)
-        if device_class:
+        # Buttons are mapped to "none": no BinarySensorDeviceClass fits them
+        if device_class and device_class != "none":
             self._attr_device_class = BinarySensorDeviceClass(device_class)
 
     @property
     def is_on(self) -> bool:
         """Return true if sensor is on."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
 
         # Door sensors: reedClosed=false => OPEN => ON
         reed_closed = state.get("reedClosed")
@@ -228,14 +200,14 @@ class ConneeAlarmBinarySensor(CoordinatorEntity, BinarySensorEntity):
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra attributes."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
 
         attrs = {
             "device_type": self._device_type,
             "connee_id": self._device_id,
-            "name_candidate_deviceName": self._device.get("deviceName"),
-            "name_candidate_name": self._device.get("name"),
+            "name_candidate_deviceName": self._name_candidates[0],
+            "name_candidate_name": self._name_candidates[1],
+            **self.coordinator.stale_attributes(DEVICE_ENDPOINTS),
         }
 
         # Pass-through ALL useful fields if present
@@ -1,17 +1,32 @@
 """Config flow for Connee Alarm integration."""
 import logging
 import uuid
+from datetime import datetime
 from typing import Any, Dict, Optional
 
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN, CONF_HUB_ID, CONF_DEVICE_ID
-from .api import ConneeAlarmApiClient
+from .const import (
+    DOMAIN,
+    CONF_HUB_ID,
+    CONF_DEVICE_ID,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_LONG_POLL,
+    CONF_HEDGED_READS,
+    CONF_STALE_LIMIT,
+    DATA_HANDOVER,
+    DEFAULT_STALE_LIMIT,
+    LANE_INTERACTIVE,
+)
+from .api import ConneeAlarmApiClient, ConneeAlarmApiError
+from .backoff import async_get_backoff_store
+from .scheduler import async_get_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,6 +52,14 @@ class ConneeAlarmConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._password: Optional[str] = None
         self._hubs: list = []
         self._device_id: Optional[str] = None
+        self._api: Optional[ConneeAlarmApiClient] = None
+        self._logged_in_at: Optional[datetime] = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry):
+        """Return the options flow."""
+        return ConneeAlarmOptionsFlow(config_entry)
 
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
@@ -70,14 +93,20 @@ class ConneeAlarmConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 password=self._password,
                 device_id=self._device_id,
             )
+            api.scheduler = async_get_scheduler(self.hass)
+            # A ban hit during the flow carries over to the entry it creates
+            (await async_get_backoff_store(self.hass)).async_restore(api)
 
             if await api.login():
+                self._api = api
+                self._logged_in_at = datetime.now()
                 self._hubs = await api.get_hubs()
                 _LOGGER.info("Found %d hubs for account %s", len(self._hubs), self._email)
                 
                 if self._hubs:
                     if len(self._hubs) == 1:
                         hub = self._hubs[0]
+                        await self._async_prepare_handover(hub.get("id"))
                         return self.async_create_entry(
                             title=f"Connee Alarm - {hub.get('name', 'Hub')}",
                             data={
@@ -105,6 +134,33 @@ class ConneeAlarmConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def _async_prepare_handover(self, hub_id: str) -> None:
+        """Hand the logged-in client, hubs and first snapshot over to entry setup.
+
+        Setup would otherwise log in, list hubs and poll again with the same
+        device_id right after the flow did, doubling the calls during onboarding.
+        """
+        snapshot = None
+        try:
+            # The user is waiting on the flow: ahead of the other entries' polls
+            snapshot = {
+                "hub_state": await self._api.get_hub_state(hub_id, lane=LANE_INTERACTIVE),
+                "devices": await self._api.get_hub_devices(hub_id, lane=LANE_INTERACTIVE),
+                "device_states": await self._api.get_device_states(hub_id, lane=LANE_INTERACTIVE),
+            }
+        except ConneeAlarmApiError as err:
+            # Setup will run the first refresh itself
+            _LOGGER.debug("No first snapshot for hub %s: %s", hub_id, err)
+
+        self.hass.data.setdefault(DATA_HANDOVER, {})[self._device_id] = {
+            "api": self._api,
+            "hub_id": hub_id,
+            "hubs": self._hubs,
+            "snapshot": snapshot,
+            "logged_in_at": self._logged_in_at,
+            "created_at": datetime.now(),
+        }
+
     async def async_step_select_hub(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
@@ -112,6 +168,7 @@ class ConneeAlarmConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             hub_id = user_input[CONF_HUB_ID]
             hub = next((h for h in self._hubs if h.get("id") == hub_id), self._hubs[0])
+            await self._async_prepare_handover(hub_id)
             
             return self.async_create_entry(
                 title=f"Connee Alarm - {hub.get('name', 'Hub')}",
@@ -134,3 +191,42 @@ class ConneeAlarmConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 {vol.Required(CONF_HUB_ID): vol.In(hub_options)}
             ),
         )
+
+
+class ConneeAlarmOptionsFlow(config_entries.OptionsFlow):
+    """Handle Connee Alarm options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry):
+        """Initialize."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_STALE_LIMIT,
+                        default=self._entry.options.get(CONF_STALE_LIMIT, DEFAULT_STALE_LIMIT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_EXTERNAL_STATISTICS,
+                        default=self._entry.options.get(CONF_EXTERNAL_STATISTICS, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_LONG_POLL,
+                        default=self._entry.options.get(CONF_LONG_POLL, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_HEDGED_READS,
+                        default=self._entry.options.get(CONF_HEDGED_READS, False),
+                    ): bool,
+                }
+            ),
+        )
@@ -1,4 +1,7 @@
 """Constants for Connee Alarm integration."""
+from functools import lru_cache
+from typing import Iterable
+
 DOMAIN = "ajax"
 MANUFACTURER = "Ajax Systems by Connee"
 VERSION = "2.1.0"  # Used in User-Agent header
@@ -8,14 +11,103 @@ CONF_HUB_ID = "hub_id"
 CONF_DEVICE_ID = "device_id"
 CONF_POLLING_INTERVAL = "polling_interval"
 
+# Options
+CONF_STALE_LIMIT = "stale_limit"
+CONF_EXTERNAL_STATISTICS = "external_statistics"
+CONF_LONG_POLL = "long_poll"
+CONF_HEDGED_READS = "hedged_reads"
+
 # Defaults
 DEFAULT_POLLING_INTERVAL = 5
 DEFAULT_SCAN_INTERVAL = 10
+DEFAULT_STALE_LIMIT = 300  # seconds an endpoint may be served from its last good value
+
+# Endpoints (coordinator.stale keys) the hub and the device entities are fed by
+HUB_ENDPOINTS = ("hub_state",)
+DEVICE_ENDPOINTS = ("devices", "device_states")
 
 # API - Connee Gateway
 CONNEE_GATEWAY_URL = "https://hmxxkxzkovgyzqmrzapz.supabase.co/functions/v1/ajax-api"
 TOKEN_REFRESH_INTERVAL = 600
 
+# Process-wide gateway scheduler shared by every config entry (hass.data key)
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+GATEWAY_MAX_CONCURRENT = 4  # requests in flight across all entries; the rest queue
+GATEWAY_COMMAND_RESERVED = 1  # of those, slots only commands may use
+
+# Request lanes of the gateway scheduler: a free slot goes to the lowest lane waiting
+LANE_COMMAND = 0  # arm/disarm, valve and switch commands
+LANE_INTERACTIVE = 1  # login, config flow and reads a user is waiting on
+LANE_POLL = 2  # background polls
+LOGIN_SPACING = 2.0  # seconds between two logins of different entries
+LOGIN_JITTER = 1.0  # random extra seconds added to each login spacing
+POLL_PHASE_JITTER = 0.5  # random seconds added to each poll phase
+
+# Long-poll mode: device states arrive as they change, the rest is polled less often
+LONG_POLL_TIMEOUT = 25  # seconds the gateway holds a long-poll without changes
+LONG_POLL_SCAN_INTERVAL = 30  # seconds between hub/catalog polls while long-polling
+LONG_POLL_RETRY_DELAY = 10  # seconds before retrying a failed long-poll
+LONG_POLL_MAX_FAILURES = 3  # consecutive failures before falling back to fixed polling
+LONG_POLL_RESUME_DELAY = 600  # seconds of fixed polling before trying long-poll again
+LONG_POLL_MIN_CYCLE = 1  # seconds; guards against a gateway answering at once every time
+
+# Gateway reads of a fixed poll cycle (their JSON decode is timed as a poll phase)
+POLL_ACTIONS = frozenset(("get-hub", "get-hub-devices", "get-all-device-states"))
+
+# Hedged reads (hedged_reads option): a read slower than the p95 of its action gets a twin
+HEDGED_ACTIONS = POLL_ACTIONS
+HEDGE_WINDOW = 200  # latest latencies per action the p95 is taken from
+HEDGE_MIN_SAMPLES = 20  # no hedging until an action has this many latencies
+HEDGE_MIN_DELAY = 0.5  # seconds; a read is never hedged sooner than this
+HEDGE_MAX_RATIO = 0.05  # hedges per read, at most (bounds the extra gateway load)
+HEDGE_BURST = 2  # hedges that may be sent back to back
+
+# Firmware/hardware metadata (update entities) is polled on its own slow cadence
+METADATA_SCAN_INTERVAL = 6 * 3600  # seconds
+
+# Last good snapshot persisted to .storage so setup does not wait on the gateway
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_STORAGE_KEY = f"{DOMAIN}.snapshot.{{}}"
+SNAPSHOT_SAVE_DELAY = 60  # seconds, coalesces writes across polls
+
+# Open hour of the external statistics, so a reload or restart within the hour
+# continues it instead of importing a row holding only the later samples
+STATISTICS_STORAGE_VERSION = 1
+STATISTICS_STORAGE_KEY = f"{DOMAIN}.statistics.{{}}"
+
+# Backoff state of every account/installation persisted so restarts honour it
+DATA_BACKOFF = f"{DOMAIN}_backoff"
+BACKOFF_STORAGE_VERSION = 1
+BACKOFF_STORAGE_KEY = f"{DOMAIN}.backoff"
+BACKOFF_SAVE_DELAY = 1  # seconds; short, a restart loop must not lose the state
+# Logins allowed within LOGIN_STORM_WINDOW before backing off. The window equals
+# TOKEN_REFRESH_INTERVAL, so normal operation logs in about once per window (token
+# refresh), twice with a forced re-login or a token error. Each setup (restart or
+# reload) logs in up to twice: at setup and on the first refresh. The limit leaves
+# room for those plus three or four reloads; a restart loop still reaches it within a
+# few iterations.
+LOGIN_STORM_LIMIT = 10
+LOGIN_STORM_WINDOW = 600  # seconds
+
+# Logged-in client, hub list and first snapshot handed from the config flow to entry setup
+# (hass.data key, entries keyed by device_id; ignored once older than the TTL)
+DATA_HANDOVER = f"{DOMAIN}_handover"
+HANDOVER_TTL = 300  # seconds
+
+# Dispatcher signal fired when new devices appear on the hub (formatted with entry_id)
+SIGNAL_NEW_DEVICES = f"{DOMAIN}_new_devices_{{}}"
+# Dispatcher signal fired when a config entry is unloaded (formatted with entry_id):
+# closes the websocket subscriptions to its coordinator
+SIGNAL_ENTRY_UNLOADED = f"{DOMAIN}_entry_unloaded_{{}}"
+
+# Bus events fired after each publish for device transitions and arm state changes
+EVENT_DEVICE = f"{DOMAIN}_device_event"
+EVENT_ARM = f"{DOMAIN}_arm_event"
+
+# Words of the hub arm states the panel maps (ARMED, DISARMED_NIGHT_MODE_ON, PARTIAL, ...):
+# an arm-hub answer without one (e.g. {"state": "ok"}) is an acknowledgement, not a state
+ARM_STATE_TOKENS = ("ARM", "PARTIAL", "NIGHT")
+
 # Connee Logo URL for entity_picture (GitHub raw)
 CONNEE_LOGO_URL = "https://raw.githubusercontent.com/conneehome/ajax/main/logo.png"
 
@@ -280,6 +372,7 @@ DEVICE_CLASS_MAP = {
     "MotionCamFibra": "motion",
     "DualCurtain Outdoor": "motion",
     "DualCurtainOutdoor": "motion",
+    "DualCurtainOutdoorPhod": "motion",
     "Superior MotionProtect": "motion",
     "SuperiorMotionProtect": "motion",
 
@@ -330,7 +423,7 @@ DEVICE_CLASS_MAP = {
 # ─────────────────────────────────────────────────────────────────────────────
 # BATTERY-POWERED DEVICES (create battery sensor)
 # ─────────────────────────────────────────────────────────────────────────────
-BATTERY_DEVICES = [
+BATTERY_DEVICES = frozenset([
     # Door/Window
     "DoorProtect", "DoorProtect Plus", "DoorProtectPlus",
     "DoorProtect G3", "DoorProtectG3",
@@ -369,12 +462,12 @@ BATTERY_DEVICES = [
     "LifeQuality",
     # ReX (backup battery)
     "ReX", "ReX 2", "ReX2",
-]
+])
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TEMPERATURE-CAPABLE DEVICES (create temperature sensor)
 # ─────────────────────────────────────────────────────────────────────────────
-TEMPERATURE_DEVICES = [
+TEMPERATURE_DEVICES = frozenset([
     "FireProtect", "FireProtect Plus", "FireProtectPlus",
     "FireProtect 2", "FireProtect2",
     "FireProtect 2 (Heat)", "FireProtect 2 (Smoke)", "FireProtect 2 (Heat/Smoke)", "FireProtect 2 (Heat/Smoke/CO)",
@@ -382,4 +475,128 @@ TEMPERATURE_DEVICES = [
     "FireProtect 2 RB (Heat)", "FireProtect 2 RB (Smoke)", "FireProtect 2 RB (Heat/Smoke)", "FireProtect 2 RB (Heat/Smoke/CO)",
     "FireProtect Fibra", "FireProtectFibra",
     "LifeQuality",
-]
+])
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TYPE ALIASES (raw API spelling -> catalog spelling, applied before cleanup)
+# ─────────────────────────────────────────────────────────────────────────────
+DEVICE_TYPE_ALIASES = {
+    "DoorProtectG3": "DoorProtect",
+    "DoorProtect G3": "DoorProtect",
+    "FireProtect2": "FireProtect 2",
+    "KeyPadTouchscreen": "KeyPadTouchScreen",
+    "ReX2": "ReX 2",
+}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STATE FIELD PROJECTION (hot fields polled every cycle)
+# Fields read by the entity states, summary sensors, events and websocket views.
+# Polls ask the gateway for these only; the full payload (signalLevel, ...:
+# attributes) is fetched on the catalog tier, every FULL_STATES_INTERVAL and
+# whenever the device list changes. Firmware fields are polled by the metadata
+# coordinator (METADATA_STATE_FIELDS).
+# Keep in sync with the keys the entities read.
+# ─────────────────────────────────────────────────────────────────────────────
+COMMON_STATE_FIELDS = frozenset([
+    # device id variants resolved by models.decode_device_states
+    "deviceId", "id", "device_id", "device",
+    "online", "isOnline", "tampered",
+    "active", "triggered", "alarm", "state", "alarmState",
+    "reedClosed", "leakDetected", "smokeAlarmDetected", "temperatureAlarmDetected", "glassBreakDetected",
+    "batteryChargeLevelPercentage", "batteryCharge", "batteryLevel", "battery", "batteryPercent",
+    "temperature", "temp",
+    "lastEventTime", "updatedAt", "timestamp",
+])
+
+PLATFORM_STATE_FIELDS = {
+    "sensor": frozenset([
+        "leakState", "floodDetected", "waterDetected", "openState", "valveState",
+    ]),
+    "binary_sensor": frozenset([
+        "openState", "contactState", "magneticState",
+        "leak", "floodDetected", "flood", "waterDetected", "water", "moistureDetected",
+        "leakState", "sensorState",
+    ]),
+    "switch": frozenset([
+        "switchState", "powerState", "relayState", "on",
+        "power", "voltage", "current", "energy",
+    ]),
+    "valve": frozenset([
+        "valveState", "motorState",
+    ]),
+}
+
+FULL_STATES_INTERVAL = 900  # seconds between full (unprojected) device-state fetches
+
+# Device-state fields of the metadata poll (update entities)
+METADATA_STATE_FIELDS = (
+    "deviceId", "id", "device_id", "device",
+    "firmware", "firmwareVersion", "firmware_version", "latestFirmwareVersion",
+    "hwVersion", "bootVersion",
+)
+
+
+def state_projection(platforms: Iterable[str]) -> tuple[str, ...]:
+    """Return the sorted device-state fields the given platforms' entities read."""
+    fields = set(COMMON_STATE_FIELDS)
+    for platform in platforms:
+        fields.update(PLATFORM_STATE_FIELDS.get(str(platform), ()))
+    return tuple(sorted(fields))
+
+
+# Distinct raw type strings seen in practice are a few dozen; the bound only
+# protects against a misbehaving gateway sending garbage
+NORMALIZE_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_device_type(raw: str) -> str:
+    """Return the catalog spelling of a raw device type string from the API."""
+    raw = str(raw).strip()
+    raw = DEVICE_TYPE_ALIASES.get(raw, raw)
+
+    # Normalize common suffixes/variants from API (e.g. "DoorProtect Jeweller")
+    raw_clean = raw.replace("(", " ").replace(")", " ").replace("-", " ")
+    raw_clean = " ".join(raw_clean.split())
+    raw_lower = raw_clean.lower()
+
+    if raw_lower.startswith("doorprotect"):
+        if "fibra" in raw_lower:
+            return "DoorProtect Fibra"
+        if "plus" in raw_lower:
+            return "DoorProtect Plus"
+        if "g3" in raw_lower:
+            return "DoorProtect G3"
+        return "DoorProtect"
+
+    return raw_clean
+
+
+def validate_device_catalog() -> list[str]:
+    """Return consistency issues in the device catalog (empty list when consistent)."""
+    issues = []
+
+    # 1. Check that all binary_sensor types have a DEVICE_CLASS_MAP entry
+    for dtype, platform in DEVICE_TYPE_MAP.items():
+        if platform == "binary_sensor" and dtype not in DEVICE_CLASS_MAP:
+            issues.append(f"binary_sensor '{dtype}' missing from DEVICE_CLASS_MAP")
+
+    # 2. Check that all battery devices exist in DEVICE_TYPE_MAP
+    for dtype in sorted(BATTERY_DEVICES - DEVICE_TYPE_MAP.keys()):
+        issues.append(f"BATTERY_DEVICES entry '{dtype}' not in DEVICE_TYPE_MAP")
+
+    # 3. Check that all temperature devices exist in DEVICE_TYPE_MAP
+    for dtype in sorted(TEMPERATURE_DEVICES - DEVICE_TYPE_MAP.keys()):
+        issues.append(f"TEMPERATURE_DEVICES entry '{dtype}' not in DEVICE_TYPE_MAP")
+
+    # 4. Check that temperature devices are NOT hub types
+    for dtype in sorted(TEMPERATURE_DEVICES):
+        if DEVICE_TYPE_MAP.get(dtype) == "alarm_control_panel":
+            issues.append(f"TEMPERATURE_DEVICES entry '{dtype}' is a hub (alarm_control_panel)")
+
+    # 5. Aliases must resolve to catalog entries
+    for alias, target in DEVICE_TYPE_ALIASES.items():
+        if target not in DEVICE_TYPE_MAP:
+            issues.append(f"DEVICE_TYPE_ALIASES '{alias}' -> '{target}' not in DEVICE_TYPE_MAP")
+
+    return issues
@@ -2,14 +2,59 @@
 import asyncio
 import logging
 from datetime import timedelta, datetime
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Callable, Dict
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from .api import ConneeAlarmApiClient
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
+from .events import arm_event
+from .models import (
+    ConneeAlarmApiError,
+    Device,
+    DeviceState,
+    PayloadError,
+    decode_device_states,
+    decode_devices,
+)
+from .store import DeviceStateStore
+from .timing import (
+    PHASE_AUTH,
+    PHASE_CYCLE,
+    PHASE_FAN_OUT,
+    PHASE_GET_DEVICES,
+    PHASE_GET_HUB,
+    PHASE_GET_STATES,
+    PHASE_STATE_MAP,
+)
+from .const import (
+    DOMAIN,
+    ARM_STATE_TOKENS,
+    CONF_STALE_LIMIT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_LIMIT,
+    EVENT_ARM,
+    EVENT_DEVICE,
+    FULL_STATES_INTERVAL,
+    LANE_INTERACTIVE,
+    LONG_POLL_MAX_FAILURES,
+    LONG_POLL_MIN_CYCLE,
+    LONG_POLL_RESUME_DELAY,
+    LONG_POLL_RETRY_DELAY,
+    LONG_POLL_SCAN_INTERVAL,
+    SIGNAL_NEW_DEVICES,
+    SNAPSHOT_STORAGE_VERSION,
+    SNAPSHOT_STORAGE_KEY,
+    SNAPSHOT_SAVE_DELAY,
+)
+
+if TYPE_CHECKING:
+    from .profiler import PollProfiler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,6 +62,16 @@ _LOGGER = logging.getLogger(__name__)
 FORCE_RELOGIN_INTERVAL_HOURS = 12
 
 
+def _has_arm_state(hub_state: Any) -> bool:
+    """Return True if a hub payload carries a recognizable arm state."""
+    if not isinstance(hub_state, dict):
+        return False
+    arm_state = hub_state.get("armState", hub_state.get("state"))
+    return isinstance(arm_state, str) and any(
+        token in arm_state.upper() for token in ARM_STATE_TOKENS
+    )
+
+
 class ConneeAlarmDataCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Connee Alarm data."""
 
@@ -29,82 +84,511 @@ class ConneeAlarmDataCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
         )
         self.api = api
+        # Shared with the API client, which records the JSON decode phase and the
+        # per-request gateway metrics
+        self.timings = api.timings
+        self.metrics = api.metrics
         self.hub_id = hub_id
         self._last_forced_login: datetime | None = None
         self._consecutive_failures = 0
+        self._known_device_ids: set[str] | None = None
+        # Hub state the last arm event was computed against
+        self._event_hub: Dict[str, Any] | None = None
+        # Seconds into the update interval at which this entry polls, assigned by the
+        # scheduler shared with the other entries (None: Home Assistant's schedule)
+        self.poll_phase: float | None = None
+        if api.scheduler is not None:
+            self.poll_phase = api.scheduler.async_poll_phase(
+                self.config_entry.entry_id, DEFAULT_SCAN_INTERVAL
+            )
+        # Catalog and device states, updated in place on every poll; self.data only
+        # holds the hub state
+        self.state_store = DeviceStateStore()
+        # Device-state fields polled every cycle (None: full payloads), set from the
+        # forwarded platforms; the full payload is fetched on the catalog tier
+        self.state_fields: tuple[str, ...] | None = None
+        self._full_states_at: datetime | None = None
+        self._full_states_ids: set[str] = set()
+        # Long-poll mode (long_poll option): device states arrive from a chained
+        # long-poll task, fixed polling only refreshes hub state and catalog
+        self.long_poll_active = False
+        self._long_poll_task: asyncio.Task | None = None
+        self._long_poll_resume: Callable[[], None] | None = None
+        # Set by the ajax.profile service for the duration of a profiling session
+        self.profiler: "PollProfiler | None" = None
+        self.hubs: list = []
+        # Staleness marker: True while data comes from the persisted snapshot
+        self.from_cache = False
+        self.snapshot_saved_at: datetime | None = None
+        # Last good value of each endpoint, served while a call fails: key -> (fetched_at, value).
+        # The catalog and the device states have no value here: the store keeps serving them.
+        self._last_good: Dict[str, tuple[datetime, Any]] = {}
+        # Endpoints currently served from their last good value: key -> fetched_at
+        self.stale: Dict[str, datetime] = {}
+        self._snapshot_store: Store = Store(
+            hass,
+            SNAPSHOT_STORAGE_VERSION,
+            SNAPSHOT_STORAGE_KEY.format(self.config_entry.entry_id),
+        )
+
+    async def async_load_snapshot(self) -> bool:
+        """Seed coordinator data from the last good snapshot, if any."""
+        try:
+            snapshot = await self._snapshot_store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Could not load cached snapshot: %s", err)
+            return False
+
+        if not snapshot or snapshot.get("hub_id") != self.hub_id or not snapshot.get("data"):
+            return False
+
+        # Decode again: snapshots written by older versions hold raw payloads
+        data = snapshot["data"]
+        try:
+            devices = decode_devices(data.get("devices", []))
+            device_states = decode_device_states(list(data.get("device_states", {}).values()))
+        except PayloadError as err:
+            _LOGGER.warning("Ignoring malformed cached snapshot: %s", err)
+            return False
+
+        self.state_store.set_devices(devices)
+        self.state_store.apply_states(device_states)
+        self.data = {"hub_state": data.get("hub_state", {})}
+        self.hubs = snapshot.get("hubs") or []
+        self.from_cache = True
+        saved_at = snapshot.get("saved_at")
+        self.snapshot_saved_at = datetime.fromisoformat(saved_at) if saved_at else None
+        if self.snapshot_saved_at:
+            self._last_good = {
+                "hub_state": (self.snapshot_saved_at, self.data["hub_state"]),
+                "devices": (self.snapshot_saved_at, None),
+                "device_states": (self.snapshot_saved_at, None),
+            }
+        _LOGGER.info(
+            "Loaded cached snapshot for hub %s (saved at %s, %d devices)",
+            self.hub_id,
+            saved_at,
+            len(devices),
+        )
+        return True
+
+    @callback
+    def async_seed_from_flow(
+        self, hubs: list, snapshot: Dict[str, Any] | None, logged_in_at: datetime | None
+    ) -> None:
+        """Seed session and data from the config flow that just created the entry."""
+        self.hubs = hubs
+        # The flow's login counts as the periodic re-login
+        self._last_forced_login = logged_in_at
+        if not snapshot:
+            return
+
+        self._store_good_value("hub_state", snapshot["hub_state"])
+        self._store_good_value("devices")
+        self._store_good_value("device_states")
+        self.state_store.set_devices(snapshot["devices"])
+        self.state_store.apply_states(snapshot["device_states"])
+        self.data = {"hub_state": snapshot["hub_state"]}
+        if snapshot["devices"]:
+            self._snapshot_store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _snapshot_data(self) -> Dict[str, Any]:
+        """Return the snapshot to persist (called by the store when writing)."""
+        self.snapshot_saved_at = datetime.now()
+        return {
+            "hub_id": self.hub_id,
+            "saved_at": self.snapshot_saved_at.isoformat(),
+            "hubs": self.hubs,
+            "data": {
+                "hub_state": self.data.get("hub_state", {}),
+                "devices": self.state_store.devices(),
+                "device_states": self.state_store.states(),
+            },
+        }
+
+    @property
+    def devices(self) -> list[Device]:
+        """Return the catalog payloads, built from the state store."""
+        return self.state_store.devices()
+
+    def device_state(self, device_id: str) -> DeviceState:
+        """Return the state payload of a device ({} if it has none yet)."""
+        return self.state_store.state(device_id)
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh data, timed, and under cProfile while a profiling session is active.
+
+        Wraps the whole cycle including the listener (entity) fan-out. When no
+        profiling session is active the only extra cost is the attribute check.
+        """
+        profiler = self.profiler
+        profiling = profiler is not None and profiler.enable()
+        try:
+            with self.timings.measure(PHASE_CYCLE):
+                await super()._async_refresh(*args, **kwargs)
+            self.metrics.poll(self.timings.get(PHASE_CYCLE).last / 1000)
+        finally:
+            if profiling:
+                profiler.disable()
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh on this entry's poll phase.
+
+        Home Assistant schedules at int(now) + _microsecond + interval; choosing
+        _microsecond so that lands on the phase keeps every entry on its own slot
+        of the interval (the shift is at most half an interval either way).
+        """
+        if self.poll_phase is not None and self.update_interval:
+            interval = self.update_interval.total_seconds()
+            base = int(self.hass.loop.time()) + interval
+            self._microsecond = (self.poll_phase - base + interval / 2) % interval - interval / 2
+        super()._schedule_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify entities, timing the fan-out, then fire transition events."""
+        self.metrics.fan_out(len(self._listeners))
+        with self.timings.measure(PHASE_FAN_OUT):
+            super().async_update_listeners()
+        self._async_fire_events()
+
+    @callback
+    def _async_fire_events(self) -> None:
+        """Fire ajax_device_event / ajax_arm_event for changes since the last publish.
+
+        Runs after the entities are updated, so automations triggered by an event
+        see entity states that already agree with it. Device transitions were
+        recorded by the state store while it was updated.
+        """
+        source = {"entry_id": self.config_entry.entry_id, "hub_id": self.hub_id}
+        hub_state = self.data.get("hub_state", {}) if self.data else None
+        baseline, self._event_hub = self._event_hub, hub_state
+        if baseline is not None and hub_state is not None:
+            event_data = arm_event(baseline, hub_state)
+            if event_data is not None:
+                self.hass.bus.async_fire(EVENT_ARM, {**source, **event_data})
+        for event_data in self.state_store.pop_events():
+            self.hass.bus.async_fire(EVENT_DEVICE, {**source, **event_data})
+
+    @callback
+    def async_sync_devices(self) -> None:
+        """Diff the device id set and add/remove entities for enrolment changes.
+
+        Registered as a coordinator listener once the platforms are set up, so it
+        runs after every refresh with the new data already published.
+        """
+        if not self.data:
+            return
+        store = self.state_store
+        current_ids = set(store.ids)
+
+        # First call only records the baseline created by the platform setups
+        if self._known_device_ids is None:
+            self._known_device_ids = current_ids
+            return
+
+        # An empty catalog is far more likely a failed call than a hub with no devices:
+        # never wipe the registry because of it
+        if not current_ids:
+            return
+
+        added = current_ids - self._known_device_ids
+        removed = self._known_device_ids - current_ids
+        self._known_device_ids = current_ids
+
+        if added:
+            new_devices = [store.device(store.index[device_id]) for device_id in added]
+            _LOGGER.info("New devices on hub %s: %s", self.hub_id, sorted(added))
+            async_dispatcher_send(
+                self.hass,
+                SIGNAL_NEW_DEVICES.format(self.config_entry.entry_id),
+                new_devices,
+            )
+
+        if removed:
+            _LOGGER.info("Devices removed from hub %s: %s", self.hub_id, sorted(removed))
+            self._async_remove_devices(removed)
+
+    @callback
+    def _async_remove_devices(self, device_ids: set[str]) -> None:
+        """Detach removed devices (and their entities) from the device registry."""
+        device_registry = dr.async_get(self.hass)
+        for device_id in device_ids:
+            device = device_registry.async_get_device(identifiers={(DOMAIN, device_id)})
+            if device is None:
+                continue
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=self.config_entry.entry_id
+            )
+
+    async def async_apply_arm_result(self, response: Dict[str, Any]) -> None:
+        """Publish the hub state after an arm/disarm without re-pulling the catalog.
+
+        Uses the arm-hub response when it carries the new state, otherwise a single
+        get-hub read. Falls back to a full refresh if neither does.
+        """
+        hub_state = response if _has_arm_state(response) else None
+        if hub_state is None:
+            try:
+                hub_state = await self.api.get_hub_state(self.hub_id, lane=LANE_INTERACTIVE)
+            except ConneeAlarmApiError as err:
+                _LOGGER.debug("get-hub after arm command failed: %s", err)
+
+        if not self.data or not _has_arm_state(hub_state):
+            await self.async_request_refresh()
+            return
+
+        _LOGGER.debug(
+            "Hub %s state after arm command: %s",
+            self.hub_id,
+            hub_state.get("armState", hub_state.get("state")),
+        )
+        self.async_set_updated_data({
+            **self.data,
+            "hub_state": {**self.data.get("hub_state", {}), **hub_state},
+        })
+
+    @callback
+    def async_start_long_poll(self) -> None:
+        """Start chaining long-polls for device states (long_poll option)."""
+        self._long_poll_resume = None
+        if self._long_poll_task is not None:
+            return
+        self._long_poll_task = self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_long_poll_loop(),
+            f"{DOMAIN} long-poll {self.config_entry.entry_id}",
+        )
+
+    @callback
+    def async_stop_long_poll(self) -> None:
+        """Stop the long-poll loop and any pending resume."""
+        if self._long_poll_resume is not None:
+            self._long_poll_resume()
+            self._long_poll_resume = None
+        if self._long_poll_task is not None:
+            self._long_poll_task.cancel()
+            self._long_poll_task = None
+        self._set_long_poll_active(False)
+
+    def _set_long_poll_active(self, active: bool) -> None:
+        """Switch fixed polling between the long-poll and the normal cadence."""
+        if active == self.long_poll_active:
+            return
+        self.long_poll_active = active
+        seconds = LONG_POLL_SCAN_INTERVAL if active else DEFAULT_SCAN_INTERVAL
+        self.update_interval = timedelta(seconds=seconds)
+
+    async def _async_long_poll_loop(self) -> None:
+        """Chain long-polls back to back; fall back to fixed polling when they fail."""
+        loop = self.hass.loop
+        cursor: str | None = None
+        failures = 0
+        try:
+            while True:
+                started = loop.time()
+                try:
+                    cursor, device_states = await self.api.wait_device_states(
+                        self.hub_id, cursor, self.state_fields
+                    )
+                except ConneeAlarmApiError as err:
+                    failures += 1
+                    if failures >= LONG_POLL_MAX_FAILURES:
+                        _LOGGER.warning(
+                            "Long-poll failed %d times (%s); fixed polling for the next %ds",
+                            failures,
+                            err,
+                            LONG_POLL_RESUME_DELAY,
+                        )
+                        self._long_poll_resume = async_call_later(
+                            self.hass, LONG_POLL_RESUME_DELAY, self._async_resume_long_poll
+                        )
+                        return
+                    _LOGGER.debug("Long-poll failed (%s), retrying in %ds", err, LONG_POLL_RETRY_DELAY)
+                    await asyncio.sleep(LONG_POLL_RETRY_DELAY)
+                    continue
+
+                failures = 0
+                if device_states is not None:
+                    self._async_publish_states(device_states)
+                if cursor is None:
+                    _LOGGER.warning("Gateway does not support long-poll; using fixed polling")
+                    return
+                self._set_long_poll_active(True)
+
+                elapsed = loop.time() - started
+                if elapsed < LONG_POLL_MIN_CYCLE:
+                    await asyncio.sleep(LONG_POLL_MIN_CYCLE - elapsed)
+        finally:
+            self._long_poll_task = None
+            self._set_long_poll_active(False)
+
+    @callback
+    def _async_resume_long_poll(self, _now: datetime) -> None:
+        """Try long-polling again after a fixed-polling period."""
+        self.async_start_long_poll()
+
+    @callback
+    def _async_publish_states(self, device_states: list[DeviceState]) -> None:
+        """Publish long-polled device states.
+
+        Not async_set_updated_data: that reschedules the next refresh, so states
+        changing more often than the interval would postpone the hub/catalog poll
+        indefinitely.
+        """
+        self._store_good_value("device_states")
+        if not self.data:
+            return
+        with self.timings.measure(PHASE_STATE_MAP):
+            self.state_store.apply_states(device_states, merge=self.state_fields is not None)
+        self.last_update_success = True
+        self.async_update_listeners()
+
+    def _state_projection(self, device_ids: list[str]) -> tuple[str, ...] | None:
+        """Return the fields to poll, or None when the full payload is due.
+
+        The full payload is fetched on the first poll, every FULL_STATES_INTERVAL
+        and whenever the device list changed since the last full fetch.
+        """
+        if self.state_fields is None or not self.data or self._full_states_at is None:
+            return None
+        if (datetime.now() - self._full_states_at).total_seconds() > FULL_STATES_INTERVAL:
+            return None
+        if len(device_ids) != len(self._full_states_ids) or any(
+            device_id not in self._full_states_ids for device_id in device_ids
+        ):
+            return None
+        return self.state_fields
+
+    def _last_good_value(self, key: str, err: ConneeAlarmApiError) -> Any:
+        """Return the last good value of a failed endpoint, or raise once it is too old."""
+        last = self._last_good.get(key)
+        if last is None:
+            raise UpdateFailed(f"Error fetching data: {err}") from err
+
+        fetched_at, value = last
+        age = (datetime.now() - fetched_at).total_seconds()
+        limit = self.config_entry.options.get(CONF_STALE_LIMIT, DEFAULT_STALE_LIMIT)
+        if age > limit:
+            raise UpdateFailed(
+                f"Error fetching data: {err} (last good {key} is {int(age)}s old)"
+            ) from err
+
+        _LOGGER.debug("%s; serving last good %s (%ds old)", err, key, age)
+        self.stale[key] = fetched_at
+        return value
+
+    def stale_attributes(self, endpoints: tuple[str, ...]) -> Dict[str, str]:
+        """Return the staleness marker of an entity fed by these endpoints ({} when live)."""
+        fetched = [self.stale[key] for key in endpoints if key in self.stale]
+        return {"stale_since": min(fetched).isoformat()} if fetched else {}
+
+    def _store_good_value(self, key: str, value: Any = None) -> None:
+        """Record a successful endpoint value (None for the ones the state store keeps)."""
+        self._last_good[key] = (datetime.now(), value)
+        self.stale.pop(key, None)
+
+    async def _async_ensure_auth(self) -> None:
+        """Check auth state and (re-)login when the session is due."""
+        # Check if auth has permanently failed
+        if self.api._auth_failed:
+            _LOGGER.error("Authentication permanently failed. Raising ConfigEntryAuthFailed.")
+            raise ConfigEntryAuthFailed(
+                "Autenticazione fallita. Ricarica l'integrazione o verifica le credenziali."
+            )
         
+        # Force re-login every N hours as a safety measure against stale sessions
+        now = datetime.now()
+        should_force_relogin = (
+            self._last_forced_login is None or
+            (now - self._last_forced_login).total_seconds() > FORCE_RELOGIN_INTERVAL_HOURS * 3600
+        )
+        
+        if should_force_relogin:
+            _LOGGER.info("Forcing periodic re-login (every %d hours)", FORCE_RELOGIN_INTERVAL_HOURS)
+            login_success = await self.api.refresh_token()
+            if login_success:
+                self._last_forced_login = now
+                _LOGGER.info("Periodic re-login successful")
+            else:
+                _LOGGER.warning("Periodic re-login failed, will retry on next update")
+        
+        # Refresh token if expired
+        if self.api.token_expires:
+            if datetime.now() > self.api.token_expires:
+                await self.api.refresh_token()
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Fetch data from API."""
         try:
-            # Check if auth has permanently failed
-            if self.api._auth_failed:
-                _LOGGER.error("Authentication permanently failed. Raising ConfigEntryAuthFailed.")
-                raise ConfigEntryAuthFailed(
-                    "Autenticazione fallita. Ricarica l'integrazione o verifica le credenziali."
-                )
-            
-            # Force re-login every N hours as a safety measure against stale sessions
-            now = datetime.now()
-            should_force_relogin = (
-                self._last_forced_login is None or
-                (now - self._last_forced_login).total_seconds() > FORCE_RELOGIN_INTERVAL_HOURS * 3600
-            )
-            
-            if should_force_relogin:
-                _LOGGER.info("Forcing periodic re-login (every %d hours)", FORCE_RELOGIN_INTERVAL_HOURS)
-                login_success = await self.api.refresh_token()
-                if login_success:
-                    self._last_forced_login = now
-                    _LOGGER.info("Periodic re-login successful")
-                else:
-                    _LOGGER.warning("Periodic re-login failed, will retry on next update")
-            
-            # Refresh token if expired
-            if self.api.token_expires:
-                if datetime.now() > self.api.token_expires:
-                    await self.api.refresh_token()
+            with self.timings.measure(PHASE_AUTH):
+                await self._async_ensure_auth()
 
-            # Get hub state
-            hub_state = await self.api.get_hub_state(self.hub_id)
-            
-            # Check for auth failure in response
-            if isinstance(hub_state, dict) and hub_state.get("auth_failed"):
-                self._consecutive_failures += 1
-                if self._consecutive_failures >= 3:
-                    raise ConfigEntryAuthFailed(
-                        "Autenticazione fallita dopo 3 tentativi. Ricarica l'integrazione."
-                    )
+            # Get hub state. A failed call keeps serving the last good value of that
+            # endpoint until it exceeds the staleness limit, so gateway blips and
+            # backoff windows do not flip every entity back and forth.
+            try:
+                with self.timings.measure(PHASE_GET_HUB):
+                    hub_state = await self.api.get_hub_state(self.hub_id)
+            except ConneeAlarmApiError as err:
+                # Check for auth failure in response
+                if err.auth_failed:
+                    self._consecutive_failures += 1
+                    if self._consecutive_failures >= 3:
+                        raise ConfigEntryAuthFailed(
+                            "Autenticazione fallita dopo 3 tentativi. Ricarica l'integrazione."
+                        ) from err
+                hub_state = self._last_good_value("hub_state", err)
             else:
                 self._consecutive_failures = 0  # Reset on success
+                self._store_good_value("hub_state", hub_state)
             
-            # Get devices
-            devices = await self.api.get_hub_devices(self.hub_id)
-            
-            # Get device states
-            device_states = await self.api.get_device_states(self.hub_id)
-            
-            # Map device states by ID (normalize to string to avoid mismatches)
-            states_map: Dict[str, Any] = {}
-            if isinstance(device_states, list):
-                for state in device_states:
-                    raw_id = (
-                        state.get("deviceId")
-                        or state.get("id")
-                        or state.get("device_id")
-                        or (state.get("device") or {}).get("deviceId")
-                        or (state.get("device") or {}).get("id")
-                    )
-                    if raw_id is None:
-                        continue
-                    states_map[str(raw_id)] = state
-
-            return {
-                "hub_state": hub_state,
-                "devices": devices,
-                "device_states": states_map,
-            }
-        except ConfigEntryAuthFailed:
-            raise  # Re-raise auth failures
+            # Get devices. While the call fails the store keeps serving the last catalog
+            # (None here), until it exceeds the staleness limit.
+            try:
+                with self.timings.measure(PHASE_GET_DEVICES):
+                    devices = await self.api.get_hub_devices(self.hub_id)
+            except ConneeAlarmApiError as err:
+                devices = self._last_good_value("devices", err)
+            else:
+                self._store_good_value("devices")
+            device_ids = [d["id"] for d in devices] if devices else self.state_store.ids
+
+            # Get device states, unless the long-poll loop delivers them (straight into
+            # the store). A full payload that is due (catalog tier) is still fetched
+            # here: long-polls are projected.
+            fields = self._state_projection(device_ids)
+            device_states = None
+            if not (self.long_poll_active and self.data and (fields is not None or self.state_fields is None)):
+                try:
+                    with self.timings.measure(PHASE_GET_STATES):
+                        device_states = await self.api.get_device_states(self.hub_id, fields)
+                except ConneeAlarmApiError as err:
+                    device_states = self._last_good_value("device_states", err)
+                else:
+                    self._store_good_value("device_states")
+                    if fields is None:
+                        self._full_states_at = datetime.now()
+                        self._full_states_ids = set(device_ids)
+
+            # Update the store in place once every call is through. An empty catalog is
+            # far more likely a failed call than a hub with no devices: keep the last one.
+            with self.timings.measure(PHASE_STATE_MAP):
+                if devices:
+                    self.state_store.set_devices(devices)
+                if device_states is not None:
+                    self.state_store.apply_states(device_states, merge=fields is not None)
+
+            # Live data from now on; persist it (debounced) for the next startup.
+            # Stale endpoints are not persisted, or they would outlive their age limit.
+            self.from_cache = False
+            if devices and not self.stale:
+                self._snapshot_store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+            return {"hub_state": hub_state}
+        except (ConfigEntryAuthFailed, UpdateFailed):
+            raise  # Re-raise auth failures and stale-limit failures
         except Exception as err:
             raise UpdateFailed(f"Error fetching data: {err}") from err
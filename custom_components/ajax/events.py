@@ -0,0 +1,72 @@
+"""Device and arm transitions fired as bus events after each coordinator publish."""
+from datetime import datetime
+from typing import Any, Dict
+
+
+def is_alarm_state(state: Dict[str, Any]) -> bool:
+    """Same alarm indicators as the "Connee Sensori Allarme" sensor."""
+    return (
+        state.get("active") is True
+        or state.get("triggered") is True
+        or state.get("alarm") is True
+        or str(state.get("state", "")).upper() == "ALARM"
+        or str(state.get("alarmState", "")).upper() == "ALARM"
+        or state.get("reedClosed") is False
+        or state.get("leakDetected") is True
+        or state.get("smokeAlarmDetected") is True
+        or state.get("temperatureAlarmDetected") is True
+        or state.get("glassBreakDetected") is True
+    )
+
+
+# Tracked device conditions (DeviceStateStore columns); a transition fires EVENT_DEVICE
+DEVICE_EVENT_KINDS = ("online", "open", "alarm", "tamper")
+
+# Timestamp fields the gateway may attach to a state (first match wins)
+_SOURCE_TS_KEYS = ("lastEventTime", "updatedAt", "timestamp")
+
+
+def _source_ts(payload: Dict[str, Any], fallback: str) -> str:
+    """Return the payload's own timestamp, or the poll time."""
+    for key in _SOURCE_TS_KEYS:
+        value = payload.get(key)
+        if value:
+            return str(value)
+    return fallback
+
+
+def _arm_state(hub_state: Dict[str, Any]) -> Any:
+    """Return the raw arm state of a hub payload."""
+    return hub_state.get("armState", hub_state.get("state"))
+
+
+def arm_event(old_hub: Dict[str, Any], new_hub: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Return the EVENT_ARM data of a hub state change, or None if the arm state is unchanged."""
+    if old_hub is new_hub or _arm_state(old_hub) == _arm_state(new_hub):
+        return None
+    return {
+        "old": _arm_state(old_hub),
+        "new": _arm_state(new_hub),
+        "source_ts": _source_ts(new_hub, datetime.now().isoformat()),
+    }
+
+
+def device_event(
+    device_id: str,
+    name: str | None,
+    device_type: str,
+    kind: str,
+    old: Any,
+    new: Any,
+    state: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Return the EVENT_DEVICE data of one device transition."""
+    return {
+        "device_id": device_id,
+        "device_name": name,
+        "device_type": device_type,
+        "kind": kind,
+        "old": old,
+        "new": new,
+        "source_ts": _source_ts(state, datetime.now().isoformat()),
+    }
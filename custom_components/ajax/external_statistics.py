@@ -0,0 +1,207 @@
+"""Hourly battery/temperature statistics imported in batches into the recorder.
+
+Optional mode (external_statistics option): the battery and temperature sensors
+lose their state class, so the recorder no longer compiles statistics from their
+state rows, and the coordinator samples are aggregated here instead. Once per
+hour the mean/min/max of every device is imported as an external statistic
+(`ajax:battery_<id>`, `ajax:temperature_<id>`). The partial hour is imported
+when the entry is unloaded and when Home Assistant stops, and persisted: a
+reload or restart within the same hour restores it and keeps accumulating, so
+the next import of that hour's row (an upsert) covers the samples from both
+sides instead of only the later ones.
+
+Only the statistics compile of those sensors is saved: the recorder still
+writes their state rows.
+
+Values the coordinator serves from a failed endpoint's last good data are not
+sampled: they would be recorded as fresh readings.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, PERCENTAGE, UnitOfTemperature
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import DOMAIN, STATISTICS_STORAGE_KEY, STATISTICS_STORAGE_VERSION
+from .store import DeviceStateStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# kind -> (state store reader, unit, display name suffix, coordinator endpoints it reads)
+STATISTIC_KINDS: Dict[
+    str, tuple[Callable[[DeviceStateStore, str], Any], str, str, tuple[str, ...]]
+] = {
+    # The battery level falls back to the catalog payload
+    "battery": (DeviceStateStore.battery_of, PERCENTAGE, "Batteria", ("device_states", "devices")),
+    "temperature": (
+        DeviceStateStore.temperature_of,
+        UnitOfTemperature.CELSIUS,
+        "Temperatura",
+        ("device_states",),
+    ),
+}
+
+
+def _hour_start(now: datetime) -> datetime:
+    """Return the start of the (UTC) hour containing `now`."""
+    return now.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class HourlyStatistics:
+    """Accumulate per-device samples and import one mean/min/max row per hour."""
+
+    def __init__(self, hass: HomeAssistant, coordinator):
+        """Initialize."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._hour: datetime | None = None
+        # statistic_id -> [count, total, min, max]
+        self._buckets: Dict[str, List[float]] = {}
+        # statistic_id -> (name, unit)
+        self._meta: Dict[str, tuple[str, str]] = {}
+        self._store: Store = Store(
+            hass,
+            STATISTICS_STORAGE_VERSION,
+            STATISTICS_STORAGE_KEY.format(coordinator.config_entry.entry_id),
+        )
+
+    async def async_restore(self) -> None:
+        """Continue the hour persisted by the last unload/stop, if it is the current one.
+
+        An earlier hour was imported in full when it was persisted.
+        """
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Could not load the open statistics hour: %s", err)
+            return
+        if not stored:
+            return
+        hour = _hour_start(datetime.now(timezone.utc))
+        if stored.get("hour") != hour.isoformat():
+            return
+        self._hour = hour
+        self._buckets = {statistic_id: list(bucket) for statistic_id, bucket in stored["buckets"].items()}
+        self._meta = {statistic_id: tuple(meta) for statistic_id, meta in stored["meta"].items()}
+        _LOGGER.debug("Restored statistics hour %s (%d series)", stored["hour"], len(self._buckets))
+
+    @callback
+    def async_sample(self) -> None:
+        """Add the current coordinator values (coordinator listener)."""
+        data = self.coordinator.data
+        if not data or not self.coordinator.last_update_success:
+            return
+
+        hour = _hour_start(datetime.now(timezone.utc))
+        if self._hour is not None and hour != self._hour:
+            self.async_flush()
+        self._hour = hour
+
+        # Skip the kinds read from an endpoint served stale (coordinator.stale)
+        kinds = [
+            (kind, extract, unit, label)
+            for kind, (extract, unit, label, endpoints) in STATISTIC_KINDS.items()
+            if not any(endpoint in self.coordinator.stale for endpoint in endpoints)
+        ]
+        if not kinds:
+            return
+
+        store = self.coordinator.state_store
+        for row in store.rows():
+            device_id = store.ids[row]
+            for kind, extract, unit, label in kinds:
+                value = extract(store, device_id)
+                if value is None:
+                    continue
+                statistic_id = f"{DOMAIN}:{kind}_{slugify(device_id)}"
+                bucket = self._buckets.get(statistic_id)
+                if bucket is None:
+                    self._buckets[statistic_id] = [1, value, value, value]
+                    self._meta[statistic_id] = (
+                        f"{store.names[row] or store.types[row]} {label}",
+                        unit,
+                    )
+                    continue
+                bucket[0] += 1
+                bucket[1] += value
+                if value < bucket[2]:
+                    bucket[2] = value
+                if value > bucket[3]:
+                    bucket[3] = value
+
+    @callback
+    def async_flush(self) -> None:
+        """Import the accumulated (complete) hour and start a new one."""
+        self._async_import()
+        self._buckets = {}
+
+    async def async_close(self) -> None:
+        """Import the current (partial) hour and persist it for the next setup."""
+        self._async_import()
+        if self._hour is None:
+            return
+        await self._store.async_save({
+            "hour": self._hour.isoformat(),
+            "buckets": self._buckets,
+            "meta": self._meta,
+        })
+
+    @callback
+    def _async_import(self) -> None:
+        """Import the accumulated hour, one batch per statistic."""
+        if not self._buckets or self._hour is None:
+            return
+
+        from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        for statistic_id, (count, total, minimum, maximum) in self._buckets.items():
+            name, unit = self._meta[statistic_id]
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=name,
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=unit,
+            )
+            row = StatisticData(start=self._hour, mean=total / count, min=minimum, max=maximum)
+            async_add_external_statistics(self.hass, metadata, [row])
+
+        _LOGGER.debug(
+            "Imported hourly statistics for %s (%d series)", self._hour.isoformat(), len(self._buckets)
+        )
+
+
+async def async_setup_external_statistics(
+    hass: HomeAssistant, coordinator
+) -> Callable[[], Awaitable[None]] | None:
+    """Start sampling; returns the unload callback (None if the recorder is not loaded)."""
+    if "recorder" not in hass.config.components:
+        _LOGGER.warning("External statistics enabled but the recorder is not loaded")
+        return None
+
+    statistics = HourlyStatistics(hass, coordinator)
+    await statistics.async_restore()
+    remove_listener = coordinator.async_add_listener(statistics.async_sample)
+    remove_stop: Callable[[], None] | None = None
+
+    async def _async_stop(_event: Event) -> None:
+        """Import and persist the current hour: entries are not unloaded on shutdown."""
+        nonlocal remove_stop
+        remove_stop = None
+        await statistics.async_close()
+
+    remove_stop = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop)
+
+    async def _async_unload() -> None:
+        """Stop sampling, import and persist the current hour."""
+        remove_listener()
+        if remove_stop is not None:
+            remove_stop()
+        await statistics.async_close()
+
+    return _async_unload
@@ -0,0 +1,107 @@
+"""Hedged gateway reads (hedged_reads option).
+
+Most gateway reads answer in well under a second, but a few take 10-30 s and
+hold up the whole poll. A hedged read that is still pending after the p95
+latency of its action (over its last HEDGE_WINDOW requests) gets a second,
+identical request: whichever answers first is used and the other is cancelled.
+Only idempotent reads are hedged (HEDGED_ACTIONS), never commands or
+long-polls, and a budget of HEDGE_MAX_RATIO hedges per read bounds the extra
+load on the gateway. Both requests take a slot of the gateway scheduler.
+"""
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, TypeVar
+
+from .const import HEDGE_BURST, HEDGE_MAX_RATIO, HEDGE_MIN_DELAY, HEDGE_MIN_SAMPLES, HEDGE_WINDOW
+from .metrics import GatewayMetrics
+
+_T = TypeVar("_T")
+
+
+class _Latencies:
+    """Latest latencies of one action, with their p95 cached until the next one."""
+
+    __slots__ = ("samples", "_p95")
+
+    def __init__(self):
+        """Initialize."""
+        self.samples: Deque[float] = deque(maxlen=HEDGE_WINDOW)
+        self._p95: float | None = None
+
+    def add(self, seconds: float) -> None:
+        """Record one latency."""
+        self.samples.append(seconds)
+        self._p95 = None
+
+    def p95(self) -> float | None:
+        """Return the p95 latency, or None while there are too few samples."""
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        if self._p95 is None:
+            ordered = sorted(self.samples)
+            self._p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        return self._p95
+
+
+class ReadHedger:
+    """Hedges the slow reads of one API client."""
+
+    def __init__(
+        self,
+        metrics: GatewayMetrics,
+        min_delay: float = HEDGE_MIN_DELAY,
+        max_ratio: float = HEDGE_MAX_RATIO,
+    ):
+        """Initialize."""
+        self.metrics = metrics
+        self._min_delay = min_delay
+        self._max_ratio = max_ratio
+        self._latencies: Dict[str, _Latencies] = {}
+        self._budget = float(HEDGE_BURST)  # hedges that may be sent now
+
+    def observe(self, action: str, seconds: float) -> None:
+        """Record the latency of a request that got an answer."""
+        latencies = self._latencies.get(action)
+        if latencies is None:
+            latencies = self._latencies[action] = _Latencies()
+        latencies.add(seconds)
+
+    def delay(self, action: str) -> float | None:
+        """Return how long a read of `action` may take before it is hedged (None: never)."""
+        latencies = self._latencies.get(action)
+        p95 = latencies.p95() if latencies is not None else None
+        return None if p95 is None else max(p95, self._min_delay)
+
+    async def run(self, action: str, request: Callable[[], Awaitable[_T]]) -> _T:
+        """Run `request`, hedged with a second one if it is slower than the p95 of `action`."""
+        # Every read earns a fraction of a hedge, so hedges stay under max_ratio of reads
+        self._budget = min(float(HEDGE_BURST), self._budget + self._max_ratio)
+        delay = self.delay(action)
+        if delay is None:
+            return await request()
+
+        primary = asyncio.ensure_future(request())
+        tasks: List[asyncio.Future] = [primary]
+        try:
+            done, _pending = await asyncio.wait(tasks, timeout=delay)
+            if done or self._budget < 1:
+                return await primary
+
+            self._budget -= 1
+            hedge = asyncio.ensure_future(request())
+            tasks.append(hedge)
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    self.metrics.hedge(action, "won" if winner is hedge else "lost")
+                    return winner.result()
+                # A failure only counts once the other request has failed too
+                if not pending:
+                    self.metrics.hedge(action, "failed")
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,23 @@
+"""Config entry lookup shared by the services and the websocket commands."""
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+
+def find_coordinator(hass: HomeAssistant, entry_id: str | None):
+    """Return the coordinator of the requested (or first loaded) config entry, or None."""
+    entries = hass.data.get(DOMAIN, {})
+    if entry_id:
+        data = entries.get(entry_id)
+    else:
+        data = next((d for d in entries.values() if isinstance(d, dict) and "coordinator" in d), None)
+    return data["coordinator"] if data else None
+
+
+def get_coordinator(hass: HomeAssistant, entry_id: str | None):
+    """Return the coordinator of the requested (or first loaded) config entry."""
+    coordinator = find_coordinator(hass, entry_id)
+    if coordinator is None:
+        raise HomeAssistantError("Nessuna integrazione Connee Alarm caricata per questa richiesta")
+    return coordinator
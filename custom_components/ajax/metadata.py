@@ -0,0 +1,139 @@
+"""Slow-cadence coordinator for firmware, hardware and model info.
+
+Firmware and hardware versions change a few times a year, so the update
+entities do not listen to the 10 s data coordinator. They listen to this one,
+which reads the hub state and a projection of the device states
+(METADATA_STATE_FIELDS) every METADATA_SCAN_INTERVAL. It is seeded from the data
+coordinator at setup, so it costs no gateway call before its first interval.
+"""
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import DOMAIN, METADATA_SCAN_INTERVAL, METADATA_STATE_FIELDS
+from .models import ConneeAlarmApiError, Device
+
+_LOGGER = logging.getLogger(__name__)
+
+# Hub/device keys exposed as update entity attributes
+HUB_ATTRIBUTE_KEYS = ("model", "type", "firmwareVersion", "osVersion", "kernelVersion")
+DEVICE_ATTRIBUTE_KEYS = ("firmwareVersion", "hwVersion", "bootVersion")
+
+
+def _versions(payload: Dict[str, Any]) -> tuple[str | None, str | None]:
+    """Return (installed, latest available) firmware of a hub or device payload.
+
+    Ajax nests firmware as `{firmware: {version, latestAvailableVersion, ...}}`;
+    flat `firmwareVersion` payloads are also accepted. Latest falls back to
+    installed when the gateway does not say.
+    """
+    firmware = payload.get("firmware")
+    firmware = firmware if isinstance(firmware, dict) else {}
+    installed = (
+        firmware.get("version")
+        or payload.get("firmwareVersion")
+        or payload.get("firmware_version")
+    )
+    latest = (
+        firmware.get("latestAvailableVersion")
+        or firmware.get("latestVersion")
+        or payload.get("latestFirmwareVersion")
+    )
+    return installed, latest or installed
+
+
+def _entry(payload: Dict[str, Any], keys: tuple[str, ...], fallback: str | None = None) -> Dict[str, Any]:
+    """Return the metadata entry of one hub or device payload."""
+    installed, latest = _versions(payload)
+    return {
+        "installed": installed or fallback,
+        "latest": latest or fallback,
+        "attributes": {key: payload[key] for key in keys if payload.get(key) is not None},
+    }
+
+
+def extract_metadata(
+    hub_state: Dict[str, Any], devices: List[Device], device_states: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build the metadata view from a hub state, the catalog and the device states.
+
+    The catalog firmware is the fallback for devices whose state carries none.
+    """
+    return {
+        "hub": _entry(hub_state, HUB_ATTRIBUTE_KEYS),
+        "devices": {
+            device["id"]: _entry(
+                device_states.get(device["id"], {}),
+                DEVICE_ATTRIBUTE_KEYS,
+                device.get("firmwareVersion"),
+            )
+            for device in devices
+        },
+    }
+
+
+class ConneeAlarmMetadataCoordinator(DataUpdateCoordinator):
+    """Firmware/hardware metadata of a hub and its devices, polled every few hours."""
+
+    def __init__(self, hass: HomeAssistant, coordinator):
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} metadata",
+            update_interval=timedelta(seconds=METADATA_SCAN_INTERVAL),
+        )
+        self.coordinator = coordinator
+        self.api = coordinator.api
+
+    def _from_coordinator(self) -> Dict[str, Any] | None:
+        """Return the metadata held by the data coordinator (last full state fetch)."""
+        data = self.coordinator.data
+        if not data:
+            return None
+        return extract_metadata(
+            data.get("hub_state", {}), self.coordinator.devices, self.coordinator.state_store.states()
+        )
+
+    @callback
+    def async_seed(self) -> None:
+        """Publish the metadata already held by the data coordinator."""
+        metadata = self._from_coordinator()
+        if metadata is not None:
+            self.async_set_updated_data(metadata)
+
+    @callback
+    def async_add_devices(self, devices: List[Device]) -> None:
+        """Add devices enrolled after setup, from the data coordinator's states.
+
+        Their first poll is a full state fetch, so the firmware fields are there.
+        """
+        if not self.data:
+            self.async_seed()
+            return
+        states = {device["id"]: self.coordinator.device_state(device["id"]) for device in devices}
+        added = extract_metadata({}, devices, states)["devices"]
+        self.async_set_updated_data(
+            {**self.data, "devices": {**self.data["devices"], **added}}
+        )
+
+    async def _async_update_data(self) -> Dict[str, Any]:
+        """Read hub state and the firmware fields of the device states."""
+        hub_id = self.coordinator.hub_id
+        devices = self.coordinator.devices
+        try:
+            hub_state = await self.api.get_hub_state(hub_id)
+            device_states = await self.api.get_device_states(hub_id, METADATA_STATE_FIELDS)
+        except ConneeAlarmApiError as err:
+            # The data coordinator's last full fetch is at most FULL_STATES_INTERVAL old
+            metadata = self._from_coordinator()
+            if metadata is None:
+                raise UpdateFailed(f"Error fetching metadata: {err}") from err
+            _LOGGER.debug("Metadata poll failed (%s), using the last full state fetch", err)
+            return metadata
+
+        states_map = {state["deviceId"]: state for state in device_states}
+        return extract_metadata(hub_state, devices, states_map)
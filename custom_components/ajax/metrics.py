@@ -0,0 +1,86 @@
+"""Prometheus metrics of the gateway clients and coordinators.
+
+Counters and histograms are plain dicts and lists updated in the hot paths of
+the API client (every gateway request) and of the coordinator (every poll and
+fan-out): a dict increment and a bisect each. They are rendered by
+metrics_view.py, imported only when the view is registered.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Sequence, Tuple
+
+# Upper bounds of the histogram buckets (+Inf is implicit)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds
+LISTENER_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)  # listeners per cycle
+
+
+class Histogram:
+    """Bucketed observations (per-bucket counts, cumulated when rendered)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        """Initialize."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class GatewayMetrics:
+    """Metrics of one config entry (shared by its API client and coordinator)."""
+
+    def __init__(self):
+        """Initialize."""
+        # (action, status) -> requests; status is the HTTP code, "timeout" or "error"
+        self.requests: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.latency: Dict[str, Histogram] = {}
+        self.response_bytes: Dict[str, int] = defaultdict(int)
+        self.retries: Dict[str, int] = defaultdict(int)
+        self.logins: Dict[str, int] = defaultdict(int)
+        # (action, result) -> hedged reads; result is "won" if the hedge answered first,
+        # "lost" if the original request did, "failed" if both failed
+        self.hedges: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.backoff_activations = 0
+        self.poll_duration = Histogram(LATENCY_BUCKETS)
+        self.listener_updates = Histogram(LISTENER_BUCKETS)
+
+    def request(self, action: str, status: int | str, seconds: float, size: int | None) -> None:
+        """Record one gateway request (size: Content-Length of the response, if sent)."""
+        self.requests[(action, str(status))] += 1
+        histogram = self.latency.get(action)
+        if histogram is None:
+            histogram = self.latency[action] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+        if size:
+            self.response_bytes[action] += size
+
+    def retry(self, action: str) -> None:
+        """Record a request retried after a re-login."""
+        self.retries[action] += 1
+
+    def login(self, success: bool) -> None:
+        """Record a login sent to the gateway."""
+        self.logins["success" if success else "failure"] += 1
+
+    def hedge(self, action: str, result: str) -> None:
+        """Record a hedged read and which of its two requests answered first."""
+        self.hedges[(action, result)] += 1
+
+    def backoff(self) -> None:
+        """Record a backoff activation."""
+        self.backoff_activations += 1
+
+    def poll(self, seconds: float) -> None:
+        """Record the duration of a whole poll cycle."""
+        self.poll_duration.observe(seconds)
+
+    def fan_out(self, listeners: int) -> None:
+        """Record the listeners (entity state writes) notified by a publish."""
+        self.listener_updates.observe(listeners)
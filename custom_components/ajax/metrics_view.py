@@ -0,0 +1,138 @@
+"""Prometheus scrape endpoint of the gateway clients and coordinators.
+
+Device gauges are computed from the state store at scrape time.
+ConneeAlarmMetricsView exposes everything in the Prometheus text format at
+/api/ajax/metrics (Home Assistant auth required).
+"""
+from typing import Dict, Iterable, List
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .metrics import GatewayMetrics, Histogram
+
+DATA_METRICS_REGISTERED = f"{DOMAIN}_metrics_registered"
+
+METRICS_URL = "/api/ajax/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: object) -> str:
+    """Escape a label value (backslash, double quote, newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, object]) -> str:
+    """Render a label set."""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: Dict[str, str]) -> Iterable[str]:
+    """Render the bucket/sum/count samples of one histogram."""
+    cumulative = 0
+    for bound, count in zip((*histogram.bounds, "+Inf"), histogram.counts):
+        cumulative += count
+        yield f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}"
+    yield f"{name}_sum{_labels(labels)} {histogram.sum}"
+    yield f"{name}_count{_labels(labels)} {histogram.count}"
+
+
+class _Family:
+    """Samples of one metric family, rendered with their HELP/TYPE header."""
+
+    def __init__(self, name: str, kind: str, help_text: str):
+        """Start an empty family of the given Prometheus type."""
+        self.name = name
+        self.header = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        self.lines: List[str] = []
+
+    def sample(self, labels: Dict[str, str], value: float) -> None:
+        """Add one counter or gauge sample."""
+        self.lines.append(f"{self.name}{_labels(labels)} {value}")
+
+    def histogram(self, labels: Dict[str, str], histogram: Histogram) -> None:
+        """Add the bucket/sum/count samples of one histogram."""
+        self.lines.extend(_histogram_lines(self.name, histogram, labels))
+
+
+def render_metrics(coordinators: Iterable) -> str:
+    """Render the metrics of the given coordinators in the Prometheus text format."""
+    requests = _Family("ajax_gateway_requests_total", "counter", "Gateway requests by action and status.")
+    latency = _Family("ajax_gateway_request_duration_seconds", "histogram", "Gateway request latency.")
+    size = _Family("ajax_gateway_response_bytes_total", "counter", "Response bytes (Content-Length).")
+    retries = _Family("ajax_gateway_retries_total", "counter", "Requests retried after a re-login.")
+    logins = _Family("ajax_gateway_logins_total", "counter", "Logins sent to the gateway.")
+    hedges = _Family("ajax_gateway_hedged_requests_total", "counter", "Reads hedged with a second request.")
+    backoffs = _Family("ajax_gateway_backoff_activations_total", "counter", "Backoff activations.")
+    backoff_remaining = _Family("ajax_gateway_backoff_remaining_seconds", "gauge", "Seconds left in backoff.")
+    poll = _Family("ajax_poll_duration_seconds", "histogram", "Duration of a whole poll cycle.")
+    writes = _Family("ajax_poll_listener_updates", "histogram", "Listeners (entity writes) notified per publish.")
+    devices = _Family("ajax_devices", "gauge", "Devices by condition.")
+
+    for coordinator in coordinators:
+        metrics: GatewayMetrics = coordinator.metrics
+        entry = {"entry_id": coordinator.config_entry.entry_id, "hub_id": coordinator.hub_id or ""}
+
+        for (action, status), count in sorted(metrics.requests.items()):
+            requests.sample({**entry, "action": action, "status": status}, count)
+        for action, histogram in sorted(metrics.latency.items()):
+            latency.histogram({**entry, "action": action}, histogram)
+        for action, count in sorted(metrics.response_bytes.items()):
+            size.sample({**entry, "action": action}, count)
+        for action, count in sorted(metrics.retries.items()):
+            retries.sample({**entry, "action": action}, count)
+        for result, count in sorted(metrics.logins.items()):
+            logins.sample({**entry, "result": result}, count)
+        for (action, result), count in sorted(metrics.hedges.items()):
+            hedges.sample({**entry, "action": action, "result": result}, count)
+        backoffs.sample(entry, metrics.backoff_activations)
+        backoff_remaining.sample(entry, coordinator.api.backoff_remaining_seconds)
+        poll.histogram(entry, metrics.poll_duration)
+        writes.histogram(entry, metrics.listener_updates)
+
+        if coordinator.data:
+            store = coordinator.state_store
+            for state, count in (
+                ("total", len(store)),
+                ("ok", store.count_ok()),
+                ("alarm", store.count_alarm()),
+                ("offline", store.count_offline()),
+            ):
+                devices.sample({**entry, "state": state}, count)
+
+    families = (requests, latency, size, retries, logins, hedges, backoffs, backoff_remaining, poll, writes, devices)
+    return "\n".join(
+        line for family in families if family.lines for line in (*family.header, *family.lines)
+    ) + "\n"
+
+
+class ConneeAlarmMetricsView(HomeAssistantView):
+    """Prometheus scrape endpoint for all loaded config entries."""
+
+    url = METRICS_URL
+    name = "api:ajax:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics of every loaded config entry."""
+        hass: HomeAssistant = request.app[KEY_HASS]
+        coordinators = [
+            data["coordinator"]
+            for data in hass.data.get(DOMAIN, {}).values()
+            if isinstance(data, dict) and "coordinator" in data
+        ]
+        return web.Response(
+            body=render_metrics(coordinators).encode(), headers={"Content-Type": CONTENT_TYPE}
+        )
+
+
+@callback
+def async_setup_metrics_view(hass: HomeAssistant) -> None:
+    """Register the metrics view (once for all config entries)."""
+    if hass.data.get(DATA_METRICS_REGISTERED):
+        return
+    hass.data[DATA_METRICS_REGISTERED] = True
+    hass.http.register_view(ConneeAlarmMetricsView)
@@ -0,0 +1,242 @@
+"""Typed decoding of Connee gateway payloads.
+
+Every gateway action is decoded once, here, at the API boundary: shape variants
+(`sessionToken`/`token`, `id`/`deviceId`/nested `device`, `hubs`/`data`, ...) are
+resolved into canonical keys and downstream code reads those keys only.
+
+Hubs, devices and states stay JSON mappings, typed with TypedDict, because they are
+persisted as-is in the startup snapshot and read as mappings by the entities.
+Malformed payloads raise PayloadError instead of silently becoming `{}`/`[]`.
+"""
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, TypedDict
+
+
+class ConneeAlarmApiError(Exception):
+    """Gateway call failed (error response, timeout, backoff or not logged in)."""
+
+    def __init__(self, message: str, auth_failed: bool = False):
+        """Initialize."""
+        super().__init__(message)
+        self.auth_failed = auth_failed
+
+
+class PayloadError(ConneeAlarmApiError):
+    """Gateway call succeeded but the payload does not have the expected shape."""
+
+
+@dataclass(frozen=True, slots=True)
+class Session:
+    """Result of the login action."""
+
+    token: str
+    user_id: str | None
+
+
+class Hub(TypedDict, total=False):
+    """Hub of the account (`id` and `name` are canonical, other keys as sent)."""
+
+    id: str
+    hubId: str
+    name: str
+
+
+class Device(TypedDict, total=False):
+    """Hub device (`id`, `type` and `deviceName` are canonical, other keys as sent)."""
+
+    id: str
+    type: str
+    deviceName: str | None
+
+
+class DeviceState(TypedDict, total=False):
+    """Device state (`deviceId` is canonical, other keys as sent)."""
+
+    deviceId: str
+
+
+def _nested(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the nested `device` object some payload shapes use."""
+    nested = payload.get("device")
+    return nested if isinstance(nested, dict) else {}
+
+
+def _clean_id(raw_id: Any) -> str | None:
+    """Normalize an id to a non-empty, interned string.
+
+    Interned: every poll decodes the same few ids again, and they are kept as
+    keys by the state map, the state store and the entities.
+    """
+    if raw_id is None:
+        return None
+    raw_id = str(raw_id).strip()
+    return sys.intern(raw_id) if raw_id else None
+
+
+def _items(action: str, result: Any, *keys: str) -> List[Dict[str, Any]]:
+    """Unwrap a list payload (bare or under one of `keys`) and check its items.
+
+    An object with none of `keys` (an error or unknown envelope) is rejected,
+    not read as an empty list.
+    """
+    if isinstance(result, dict):
+        present = [key for key in keys if key in result]
+        if not present:
+            raise PayloadError(
+                f"{action}: expected a list under {'/'.join(keys)}, got keys {sorted(result)}"
+            )
+        result = next((result[key] for key in present if result[key]), result[present[0]])
+    if not isinstance(result, list):
+        raise PayloadError(f"{action}: expected a list, got {type(result).__name__}")
+    for item in result:
+        if not isinstance(item, dict):
+            raise PayloadError(f"{action}: expected objects, got {type(item).__name__}")
+    return result
+
+
+def decode_session(result: Any) -> Session:
+    """Decode the login payload."""
+    if not isinstance(result, dict):
+        raise PayloadError(f"login: expected an object, got {type(result).__name__}")
+    session = result.get("session") if isinstance(result.get("session"), dict) else {}
+    user = result.get("user") if isinstance(result.get("user"), dict) else {}
+    token = result.get("sessionToken") or result.get("token") or session.get("token")
+    if not token:
+        raise PayloadError("login: no session token in response")
+    user_id = (
+        result.get("userId")
+        or result.get("user_id")
+        or result.get("id")
+        or user.get("id")
+    )
+    return Session(token=str(token), user_id=_clean_id(user_id))
+
+
+def decode_hubs(result: Any) -> List[Hub]:
+    """Decode the get-user-hubs payload (hubs without an id are dropped)."""
+    hubs = []
+    for hub in _items("get-user-hubs", result, "hubs", "data"):
+        hub_id = _clean_id(hub.get("hubId") or hub.get("id") or hub.get("deviceId"))
+        if hub_id:
+            hubs.append({
+                **hub,
+                "id": hub_id,
+                "hubId": hub_id,
+                "name": hub.get("name") or hub.get("hubName") or f"Hub {hub_id}",
+            })
+    return hubs
+
+
+def decode_hub_state(result: Any) -> Dict[str, Any]:
+    """Decode the get-hub payload."""
+    if not isinstance(result, dict):
+        raise PayloadError(f"get-hub: expected an object, got {type(result).__name__}")
+    return result
+
+
+def decode_devices(result: Any) -> List[Device]:
+    """Decode the get-hub-devices payload (devices without an id are dropped)."""
+    devices = []
+    for device in _items("get-hub-devices", result, "devices", "data"):
+        nested = _nested(device)
+        device_id = _clean_id(
+            device.get("id")
+            or device.get("deviceId")
+            or device.get("device_id")
+            or nested.get("id")
+            or nested.get("deviceId")
+            or nested.get("device_id")
+        )
+        if device_id is None:
+            continue
+        device_type = (
+            device.get("type")
+            or device.get("deviceType")
+            or nested.get("type")
+            or nested.get("deviceType")
+            or ""
+        )
+        # Prefer the user-assigned name; entities fall back to the device type
+        name = (
+            device.get("deviceName")
+            or device.get("name")
+            or device.get("label")
+            or nested.get("name")
+        )
+        # Decoded in place: the payload is freshly parsed and owned by us
+        device["id"] = device_id
+        device["type"] = sys.intern(str(device_type).strip())
+        device["deviceName"] = str(name) if name else None
+        devices.append(device)
+    return devices
+
+
+def decode_device_states(result: Any) -> List[DeviceState]:
+    """Decode the get-all-device-states payload (states without an id are dropped)."""
+    states = []
+    for state in _items("get-all-device-states", result, "data"):
+        nested = _nested(state)
+        device_id = _clean_id(
+            state.get("deviceId")
+            or state.get("id")
+            or state.get("device_id")
+            or nested.get("deviceId")
+            or nested.get("id")
+        )
+        if device_id is None:
+            continue
+        state["deviceId"] = device_id
+        states.append(state)
+    return states
+
+
+def decode_state_changes(result: Any) -> tuple[str | None, List[DeviceState] | None]:
+    """Decode a long-poll get-all-device-states payload into (cursor, states).
+
+    `{"cursor": ..., "changed": bool, "states": [...]}`; states is None when the
+    wait timed out with no change. A plain state list means the gateway ignored
+    the wait: returned with a None cursor.
+    """
+    if not isinstance(result, dict) or "cursor" not in result:
+        return None, decode_device_states(result)
+    cursor = _clean_id(result["cursor"])
+    if cursor is None:
+        raise PayloadError("get-all-device-states: empty long-poll cursor")
+    if not result.get("changed", True):
+        return cursor, None
+    return cursor, decode_device_states(result.get("states", []))
+
+
+# Same field priority as the battery/temperature sensors
+_BATTERY_KEYS = ("batteryChargeLevelPercentage", "batteryCharge", "batteryLevel", "battery", "batteryPercent")
+_TEMPERATURE_KEYS = ("temperature", "temp")
+
+
+_BATTERY_OBJECT_KEYS = ("charge", "level", "percent", "percentage")
+
+
+def battery_level(state: Dict[str, Any]) -> int | None:
+    """Return the battery percentage of a device state, whatever field carries it."""
+    for key in _BATTERY_KEYS:
+        val = state.get(key)
+        if isinstance(val, dict):
+            val = next((val[k] for k in _BATTERY_OBJECT_KEYS if val.get(k) is not None), None)
+        if val is not None:
+            try:
+                return int(val)
+            except (ValueError, TypeError):
+                pass
+    return None
+
+
+def temperature_value(state: Dict[str, Any]) -> float | None:
+    """Return the temperature of a device state, whatever field carries it."""
+    for key in _TEMPERATURE_KEYS:
+        val = state.get(key)
+        if val is not None:
+            try:
+                return float(val)
+            except (ValueError, TypeError):
+                pass
+    return None
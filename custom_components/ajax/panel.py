@@ -2,7 +2,6 @@
 import logging
 from pathlib import Path
 
-from homeassistant.components import frontend
 from homeassistant.core import HomeAssistant
 
 _LOGGER = logging.getLogger(__name__)
@@ -0,0 +1,99 @@
+"""On-demand profiling of Connee Alarm poll cycles (ajax.profile service, async_profile)."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+from homeassistant.exceptions import HomeAssistantError
+
+from .helpers import get_coordinator
+from .services import ATTR_CONFIG_ENTRY_ID, ATTR_CYCLES, ATTR_TOP, cycles_timeout
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PollProfiler:
+    """cProfile session covering the next N refresh cycles of a coordinator.
+
+    The profiler is enabled around each whole refresh (gateway calls, parsing and
+    listener fan-out). Other tasks that run on the event loop while the refresh is
+    awaiting the network are captured too, which is what we want when looking for
+    whatever makes the instance sluggish.
+    """
+
+    def __init__(self, hass: HomeAssistant, cycles: int):
+        """Initialize."""
+        self.cycles = cycles
+        self.cycles_done = 0
+        # Imported here: only needed while a profiling session runs
+        import cProfile
+
+        self.profile = cProfile.Profile()
+        self.done: asyncio.Future = hass.loop.create_future()
+
+    def enable(self) -> bool:
+        """Start collecting; False if another profiler already owns the interpreter."""
+        try:
+            self.profile.enable()
+        except ValueError as err:
+            if not self.done.done():
+                self.done.set_exception(HomeAssistantError(f"Profiler non disponibile: {err}"))
+            return False
+        return True
+
+    def disable(self) -> None:
+        """Stop collecting and count the cycle."""
+        self.profile.disable()
+        self.cycles_done += 1
+        if self.cycles_done >= self.cycles and not self.done.done():
+            self.done.set_result(None)
+
+    def dump(self, path: str, top: int) -> List[Dict[str, Any]]:
+        """Write the stats file and return the top-N functions by cumulative time."""
+        import pstats
+
+        self.profile.dump_stats(path)
+        stats = pstats.Stats(self.profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        summary = []
+        for (filename, line, func), (_cc, ncalls, tottime, cumtime, _callers) in rows[:top]:
+            summary.append({
+                "function": f"{filename}:{line}({func})",
+                "ncalls": ncalls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6),
+            })
+        return summary
+
+
+async def async_profile(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Profile the next N poll cycles and return a summary."""
+    coordinator = get_coordinator(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+    if coordinator.profiler is not None:
+        raise HomeAssistantError("Una sessione di profiling è già in corso")
+
+    cycles = call.data[ATTR_CYCLES]
+    profiler = PollProfiler(hass, cycles)
+    timeout = cycles_timeout(coordinator, cycles)
+
+    _LOGGER.info("Profiling the next %d poll cycles (timeout %ds)", cycles, timeout)
+    coordinator.profiler = profiler
+    try:
+        await asyncio.wait_for(asyncio.shield(profiler.done), timeout)
+    except asyncio.TimeoutError as err:
+        raise HomeAssistantError(
+            f"Profiling interrotto: solo {profiler.cycles_done}/{cycles} cicli in {int(timeout)}s"
+        ) from err
+    finally:
+        coordinator.profiler = None
+
+    path = hass.config.path(f"ajax_profile_{datetime.now():%Y%m%d_%H%M%S}.prof")
+    summary = await hass.async_add_executor_job(profiler.dump, path, call.data[ATTR_TOP])
+    _LOGGER.info("Profile of %d poll cycles written to %s", cycles, path)
+
+    return {
+        "stats_file": path,
+        "cycles": cycles,
+        "top": summary,
+    }
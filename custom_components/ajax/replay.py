@@ -0,0 +1,255 @@
+"""Capture of gateway traffic and a replay transport for offline reproduction.
+
+Capture: while a TrafficCapture is attached to a ConneeAlarmApiClient, every
+gateway call is recorded (action, redacted request body, HTTP status, redacted
+response, elapsed ms; timeouts have status -1). Secrets and addresses are
+replaced; names are replaced by a pseudonym hashed with a random per-capture
+salt, so equal names stay equal within a capture but cannot be looked up. The
+ajax.capture service (async_capture) attaches one for the next N poll cycles and
+writes the records to a gzip-compressed JSON-lines file.
+
+Replay: ReplaySession stands in for the aiohttp session of the client and answers
+each action with the recorded responses, in order, with the recorded latency
+multiplied by `time_scale` (0 = no delay). A customer's capture can so be run
+through the real client and coordinator locally, with no network.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import secrets
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .helpers import get_coordinator
+from .services import ATTR_CONFIG_ENTRY_ID, ATTR_CYCLES, cycles_timeout
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_FORMAT_VERSION = 1
+
+# Keys whose values never leave the installation (matched at any depth)
+REDACTED_KEYS = frozenset({
+    "email",
+    "password",
+    "sessionToken",
+    "token",
+    "userId",
+    "user_id",
+    "phone",
+    "firstName",
+    "lastName",
+    "address",
+    "street",
+    "houseNumber",
+    "city",
+    "zipCode",
+    "postalCode",
+    "country",
+    "latitude",
+    "longitude",
+    "geoFence",
+})
+REDACTED = "**REDACTED**"
+
+# Keys whose values are replaced by a salted pseudonym (matched at any depth)
+PSEUDONYMIZED_KEYS = frozenset({
+    "name",
+    "deviceName",
+    "hubName",
+    "roomName",
+    "groupName",
+    "spaceName",
+    "userName",
+})
+
+
+def _pseudonym(key: str, value: Any, salt: str) -> str:
+    """Return the pseudonym of a name (stable for a given salt)."""
+    digest = hashlib.sha256(f"{salt}:{value}".encode()).hexdigest()[:10]
+    return f"{key}-{digest}"
+
+
+def _redact_value(key: str, value: Any, salt: str) -> Any:
+    """Return the redacted value of one key."""
+    if value is None:
+        return None
+    if key in REDACTED_KEYS:
+        return REDACTED
+    if key in PSEUDONYMIZED_KEYS and isinstance(value, str):
+        return _pseudonym(key, value, salt)
+    return redact(value, salt)
+
+
+def redact(payload: Any, salt: str = "") -> Any:
+    """Return a copy of a payload with personal data and secrets replaced."""
+    if isinstance(payload, dict):
+        return {key: _redact_value(key, value, salt) for key, value in payload.items()}
+    if isinstance(payload, list):
+        return [redact(item, salt) for item in payload]
+    return payload
+
+
+class TrafficCapture:
+    """Redacted gateway calls recorded in memory until written to a file."""
+
+    def __init__(self):
+        """Initialize."""
+        self.records: List[Dict[str, Any]] = []
+        self._salt = secrets.token_hex(16)  # never written: pseudonyms cannot be reversed
+
+    def record(self, action: str, body: Dict[str, Any], status: int, response: Any, elapsed_ms: float) -> None:
+        """Record one gateway call."""
+        # The top-level deviceId of a request is the installation id, not a hub device
+        request = {key: value for key, value in body.items() if key != "deviceId"}
+        self.records.append({
+            "action": action,
+            "request": redact(request, self._salt),
+            "status": status,
+            "response": redact(response, self._salt),
+            "elapsed_ms": round(elapsed_ms, 1),
+        })
+
+    def write(self, path: str) -> int:
+        """Write the records as gzip JSON lines (blocking); returns the count."""
+        header = {"format": CAPTURE_FORMAT_VERSION, "created_at": datetime.now().isoformat()}
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.write(json.dumps(header) + "\n")
+            for record in self.records:
+                file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return len(self.records)
+
+
+def load_capture(path: str) -> List[Dict[str, Any]]:
+    """Read the records of a capture file (blocking)."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        if header.get("format") != CAPTURE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported capture format: {header.get('format')}")
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def _project(response: Any, fields: set) -> Any:
+    """Keep only the requested fields of the device states in a recorded response."""
+    if not isinstance(response, dict) or not isinstance(response.get("data"), list):
+        return response
+    data = [
+        {key: value for key, value in state.items() if key in fields}
+        if isinstance(state, dict) else state
+        for state in response["data"]
+    ]
+    return {**response, "data": data}
+
+
+class _ReplayResponse:
+    """aiohttp response stand-in serving one recorded call."""
+
+    def __init__(self, record: Dict[str, Any], delay: float):
+        self.status = record["status"]
+        self.content_length = None  # not captured
+        self._record = record
+        self._delay = delay
+
+    async def read(self) -> bytes:
+        return json.dumps(self._record["response"]).encode()
+
+    async def __aenter__(self):
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        if self.status == -1:
+            # Captured timeout
+            raise asyncio.TimeoutError
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class ReplaySession:
+    """aiohttp session stand-in answering each action from a capture.
+
+    Responses of an action are served in capture order and start over once
+    exhausted, so a few captured cycles can drive any number of polls. Actions
+    missing from the capture answer 404. A field projection in the request is
+    applied to the recorded device states.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], time_scale: float = 1.0):
+        """Initialize."""
+        self.time_scale = time_scale
+        self._records: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for record in records:
+            self._records[record["action"]].append(record)
+        self._queues: Dict[str, Deque[Dict[str, Any]]] = {}
+        # (action, request body) of every call served, for inspection
+        self.requests: List[tuple[str, Dict[str, Any]]] = []
+
+    @classmethod
+    def from_file(cls, path: str, time_scale: float = 1.0) -> "ReplaySession":
+        """Create a session from a capture file (blocking)."""
+        return cls(load_capture(path), time_scale)
+
+    def request(self, method, url, json=None, headers=None, timeout=None):
+        """Serve the next recorded response of the requested action."""
+        action = url.rsplit("action=", 1)[-1]
+        self.requests.append((action, json or {}))
+        records = self._records.get(action)
+        if not records:
+            return _ReplayResponse(
+                {"status": 404, "response": {"success": False, "error": f"{action} not captured"}}, 0
+            )
+        queue = self._queues.get(action)
+        if not queue:
+            queue = self._queues[action] = deque(records)
+        record = queue.popleft()
+        fields = (json or {}).get("fields")
+        if fields is not None:
+            record = {**record, "response": _project(record["response"], set(fields))}
+        return _ReplayResponse(record, record["elapsed_ms"] / 1000 * self.time_scale)
+
+
+async def async_capture(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Capture the gateway traffic of the next N poll cycles."""
+    coordinator = get_coordinator(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+    api = coordinator.api
+    if api.capture is not None:
+        raise HomeAssistantError("Una registrazione del traffico è già in corso")
+
+    cycles = call.data[ATTR_CYCLES]
+    capture = TrafficCapture()
+    done: asyncio.Future = hass.loop.create_future()
+    completed = 0
+
+    @callback
+    def _async_cycle_done() -> None:
+        """Count refreshes (coordinator listener)."""
+        nonlocal completed
+        completed += 1
+        if completed >= cycles and not done.done():
+            done.set_result(None)
+
+    timeout = cycles_timeout(coordinator, cycles)
+
+    _LOGGER.info("Capturing gateway traffic for the next %d poll cycles", cycles)
+    api.capture = capture
+    remove_listener = coordinator.async_add_listener(_async_cycle_done)
+    try:
+        await asyncio.wait_for(asyncio.shield(done), timeout)
+    except asyncio.TimeoutError as err:
+        raise HomeAssistantError(
+            f"Registrazione interrotta: solo {completed}/{cycles} cicli in {int(timeout)}s"
+        ) from err
+    finally:
+        remove_listener()
+        api.capture = None
+
+    path = hass.config.path(f"ajax_capture_{datetime.now():%Y%m%d_%H%M%S}.jsonl.gz")
+    count = await hass.async_add_executor_job(capture.write, path)
+    _LOGGER.info("Captured %d gateway calls to %s", count, path)
+
+    return {"capture_file": path, "cycles": cycles, "calls": count}
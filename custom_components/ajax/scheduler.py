@@ -0,0 +1,141 @@
+"""Process-wide scheduling of gateway traffic across config entries.
+
+All clients of CONNEE_GATEWAY_URL share one GatewayScheduler, so that several
+accounts/sites on the same instance do not hit the gateway in synchronized
+spikes (which trigger the 429 backoff for everyone):
+
+- at most GATEWAY_MAX_CONCURRENT requests are in flight, the others queue by
+  lane (commands, then interactive reads, then polls; FIFO within a lane), and
+  GATEWAY_COMMAND_RESERVED of the slots are kept for commands, so an arm/disarm
+  is sent at once even while polls fill the gateway budget;
+- logins take turns, LOGIN_SPACING seconds apart plus jitter;
+- every coordinator polls on its own phase of the update interval, spread with a
+  golden-ratio sequence so any number of entries stays evenly distributed.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DATA_SCHEDULER,
+    GATEWAY_COMMAND_RESERVED,
+    GATEWAY_MAX_CONCURRENT,
+    LANE_COMMAND,
+    LANE_POLL,
+    LOGIN_JITTER,
+    LOGIN_SPACING,
+    POLL_PHASE_JITTER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fractional part of the golden ratio: consecutive multiples fill [0, 1) evenly
+_GOLDEN_FRACTION = 0.6180339887
+
+
+class GatewayScheduler:
+    """Admission control for the gateway requests of all config entries."""
+
+    def __init__(
+        self,
+        max_concurrent: int = GATEWAY_MAX_CONCURRENT,
+        command_reserved: int = GATEWAY_COMMAND_RESERVED,
+    ):
+        """Initialize."""
+        self._max_concurrent = max_concurrent
+        self._command_reserved = command_reserved
+        self._in_flight = 0
+        # (lane, arrival, future) of the requests waiting for a slot
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._login_lock = asyncio.Lock()
+        self._next_login = 0.0  # loop time of the next free login turn
+        self._phases: Dict[str, float] = {}
+        self.queued = 0  # requests waiting for a slot
+
+    def _limit(self, lane: int) -> int:
+        """Return the slots a lane may fill (the reserved ones are for commands)."""
+        if lane == LANE_COMMAND:
+            return self._max_concurrent
+        return self._max_concurrent - self._command_reserved
+
+    def _wake(self) -> None:
+        """Hand free slots to the waiters, lowest lane first."""
+        while self._waiters:
+            lane, _arrival, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._in_flight >= self._limit(lane):
+                # Everything behind the head is in the same or a lower-priority lane
+                return
+            heapq.heappop(self._waiters)
+            self._in_flight += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, lane: int = LANE_POLL) -> AsyncIterator[None]:
+        """Hold a request slot, queued behind the requests of its lane and of higher-priority lanes."""
+        ahead = self._waiters and self._waiters[0][0] <= lane
+        if not ahead and self._in_flight < self._limit(lane):
+            self._in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            waiter = (lane, next(self._arrivals), future)
+            heapq.heappush(self._waiters, waiter)
+            self.queued += 1
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Cancelled after being handed a slot: pass it on
+                    self._in_flight -= 1
+                else:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                self._wake()
+                raise
+            finally:
+                self.queued -= 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._wake()
+
+    async def async_login_turn(self) -> None:
+        """Wait for the next login turn."""
+        loop = asyncio.get_running_loop()
+        async with self._login_lock:
+            now = loop.time()
+            turn = max(now, self._next_login)
+            self._next_login = turn + LOGIN_SPACING + random.uniform(0, LOGIN_JITTER)
+        if turn > now:
+            _LOGGER.debug("Login queued for %.1fs behind other entries", turn - now)
+            await asyncio.sleep(turn - now)
+
+    @callback
+    def async_poll_phase(self, key: str, interval: float) -> float:
+        """Return the poll phase (seconds into the interval) of a coordinator."""
+        phase = self._phases.get(key)
+        if phase is None:
+            spread = (len(self._phases) * _GOLDEN_FRACTION) % 1
+            phase = (spread * interval + random.uniform(0, POLL_PHASE_JITTER)) % interval
+            self._phases[key] = phase
+            _LOGGER.debug("Poll phase of %s: %.2fs of %ss", key, phase, interval)
+        return phase
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> GatewayScheduler:
+    """Return the scheduler shared by all config entries, creating it on first use."""
+    scheduler = hass.data.get(DATA_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_SCHEDULER] = GatewayScheduler()
+    return scheduler
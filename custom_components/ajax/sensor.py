@@ -1,113 +1,73 @@
 """Sensors for Connee Alarm integration."""
 import logging
+from datetime import datetime
 
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTemperature, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 
-from .const import DOMAIN, MANUFACTURER, DEVICE_TYPE_MAP, BATTERY_DEVICES, TEMPERATURE_DEVICES
+from .const import (
+    DOMAIN,
+    MANUFACTURER,
+    DEVICE_TYPE_MAP,
+    BATTERY_DEVICES,
+    TEMPERATURE_DEVICES,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_LONG_POLL,
+    SIGNAL_NEW_DEVICES,
+    DEVICE_ENDPOINTS,
+    normalize_device_type,
+)
 from .coordinator import ConneeAlarmDataCoordinator
+from .models import Device
+from .timing import (
+    PHASE_AUTH,
+    PHASE_CYCLE,
+    PHASE_DECODE,
+    PHASE_FAN_OUT,
+    PHASE_GET_DEVICES,
+    PHASE_GET_HUB,
+    PHASE_GET_STATES,
+    PHASE_STATE_MAP,
+    POLL_PHASES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Display labels of the poll-phase timing sensors
+PHASE_LABELS = {
+    PHASE_AUTH: "Verifica Sessione",
+    PHASE_GET_HUB: "Chiamata get-hub",
+    PHASE_GET_DEVICES: "Chiamata get-hub-devices",
+    PHASE_GET_STATES: "Chiamata get-all-device-states",
+    PHASE_DECODE: "Decodifica JSON",
+    PHASE_STATE_MAP: "Mappa Stati",
+    PHASE_FAN_OUT: "Notifica Entità",
+    PHASE_CYCLE: "Ciclo Completo",
+}
 
-def _get_device_type(device: dict) -> str:
+
+def _get_device_type(device: Device) -> str:
     """Return a normalized device type string."""
-    raw = device.get("type") or device.get("deviceType") or ""
-    raw = str(raw).strip()
-
-    aliases = {
-        "DoorProtectG3": "DoorProtect",
-        "DoorProtect G3": "DoorProtect",
-        "FireProtect2": "FireProtect 2",
-        "FireProtect 2": "FireProtect 2",
-        "KeyPadTouchscreen": "KeyPadTouchScreen",
-        "KeyPadTouchScreen": "KeyPadTouchScreen",
-        "ReX2": "ReX 2",
-    }
-
-    raw = aliases.get(raw, raw)
-
-    # Normalize common suffixes/variants from API (e.g. "DoorProtect Jeweller")
-    raw_clean = raw.replace("(", " ").replace(")", " ").replace("-", " ")
-    raw_clean = " ".join(raw_clean.split())
-    raw_lower = raw_clean.lower()
-
-    if raw_lower.startswith("doorprotect"):
-        if "fibra" in raw_lower:
-            return "DoorProtect Fibra"
-        if "plus" in raw_lower:
-            return "DoorProtect Plus"
-        if "g3" in raw_lower:
-            return "DoorProtect G3"
-        return "DoorProtect"
-
-    return raw_clean
-
-
-def get_display_name(device: dict, device_type: str) -> str:
-    """Get display name from device."""
-    display_name = (
-        device.get("deviceName")
-        or device.get("name")
-        or device.get("label")
-        or device.get("device", {}).get("name")
-        or device_type
-    )
-    if display_name == device_type and device.get("deviceName"):
-        display_name = device.get("deviceName")
-    return str(display_name)
-
-
-def _get_device_id(device: dict) -> str | None:
-    """Extract device id from different Ajax payload shapes."""
-    raw_id = (
-        device.get("id")
-        or device.get("deviceId")
-        or device.get("device_id")
-        or (device.get("device") or {}).get("id")
-        or (device.get("device") or {}).get("deviceId")
-        or (device.get("device") or {}).get("device_id")
-    )
-    if raw_id is None:
-        return None
-    raw_id = str(raw_id).strip()
-    return raw_id or None
+    return normalize_device_type(device["type"])
 
 
-async def async_setup_entry(
-    hass: HomeAssistant,
-    entry: ConfigEntry,
-    async_add_entities: AddEntitiesCallback,
-) -> None:
-    """Set up Connee Alarm sensors."""
-    data = hass.data[DOMAIN][entry.entry_id]
-    coordinator = data["coordinator"]
-    api = data["api"]
-
-    entities = []
-    devices = coordinator.data.get("devices", [])
-    states = coordinator.data.get("device_states", {})
+def get_display_name(device: Device, device_type: str) -> str:
+    """Get display name from device."""
+    return device["deviceName"] or device_type
 
-    # Add diagnostic connection status sensor (always first)
-    entities.append(ConneeAlarmConnectionSensor(coordinator, api, entry))
-    
-    # Add summary/count sensors for dashboard cards
-    entities.append(ConneeAlarmSensorCountSensor(coordinator, entry))
-    entities.append(ConneeAlarmSensorOkSensor(coordinator, entry))
-    entities.append(ConneeAlarmSensorAlarmSensor(coordinator, entry))
-    entities.append(ConneeAlarmSensorOfflineSensor(coordinator, entry))
 
+def _build_device_entities(coordinator: ConneeAlarmDataCoordinator, devices: list) -> list:
+    """Create the per-device sensor entities for the given devices."""
+    entities = []
 
     for device in devices:
-        device_id = _get_device_id(device)
-        if not device_id:
-            continue
-
+        device_id = device["id"]
         device_type = _get_device_type(device)
         platform = DEVICE_TYPE_MAP.get(device_type)
 
@@ -122,7 +82,7 @@ async def async_setup_entry(
         # Battery sensor:
         # - always add for battery-powered devices
         # - also add if state shows a battery field (covers new models / variants)
-        state = states.get(device_id, {}) if isinstance(states, dict) else {}
+        state = coordinator.device_state(device_id)
         has_battery = (
             device_type in BATTERY_DEVICES
             or any(k in state for k in ("battery", "batteryLevel", "batteryCharge"))
@@ -141,19 +101,62 @@ async def async_setup_entry(
         if has_temp:
             entities.append(ConneeAlarmTemperatureSensor(coordinator, device))
 
+    return entities
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Connee Alarm sensors."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    api = data["api"]
+
+    entities = []
+    devices = coordinator.devices
+
+    # Add diagnostic connection status sensor (always first)
+    entities.append(ConneeAlarmConnectionSensor(coordinator, api, entry))
+    
+    # Add summary/count sensors for dashboard cards
+    entities.append(ConneeAlarmSensorCountSensor(coordinator, entry))
+    entities.append(ConneeAlarmSensorOkSensor(coordinator, entry))
+    entities.append(ConneeAlarmSensorAlarmSensor(coordinator, entry))
+    entities.append(ConneeAlarmSensorOfflineSensor(coordinator, entry))
+
+    # Poll-phase timing diagnostics (only the full cycle is enabled by default)
+    entities.extend(ConneeAlarmPollTimingSensor(coordinator, entry, phase) for phase in POLL_PHASES)
+
+    entities.extend(_build_device_entities(coordinator, devices))
+
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new_devices(new_devices: list) -> None:
+        """Add entities for devices enrolled after setup."""
+        new_entities = _build_device_entities(coordinator, new_devices)
+        if new_entities:
+            _LOGGER.info("Adding %d sensor entities for new devices", len(new_entities))
+            async_add_entities(new_entities)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_DEVICES.format(entry.entry_id), _async_add_new_devices
+        )
+    )
+
 
 class ConneeAlarmSensor(CoordinatorEntity, SensorEntity):
     """Sensore di stato con testi descrittivi in italiano."""
 
     _attr_has_entity_name = False
 
-    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: dict):
+    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: Device):
         """Initialize."""
         super().__init__(coordinator)
-        self._device = device
-        self._device_id = _get_device_id(device)
+        self._device_id = device["id"]
         self._device_type = _get_device_type(device)
 
         display_name = get_display_name(device, self._device_type)
@@ -171,8 +174,7 @@ class ConneeAlarmSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> str:
         """Determina lo stato testuale in base al tipo di sensore."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
 
         # 1. Controllo Online
         is_online = state.get("online", state.get("isOnline", True))
@@ -263,12 +265,12 @@ class ConneeAlarmSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra attributes."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
         return {
             "device_type": self._device_type,
             "connee_id": self._device_id,
             "raw_state": state,
+            **self.coordinator.stale_attributes(DEVICE_ENDPOINTS),
         }
 
 
@@ -281,16 +283,18 @@ class ConneeAlarmBatterySensor(CoordinatorEntity, SensorEntity):
     _attr_native_unit_of_measurement = PERCENTAGE
     _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: dict):
+    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: Device):
         """Initialize."""
         super().__init__(coordinator)
-        self._device = device
-        self._device_id = _get_device_id(device)
+        self._device_id = device["id"]
         self._device_type = _get_device_type(device)
 
         display_name = get_display_name(device, self._device_type)
 
         self._attr_unique_id = f"ajax_{self._device_id}_battery"
+        # Hourly statistics are imported by external_statistics instead
+        if coordinator.config_entry.options.get(CONF_EXTERNAL_STATISTICS):
+            self._attr_state_class = None
         self._attr_manufacturer = MANUFACTURER
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, str(self._device_id))},
@@ -299,59 +303,15 @@ class ConneeAlarmBatterySensor(CoordinatorEntity, SensorEntity):
             model=self._device_type,
         )
 
-    def _get_battery_value(self, data: dict) -> int | None:
-        """Extract battery value from data dict, trying multiple field names."""
-        # Try direct fields - batteryChargeLevelPercentage is what Ajax API uses
-        for key in ("batteryChargeLevelPercentage", "batteryCharge", "batteryLevel", "battery", "batteryPercent"):
-            val = data.get(key)
-            if val is not None:
-                try:
-                    return int(val)
-                except (ValueError, TypeError):
-                    pass
-        # Try nested battery object
-        batt_obj = data.get("battery")
-        if isinstance(batt_obj, dict):
-            for key in ("charge", "level", "percent", "percentage"):
-                val = batt_obj.get(key)
-                if val is not None:
-                    try:
-                        return int(val)
-                    except (ValueError, TypeError):
-                        pass
-        return None
-
     @property
     def native_value(self) -> int | None:
-        """Return battery level."""
-        # First check device_states (updated data)
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
-        val = self._get_battery_value(state)
-        if val is not None:
-            return val
-
-        # Fallback to initial device data
-        val = self._get_battery_value(self._device)
-        if val is not None:
-            return val
-
-        # Try to find in devices list (in case device object was updated)
-        devices = self.coordinator.data.get("devices", [])
-        for d in devices:
-            if _get_device_id(d) == self._device_id:
-                val = self._get_battery_value(d)
-                if val is not None:
-                    return val
-                break
-
-        return None
+        """Return battery level (device state, falling back to the catalog payload)."""
+        return self.coordinator.state_store.battery_of(self._device_id)
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra attributes."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
         return {
             "device_type": self._device_type,
             "connee_id": self._device_id,
@@ -359,6 +319,7 @@ class ConneeAlarmBatterySensor(CoordinatorEntity, SensorEntity):
                 k: state.get(k) for k in ("batteryChargeLevelPercentage", "battery", "batteryCharge", "batteryLevel", "batteryPercent")
                 if state.get(k) is not None
             },
+            **self.coordinator.stale_attributes(DEVICE_ENDPOINTS),
         }
 
 
@@ -373,16 +334,18 @@ class ConneeAlarmTemperatureSensor(CoordinatorEntity, SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_icon = "mdi:thermometer"
 
-    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: dict):
+    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: Device):
         """Initialize."""
         super().__init__(coordinator)
-        self._device = device
-        self._device_id = _get_device_id(device)
+        self._device_id = device["id"]
         self._device_type = _get_device_type(device)
 
         display_name = get_display_name(device, self._device_type)
 
         self._attr_unique_id = f"ajax_{self._device_id}_temperature"
+        # Hourly statistics are imported by external_statistics instead
+        if coordinator.config_entry.options.get(CONF_EXTERNAL_STATISTICS):
+            self._attr_state_class = None
         self._attr_manufacturer = MANUFACTURER
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, str(self._device_id))},
@@ -394,8 +357,7 @@ class ConneeAlarmTemperatureSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> float | None:
         """Return temperature."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
         temp = state.get("temperature", state.get("temp"))
         if temp is not None:
             try:
@@ -410,6 +372,7 @@ class ConneeAlarmTemperatureSensor(CoordinatorEntity, SensorEntity):
         return {
             "device_type": self._device_type,
             "connee_id": self._device_id,
+            **self.coordinator.stale_attributes(DEVICE_ENDPOINTS),
         }
 
 
@@ -466,16 +429,41 @@ class ConneeAlarmConnectionSensor(CoordinatorEntity, SensorEntity):
             "email": self._api.email,
         }
         
-        if self._api.backoff_remaining_seconds > 0:
+        backoff_until = self._api.backoff_until
+        if backoff_until is not None:
             attrs["backoff_remaining_seconds"] = self._api.backoff_remaining_seconds
             attrs["backoff_remaining_minutes"] = round(self._api.backoff_remaining_seconds / 60, 1)
+            # Also set when the backoff was restored from before a restart
+            attrs["backoff_until"] = backoff_until.isoformat()
         
         if self._api.token_expires:
             attrs["token_expires"] = self._api.token_expires.isoformat()
         
         if self._api._consecutive_failures > 0:
             attrs["consecutive_failures"] = self._api._consecutive_failures
-        
+
+        # Poll timings at a glance (p95 ms per phase); details on the timing sensors
+        attrs["poll_timings_p95_ms"] = {
+            phase: timer.as_dict()["p95"] for phase, timer in self.coordinator.timings.timers.items()
+        }
+
+        # Staleness marker while entities are served from the cached snapshot
+        attrs["cached_snapshot"] = self.coordinator.from_cache
+        if self.coordinator.snapshot_saved_at:
+            attrs["snapshot_saved_at"] = self.coordinator.snapshot_saved_at.isoformat()
+
+        # Long-poll mode: False while it has fallen back to fixed polling
+        if self.coordinator.config_entry.options.get(CONF_LONG_POLL):
+            attrs["long_poll_active"] = self.coordinator.long_poll_active
+
+        # Endpoints served from their last good value after a failed call (age in seconds)
+        if self.coordinator.stale:
+            now = datetime.now()
+            attrs["stale_data"] = {
+                key: int((now - fetched_at).total_seconds())
+                for key, fetched_at in self.coordinator.stale.items()
+            }
+
         return attrs
 
     @property
@@ -506,20 +494,13 @@ class ConneeAlarmSensorCountSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def native_value(self) -> int:
-        """Return total sensor count."""
-        devices = self.coordinator.data.get("devices", [])
-        # Exclude hubs from count
-        return sum(1 for d in devices if DEVICE_TYPE_MAP.get(_get_device_type(d)) != "alarm_control_panel")
+        """Return total sensor count (hubs excluded)."""
+        return len(self.coordinator.state_store)
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return device breakdown."""
-        devices = self.coordinator.data.get("devices", [])
-        type_counts = {}
-        for d in devices:
-            dtype = _get_device_type(d)
-            type_counts[dtype] = type_counts.get(dtype, 0) + 1
-        return {"device_types": type_counts}
+        return {"device_types": self.coordinator.state_store.type_counts}
 
 
 class ConneeAlarmSensorOkSensor(CoordinatorEntity, SensorEntity):
@@ -544,29 +525,8 @@ class ConneeAlarmSensorOkSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def native_value(self) -> int:
-        """Return count of OK sensors."""
-        devices = self.coordinator.data.get("devices", [])
-        states = self.coordinator.data.get("device_states", {})
-        count = 0
-        for d in devices:
-            device_id = _get_device_id(d)
-            if not device_id:
-                continue
-            dtype = _get_device_type(d)
-            if DEVICE_TYPE_MAP.get(dtype) == "alarm_control_panel":
-                continue
-            state = states.get(device_id, {}) if isinstance(states, dict) else {}
-            # Check online status
-            is_online = state.get("online", state.get("isOnline", True))
-            if is_online is False:
-                continue
-            # Check not in alarm
-            if state.get("active") or state.get("triggered") or state.get("alarm"):
-                continue
-            if str(state.get("state", "")).upper() == "ALARM":
-                continue
-            count += 1
-        return count
+        """Return count of OK sensors (online and not triggered)."""
+        return self.coordinator.state_store.count_ok()
 
 
 class ConneeAlarmSensorAlarmSensor(CoordinatorEntity, SensorEntity):
@@ -592,59 +552,13 @@ class ConneeAlarmSensorAlarmSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> int:
         """Return count of sensors in alarm state."""
-        devices = self.coordinator.data.get("devices", [])
-        states = self.coordinator.data.get("device_states", {})
-        count = 0
-        alarmed_devices = []
-        for d in devices:
-            device_id = _get_device_id(d)
-            if not device_id:
-                continue
-            dtype = _get_device_type(d)
-            if DEVICE_TYPE_MAP.get(dtype) == "alarm_control_panel":
-                continue
-            state = states.get(device_id, {}) if isinstance(states, dict) else {}
-            # Check various alarm indicators
-            is_alarm = (
-                state.get("active") is True
-                or state.get("triggered") is True
-                or state.get("alarm") is True
-                or str(state.get("state", "")).upper() == "ALARM"
-                or str(state.get("alarmState", "")).upper() == "ALARM"
-                or state.get("reedClosed") is False  # Door open = alarm for door sensors
-                or state.get("leakDetected") is True
-                or state.get("smokeAlarmDetected") is True
-                or state.get("temperatureAlarmDetected") is True
-                or state.get("glassBreakDetected") is True
-            )
-            if is_alarm:
-                count += 1
-                alarmed_devices.append(d.get("deviceName") or d.get("name") or device_id)
-        return count
+        return self.coordinator.state_store.count_alarm()
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return list of alarmed devices."""
-        devices = self.coordinator.data.get("devices", [])
-        states = self.coordinator.data.get("device_states", {})
-        alarmed = []
-        for d in devices:
-            device_id = _get_device_id(d)
-            if not device_id:
-                continue
-            state = states.get(device_id, {}) if isinstance(states, dict) else {}
-            is_alarm = (
-                state.get("active") is True
-                or state.get("triggered") is True
-                or state.get("alarm") is True
-                or str(state.get("state", "")).upper() == "ALARM"
-                or state.get("reedClosed") is False
-                or state.get("leakDetected") is True
-                or state.get("smokeAlarmDetected") is True
-            )
-            if is_alarm:
-                alarmed.append(d.get("deviceName") or d.get("name") or device_id)
-        return {"alarmed_devices": alarmed}
+        store = self.coordinator.state_store
+        return {"alarmed_devices": store.labels(store.alarm, 1)}
 
 
 class ConneeAlarmSensorOfflineSensor(CoordinatorEntity, SensorEntity):
@@ -670,33 +584,51 @@ class ConneeAlarmSensorOfflineSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> int:
         """Return count of offline sensors."""
-        devices = self.coordinator.data.get("devices", [])
-        states = self.coordinator.data.get("device_states", {})
-        count = 0
-        for d in devices:
-            device_id = _get_device_id(d)
-            if not device_id:
-                continue
-            dtype = _get_device_type(d)
-            if DEVICE_TYPE_MAP.get(dtype) == "alarm_control_panel":
-                continue
-            state = states.get(device_id, {}) if isinstance(states, dict) else {}
-            is_online = state.get("online", state.get("isOnline"))
-            if is_online is False:
-                count += 1
-        return count
+        return self.coordinator.state_store.count_offline()
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return list of offline devices."""
-        devices = self.coordinator.data.get("devices", [])
-        states = self.coordinator.data.get("device_states", {})
-        offline = []
-        for d in devices:
-            device_id = _get_device_id(d)
-            if not device_id:
-                continue
-            state = states.get(device_id, {}) if isinstance(states, dict) else {}
-            if state.get("online", state.get("isOnline")) is False:
-                offline.append(d.get("deviceName") or d.get("name") or device_id)
-        return {"offline_devices": offline}
+        store = self.coordinator.state_store
+        return {"offline_devices": store.labels(store.online, 0)}
+
+
+class ConneeAlarmPollTimingSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor with rolling p50/p95/max of one poll-cycle phase."""
+
+    _attr_has_entity_name = False
+    _attr_icon = "mdi:timer-outline"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+
+    def __init__(self, coordinator: ConneeAlarmDataCoordinator, entry: ConfigEntry, phase: str):
+        """Initialize."""
+        super().__init__(coordinator)
+        self._entry = entry
+        self._phase = phase
+        self._attr_unique_id = f"ajax_{entry.entry_id}_timing_{phase}"
+        self._attr_name = f"Connee Tempo {PHASE_LABELS.get(phase, phase)}"
+        self._attr_entity_registry_enabled_default = phase == PHASE_CYCLE
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"connee_gateway_{entry.entry_id}")},
+            name="Connee Gateway",
+            manufacturer=MANUFACTURER,
+            model="Cloud Gateway",
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the rolling p95 (ms) of the phase."""
+        return self.coordinator.timings.get(self._phase).as_dict()["p95"]
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return p50/p95/max/last and sample count."""
+        return {"phase": self._phase, **self.coordinator.timings.get(self._phase).as_dict()}
+
+    @property
+    def available(self) -> bool:
+        """Timings stay readable while the gateway is failing (that's when they matter)."""
+        return True
@@ -0,0 +1,89 @@
+"""Diagnostic services (ajax.profile, ajax.capture).
+
+The services are registered with every setup, but profiler.py and replay.py are
+only imported when one is called.
+"""
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+
+SERVICE_PROFILE = "profile"
+SERVICE_CAPTURE = "capture"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_CYCLES = "cycles"
+ATTR_TOP = "top"
+
+DEFAULT_CYCLES = 3
+DEFAULT_TOP = 25
+
+# Extra time allowed per cycle on top of the update interval (slow gateway, backoff)
+CYCLE_TIMEOUT_MARGIN = 30
+
+# Fields of the services that follow the next N poll cycles of one config entry
+CYCLES_SCHEMA = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_CYCLES, default=DEFAULT_CYCLES): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=20)
+    ),
+}
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        **CYCLES_SCHEMA,
+        vol.Optional(ATTR_TOP, default=DEFAULT_TOP): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=200)
+        ),
+    }
+)
+
+CAPTURE_SCHEMA = vol.Schema(CYCLES_SCHEMA)
+
+
+def cycles_timeout(coordinator, cycles: int) -> float:
+    """Return how long the next `cycles` poll cycles of a coordinator may take."""
+    interval = coordinator.update_interval.total_seconds() if coordinator.update_interval else 0
+    return cycles * (interval + CYCLE_TIMEOUT_MARGIN)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register ajax.profile and ajax.capture (once for all config entries)."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        return
+
+    async def _async_handle_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the next N poll cycles and return a summary."""
+        from .profiler import async_profile
+
+        return await async_profile(hass, call)
+
+    async def _async_handle_capture(call: ServiceCall) -> ServiceResponse:
+        """Capture the gateway traffic of the next N poll cycles."""
+        from .replay import async_capture
+
+        return await async_capture(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_handle_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE,
+        _async_handle_capture,
+        schema=CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,384 @@
+"""Canonical per-device state of a hub, kept in compact columns.
+
+The coordinator owns one DeviceStateStore and updates it in place on every poll:
+it is the only copy of the catalog and of the device states.
+
+- ids, device types and names are interned strings, shared with the entities;
+- the hot fields (online, open, alarm, ok, tamper, battery, temperature) are
+  typed array columns: counts are C-level array.count() reductions, and the
+  bus events come from comparing a row's cells before and after an update;
+- the rest of each payload is packed as a tuple of values against a key tuple
+  shared by every row of the same shape, with short string values shared too.
+
+Dicts are built on demand (device(), state(), states()). The state dict of a
+row is cached until an update changes that row, so the entity properties reading
+it between two polls share one dict (callers must not mutate it).
+"""
+import math
+import sys
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .const import DEVICE_TYPE_MAP, normalize_device_type
+from .events import DEVICE_EVENT_KINDS, device_event, is_alarm_state
+from .models import Device, DeviceState, battery_level, temperature_value
+
+# Tri-state column values (online, open, tamper)
+UNKNOWN = -1
+# Battery column value of a device that reports none
+NO_BATTERY = -1
+
+# Short string values (enums such as "STRONG" or "PASSIVE") are stored once per store
+SHARED_VALUE_MAX_LENGTH = 16
+SHARED_VALUES_MAX = 4096
+
+# Catalog keys held in their own columns
+_CATALOG_COLUMNS = ("id", "type", "deviceName")
+_STATE_COLUMNS = ("deviceId",)
+
+Packed = Tuple[Tuple[str, ...], Tuple[Any, ...]]
+
+
+def _tri(value: Any) -> int:
+    """Encode an optional boolean as -1 (unknown), 0 or 1."""
+    return UNKNOWN if value is None else int(bool(value))
+
+
+def _untri(value: int) -> bool | None:
+    """Decode a tri-state column value."""
+    return None if value == UNKNOWN else bool(value)
+
+
+def _is_ok(state: Dict[str, Any]) -> bool:
+    """Same rule as the "Connee Sensori OK" sensor: online and not triggered."""
+    if state.get("online", state.get("isOnline", True)) is False:
+        return False
+    if state.get("active") or state.get("triggered") or state.get("alarm"):
+        return False
+    return str(state.get("state", "")).upper() != "ALARM"
+
+
+def _battery_cell(payload: Dict[str, Any]) -> int:
+    """Return the battery column value of a payload."""
+    battery = battery_level(payload)
+    return battery if battery is not None and 0 <= battery <= 32767 else NO_BATTERY
+
+
+def _hot_cells(state: Dict[str, Any]) -> Tuple[int, int, int, int, int, int, float]:
+    """Return the (online, open, alarm, ok, tamper, battery, temperature) cells of a state."""
+    reed_closed = state.get("reedClosed")
+    temperature = temperature_value(state)
+    return (
+        _tri(state.get("online", state.get("isOnline"))),
+        UNKNOWN if reed_closed is None else int(not reed_closed),
+        int(is_alarm_state(state)),
+        int(_is_ok(state)),
+        _tri(state.get("tampered")),
+        _battery_cell(state),
+        math.nan if temperature is None else temperature,
+    )
+
+
+_EMPTY_CELLS = _hot_cells({})
+
+# Event kind -> (index in the hot cells, decoder of the cell value)
+_EVENT_CELLS = {"online": (0, _untri), "open": (1, _untri), "alarm": (2, bool), "tamper": (4, _untri)}
+
+
+class DeviceStateStore:
+    """Catalog and device states of one hub: one row per device, hubs included.
+
+    Hub rows are kept (their states feed the bus events) but left out of the
+    counts, labels and per-device views.
+    """
+
+    __slots__ = (
+        "ids",
+        "raw_types",
+        "types",
+        "names",
+        "index",
+        "type_counts",
+        "online",
+        "open",
+        "alarm",
+        "ok",
+        "tamper",
+        "battery",
+        "catalog_battery",
+        "temperature",
+        "pending_events",
+        "_hub_rows",
+        "_catalog",
+        "_states",
+        "_shapes",
+        "_values",
+        "_cache",
+    )
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self.ids: List[str] = []
+        self.raw_types: List[str] = []  # decoded type, as the gateway spells it
+        self.types: List[str] = []  # catalog spelling (normalize_device_type)
+        self.names: List[str | None] = []
+        self.index: Dict[str, int] = {}
+        # Device types of the whole catalog, hubs included
+        self.type_counts: Dict[str, int] = {}
+        self.online = array("b")
+        self.open = array("b")
+        self.alarm = array("b")
+        self.ok = array("b")
+        self.tamper = array("b")
+        self.battery = array("h")
+        self.catalog_battery = array("h")
+        self.temperature = array("d")
+        # ajax_device_event data of the transitions found by the last updates
+        self.pending_events: List[Dict[str, Any]] = []
+        self._hub_rows: frozenset[int] = frozenset()
+        # Packed catalog payload (without the column keys) and packed state, per row;
+        # the state is None until the device's first state arrives
+        self._catalog: List[Packed] = []
+        self._states: List[Packed | None] = []
+        self._shapes: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._values: Dict[str, str] = {}
+        # row -> state dict built by state(), dropped when the row changes
+        self._cache: Dict[int, DeviceState] = {}
+
+    def __len__(self) -> int:
+        """Return the number of (non-hub) devices."""
+        return len(self.ids) - len(self._hub_rows)
+
+    # Packing
+
+    def _share(self, value: Any) -> Any:
+        """Return the shared copy of a short string value."""
+        if type(value) is not str or len(value) > SHARED_VALUE_MAX_LENGTH:
+            return value
+        shared = self._values.get(value)
+        if shared is not None:
+            return shared
+        if len(self._values) < SHARED_VALUES_MAX:
+            self._values[value] = value
+        return value
+
+    def _pack(self, payload: Dict[str, Any], skip: Sequence[str]) -> Packed:
+        """Pack a payload as (shared key tuple, value tuple)."""
+        keys = tuple(key for key in payload if key not in skip)
+        shape = self._shapes.get(keys)
+        if shape is None:
+            shape = self._shapes[keys] = tuple(sys.intern(key) for key in keys)
+        return shape, tuple(self._share(payload[key]) for key in shape)
+
+    # Updates
+
+    def set_devices(self, devices: Iterable[Device]) -> None:
+        """Replace the catalog, keeping the state of the devices still enrolled."""
+        devices = list(devices)
+        old_index = self.index
+        old_states = self._states
+        old_cache = self._cache
+        old_cells = list(zip(
+            self.online, self.open, self.alarm, self.ok, self.tamper, self.battery, self.temperature
+        ))
+
+        self.ids, self.raw_types, self.types, self.names = [], [], [], []
+        self._catalog, self._states = [], []
+        self._cache = {}
+        columns = [array("b"), array("b"), array("b"), array("b"), array("b"), array("h"), array("d")]
+        self.catalog_battery = array("h")
+        type_counts: Counter = Counter()
+        hub_rows = []
+
+        for row, device in enumerate(devices):
+            device_id = device["id"]
+            device_type = normalize_device_type(device["type"])
+            type_counts[device_type] += 1
+            if DEVICE_TYPE_MAP.get(device_type) == "alarm_control_panel":
+                hub_rows.append(row)
+
+            self.ids.append(device_id)
+            self.raw_types.append(device["type"])
+            self.types.append(device_type)
+            self.names.append(device["deviceName"])
+            self._catalog.append(self._pack(device, _CATALOG_COLUMNS))
+            # Some catalog payloads carry the battery level too
+            self.catalog_battery.append(_battery_cell(device))
+
+            old_row = old_index.get(device_id)
+            self._states.append(None if old_row is None else old_states[old_row])
+            # Rows move with the catalog; the cached state of a kept device is still valid
+            cached = None if old_row is None else old_cache.get(old_row)
+            if cached is not None:
+                self._cache[row] = cached
+            cells = _EMPTY_CELLS if old_row is None else old_cells[old_row]
+            for column, cell in zip(columns, cells):
+                column.append(cell)
+
+        (
+            self.online, self.open, self.alarm, self.ok, self.tamper, self.battery, self.temperature
+        ) = columns
+        self.index = {device_id: row for row, device_id in enumerate(self.ids)}
+        self.type_counts = dict(type_counts)
+        self._hub_rows = frozenset(hub_rows)
+
+    def apply_states(self, states: Iterable[DeviceState], merge: bool = False) -> None:
+        """Update the rows of the given device states.
+
+        merge: lay the (projected) states over the last values, so the fields only
+        the full payload carries keep their last full value. Otherwise the states
+        replace the previous ones and the devices missing from them have no state.
+        States of devices not in the catalog are ignored.
+        """
+        updated = set()
+        for state in states:
+            row = self.index.get(state["deviceId"])
+            if row is None:
+                continue
+            previous = self._states[row]
+            if merge and previous is not None:
+                state = {**dict(zip(*previous)), **state}
+            self._states[row] = self._pack(state, _STATE_COLUMNS)
+            self._cache.pop(row, None)
+            self._set_cells(row, _hot_cells(state), state if previous is not None else None)
+            updated.add(row)
+
+        if not merge:
+            for row in range(len(self.ids)):
+                if row not in updated and self._states[row] is not None:
+                    self._states[row] = None
+                    self._cache.pop(row, None)
+                    self._set_cells(row, _EMPTY_CELLS, None)
+
+    def _set_cells(self, row: int, cells: Tuple, state: DeviceState | None) -> None:
+        """Write the hot cells of a row, recording transitions when `state` is given."""
+        columns = (
+            self.online, self.open, self.alarm, self.ok, self.tamper, self.battery, self.temperature
+        )
+        if state is not None:
+            for kind in DEVICE_EVENT_KINDS:
+                cell, decode = _EVENT_CELLS[kind]
+                old, new = columns[cell][row], cells[cell]
+                if old == new or new == UNKNOWN:
+                    continue
+                self.pending_events.append(device_event(
+                    self.ids[row], self.names[row], self.raw_types[row],
+                    kind, decode(old), decode(new), state,
+                ))
+        for column, cell in zip(columns, cells):
+            column[row] = cell
+
+    def pop_events(self) -> List[Dict[str, Any]]:
+        """Return and clear the pending ajax_device_event data."""
+        events, self.pending_events = self.pending_events, []
+        return events
+
+    # Reads
+
+    def rows(self) -> Iterable[int]:
+        """Return the rows of the (non-hub) devices."""
+        if not self._hub_rows:
+            return range(len(self.ids))
+        return [row for row in range(len(self.ids)) if row not in self._hub_rows]
+
+    def _count(self, column: array, value: int) -> int:
+        """Count a column value over the (non-hub) devices."""
+        return column.count(value) - sum(1 for row in self._hub_rows if column[row] == value)
+
+    def count_ok(self) -> int:
+        """Return the number of online devices not in alarm."""
+        return self._count(self.ok, 1)
+
+    def count_alarm(self) -> int:
+        """Return the number of devices in alarm."""
+        return self._count(self.alarm, 1)
+
+    def count_offline(self) -> int:
+        """Return the number of devices reported offline."""
+        return self._count(self.online, 0)
+
+    def labels(self, column: array, value: int) -> List[str]:
+        """Return the names (or ids) of the devices whose column equals `value`."""
+        return [
+            self.names[row] or self.ids[row]
+            for row, cell in enumerate(column)
+            if cell == value and row not in self._hub_rows
+        ]
+
+    def _battery(self, row: int) -> int | None:
+        """Return the battery level of a row, falling back to the catalog payload."""
+        battery = self.battery[row]
+        if battery < 0:
+            battery = self.catalog_battery[row]
+        return None if battery < 0 else battery
+
+    def battery_of(self, device_id: str) -> int | None:
+        """Return the battery level of a device."""
+        row = self.index.get(device_id)
+        return None if row is None else self._battery(row)
+
+    def temperature_of(self, device_id: str) -> float | None:
+        """Return the temperature of a device."""
+        row = self.index.get(device_id)
+        if row is None or math.isnan(self.temperature[row]):
+            return None
+        return self.temperature[row]
+
+    def compact(self, row: int) -> Dict[str, Any]:
+        """Return the compact (websocket) view of one row."""
+        temperature = self.temperature[row]
+        return {
+            "id": self.ids[row],
+            "name": self.names[row] or self.types[row],
+            "type": self.types[row],
+            "online": _untri(self.online[row]),
+            "battery": self._battery(row),
+            "temperature": None if math.isnan(temperature) else temperature,
+            "open": _untri(self.open[row]),
+            "alarm": bool(self.alarm[row]),
+        }
+
+    def device(self, row: int) -> Device:
+        """Build the catalog payload of one row."""
+        keys, values = self._catalog[row]
+        return {
+            "id": self.ids[row],
+            "type": self.raw_types[row],
+            "deviceName": self.names[row],
+            **dict(zip(keys, values)),
+        }
+
+    def devices(self) -> List[Device]:
+        """Build the catalog payloads, hubs included."""
+        return [self.device(row) for row in range(len(self.ids))]
+
+    def _state(self, row: int) -> DeviceState:
+        """Build the state payload of one row ({} before its first state)."""
+        packed = self._states[row]
+        if packed is None:
+            return {}
+        return {"deviceId": self.ids[row], **dict(zip(*packed))}
+
+    def state(self, device_id: str) -> DeviceState:
+        """Return the (cached) state payload of a device ({} if unknown)."""
+        row = self.index.get(device_id)
+        if row is None:
+            return {}
+        state = self._cache.get(row)
+        if state is None:
+            state = self._cache[row] = self._state(row)
+        return state
+
+    def states(self) -> Dict[str, DeviceState]:
+        """Build the state payloads of every device that has one, by id."""
+        return {
+            self.ids[row]: self._state(row)
+            for row in range(len(self.ids))
+            if self._states[row] is not None
+        }
+
+    def state_keys(self) -> set[str]:
+        """Return the state fields reported by at least one device."""
+        shapes = {packed[0] for packed in self._states if packed is not None}
+        return {key for shape in shapes for key in shape}
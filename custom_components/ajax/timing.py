@@ -0,0 +1,101 @@
+"""Rolling timing statistics for the phases of a poll cycle."""
+import math
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator
+
+# Samples kept per phase (60 cycles = 10 minutes at the default scan interval)
+TIMING_WINDOW = 60
+
+# Phases of a poll cycle, in execution order
+PHASE_AUTH = "auth_check"
+PHASE_GET_HUB = "get_hub"
+PHASE_GET_DEVICES = "get_hub_devices"
+PHASE_GET_STATES = "get_device_states"
+PHASE_DECODE = "json_decode"
+PHASE_STATE_MAP = "state_map"
+PHASE_FAN_OUT = "fan_out"
+PHASE_CYCLE = "cycle"
+
+POLL_PHASES = (
+    PHASE_AUTH,
+    PHASE_GET_HUB,
+    PHASE_GET_DEVICES,
+    PHASE_GET_STATES,
+    PHASE_DECODE,
+    PHASE_STATE_MAP,
+    PHASE_FAN_OUT,
+    PHASE_CYCLE,
+)
+
+
+class RollingTimer:
+    """Durations (ms) of the last N samples of one phase."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, size: int = TIMING_WINDOW):
+        """Initialize."""
+        self._samples: deque = deque(maxlen=size)
+
+    def add(self, duration_ms: float) -> None:
+        """Record a sample."""
+        self._samples.append(duration_ms)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def last(self) -> float | None:
+        """Return the most recent sample."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, pct: float) -> float | None:
+        """Return the nearest-rank percentile of the window."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def as_dict(self) -> Dict[str, float | int | None]:
+        """Return p50/p95/max/last (ms, rounded) and the sample count."""
+        if not self._samples:
+            return {"p50": None, "p95": None, "max": None, "last": None, "samples": 0}
+        return {
+            "p50": round(self.percentile(50), 1),
+            "p95": round(self.percentile(95), 1),
+            "max": round(max(self._samples), 1),
+            "last": round(self._samples[-1], 1),
+            "samples": len(self._samples),
+        }
+
+
+class PhaseTimings:
+    """Rolling timers keyed by phase name."""
+
+    def __init__(self, size: int = TIMING_WINDOW):
+        """Initialize."""
+        self._size = size
+        self.timers: Dict[str, RollingTimer] = {}
+
+    def get(self, phase: str) -> RollingTimer:
+        """Return the timer of a phase, creating it on first use."""
+        timer = self.timers.get(phase)
+        if timer is None:
+            timer = self.timers[phase] = RollingTimer(self._size)
+        return timer
+
+    def add(self, phase: str, duration_ms: float) -> None:
+        """Record a sample for a phase."""
+        self.get(phase).add(duration_ms)
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Time the enclosed block (may contain awaits) into a phase."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, (perf_counter() - start) * 1000)
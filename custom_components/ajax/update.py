@@ -1,4 +1,8 @@
-"""Firmware update entities for Connee Alarm integration."""
+"""Firmware update entities for Connee Alarm integration.
+
+These entities listen to the metadata coordinator (hours-long cadence), not to
+the 10 s data coordinator.
+"""
 import logging
 from typing import Any
 
@@ -8,36 +12,42 @@ from homeassistant.components.update import (
     UpdateDeviceClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 
-from .const import DOMAIN, MANUFACTURER, DEVICE_TYPE_MAP, CONNEE_LOGO_URL
-from .coordinator import ConneeAlarmDataCoordinator
+from .const import DOMAIN, MANUFACTURER, DEVICE_TYPE_MAP, CONNEE_LOGO_URL, SIGNAL_NEW_DEVICES
+from .metadata import ConneeAlarmMetadataCoordinator
+from .models import Device
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _get_device_id(device: dict) -> str | None:
-    """Get device ID from various possible keys."""
-    return device.get("id") or device.get("deviceId")
+def _get_device_type(device: Device) -> str:
+    """Return the device type string."""
+    return device["type"]
 
 
-def _get_device_type(device: dict) -> str:
-    """Return a normalized device type string."""
-    raw = device.get("type") or device.get("deviceType") or ""
-    return str(raw).strip()
+def _get_display_name(device: Device, device_type: str) -> str:
+    """Best-effort display name."""
+    return device["deviceName"] or device_type
 
 
-def _get_display_name(device: dict, device_type: str) -> str:
-    """Best-effort display name."""
-    return (
-        device.get("deviceName")
-        or device.get("name")
-        or device.get("label")
-        or device_type
-    )
+def _build_device_entities(coordinator: ConneeAlarmMetadataCoordinator, devices: list) -> list:
+    """Create firmware update entities for the given (non-hub) devices."""
+    entities = []
+
+    for device in devices:
+        device_type = _get_device_type(device)
+        # Skip hubs - they are handled separately
+        if DEVICE_TYPE_MAP.get(device_type) == "alarm_control_panel":
+            continue
+
+        entities.append(ConneeAlarmDeviceUpdate(coordinator, device))
+
+    return entities
 
 
 async def async_setup_entry(
@@ -47,11 +57,11 @@ async def async_setup_entry(
 ) -> None:
     """Set up Connee Alarm update entities."""
     data = hass.data[DOMAIN][entry.entry_id]
-    coordinator = data["coordinator"]
+    coordinator = data["metadata"]
 
     entities = []
-    devices = coordinator.data.get("devices", [])
-    hub_state = coordinator.data.get("hub_state", {})
+    devices = data["coordinator"].devices
+    hub_state = data["coordinator"].data.get("hub_state", {})
 
     # Add hub update entity
     if hub_state:
@@ -60,21 +70,26 @@ async def async_setup_entry(
             entities.append(ConneeAlarmHubUpdate(coordinator, hub_state, hub_id))
 
     # Add device update entities
-    for device in devices:
-        device_id = _get_device_id(device)
-        if not device_id:
-            continue
-
-        device_type = _get_device_type(device)
-        # Skip hubs - they are handled separately above
-        if DEVICE_TYPE_MAP.get(device_type) == "alarm_control_panel":
-            continue
-
-        entities.append(ConneeAlarmDeviceUpdate(coordinator, device))
+    entities.extend(_build_device_entities(coordinator, devices))
 
     _LOGGER.info("Setting up %d update entities", len(entities))
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new_devices(new_devices: list) -> None:
+        """Add entities for devices enrolled after setup."""
+        coordinator.async_add_devices(new_devices)
+        new_entities = _build_device_entities(coordinator, new_devices)
+        if new_entities:
+            _LOGGER.info("Adding %d update entities for new devices", len(new_entities))
+            async_add_entities(new_entities)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_DEVICES.format(entry.entry_id), _async_add_new_devices
+        )
+    )
+
 
 class ConneeAlarmHubUpdate(CoordinatorEntity, UpdateEntity):
     """Firmware update entity for Connee Alarm hub."""
@@ -83,11 +98,10 @@ class ConneeAlarmHubUpdate(CoordinatorEntity, UpdateEntity):
     _attr_device_class = UpdateDeviceClass.FIRMWARE
     _attr_supported_features = UpdateEntityFeature(0)  # Read-only, no install
 
-    def __init__(self, coordinator: ConneeAlarmDataCoordinator, hub_state: dict, hub_id: str):
+    def __init__(self, coordinator: ConneeAlarmMetadataCoordinator, hub_state: dict, hub_id: str):
         """Initialize."""
         super().__init__(coordinator)
         self._hub_id = hub_id
-        self._hub_state = hub_state
 
         hub_name = hub_state.get("name") or hub_state.get("hubName") or "Ajax Hub"
         model = hub_state.get("model") or hub_state.get("type") or "Hub"
@@ -109,32 +123,21 @@ class ConneeAlarmHubUpdate(CoordinatorEntity, UpdateEntity):
     @property
     def installed_version(self) -> str | None:
         """Return the current firmware version."""
-        hub_state = self.coordinator.data.get("hub_state", {})
-        # Ajax API returns firmware as nested object: { firmware: { version: "..." } }
-        firmware_obj = hub_state.get("firmware", {})
-        if isinstance(firmware_obj, dict) and firmware_obj.get("version"):
-            return firmware_obj.get("version")
-        return hub_state.get("firmwareVersion") or hub_state.get("firmware_version")
+        return self.coordinator.data["hub"]["installed"]
 
     @property
     def latest_version(self) -> str | None:
-        """Return the latest available version (same as installed for read-only)."""
-        return self.installed_version
+        """Return the latest available version (installed if the gateway does not say)."""
+        return self.coordinator.data["hub"]["latest"]
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra attributes."""
-        hub_state = self.coordinator.data.get("hub_state", {})
-        attrs = {
+        return {
             "device_type": "Hub",
             "connee_id": self._hub_id,
+            **self.coordinator.data["hub"]["attributes"],
         }
-        
-        for key in ("model", "type", "firmwareVersion", "osVersion", "kernelVersion"):
-            if key in hub_state:
-                attrs[key] = hub_state[key]
-
-        return attrs
 
 
 class ConneeAlarmDeviceUpdate(CoordinatorEntity, UpdateEntity):
@@ -144,11 +147,10 @@ class ConneeAlarmDeviceUpdate(CoordinatorEntity, UpdateEntity):
     _attr_device_class = UpdateDeviceClass.FIRMWARE
     _attr_supported_features = UpdateEntityFeature(0)  # Read-only, no install
 
-    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: dict):
+    def __init__(self, coordinator: ConneeAlarmMetadataCoordinator, device: Device):
         """Initialize."""
         super().__init__(coordinator)
-        self._device = device
-        self._device_id = _get_device_id(device)
+        self._device_id = device["id"]
         self._device_type = _get_device_type(device)
 
         display_name = _get_display_name(device, self._device_type)
@@ -167,32 +169,26 @@ class ConneeAlarmDeviceUpdate(CoordinatorEntity, UpdateEntity):
         """Return Connee official logo."""
         return CONNEE_LOGO_URL
 
+    @property
+    def _metadata(self) -> dict[str, Any]:
+        """Return the metadata entry of this device."""
+        return self.coordinator.data["devices"].get(self._device_id, {})
+
     @property
     def installed_version(self) -> str | None:
         """Return the current firmware version."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
-        return state.get("firmwareVersion") or state.get("firmware_version") or self._device.get("firmwareVersion")
+        return self._metadata.get("installed")
 
     @property
     def latest_version(self) -> str | None:
-        """Return the latest available version (same as installed for read-only)."""
-        return self.installed_version
+        """Return the latest available version (installed if the gateway does not say)."""
+        return self._metadata.get("latest")
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra attributes."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
-
-        attrs = {
+        return {
             "device_type": self._device_type,
             "connee_id": self._device_id,
+            **self._metadata.get("attributes", {}),
         }
-
-        for key in ("firmwareVersion", "hwVersion", "bootVersion"):
-            val = state.get(key)
-            if val is not None:
-                attrs[key] = val
-
-        return attrs
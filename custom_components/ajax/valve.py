@@ -8,31 +8,41 @@ from typing import Any
 
 from homeassistant.components.valve import ValveEntity, ValveDeviceClass, ValveEntityFeature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 
-from .const import DOMAIN, MANUFACTURER, DEVICE_TYPE_MAP
+from .const import DOMAIN, MANUFACTURER, DEVICE_TYPE_MAP, DEVICE_ENDPOINTS, SIGNAL_NEW_DEVICES
 from .coordinator import ConneeAlarmDataCoordinator
+from .models import Device
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _get_device_type(device: dict) -> str:
-    """Return a normalized device type string."""
-    raw = device.get("type") or device.get("deviceType") or ""
-    return str(raw).strip()
+def _get_device_type(device: Device) -> str:
+    """Return the device type string."""
+    return device["type"]
 
 
-def _get_display_name(device: dict, device_type: str) -> str:
+def _get_display_name(device: Device, device_type: str) -> str:
     """Best-effort display name."""
-    return (
-        device.get("deviceName")
-        or device.get("name")
-        or device.get("label")
-        or device_type
-    )
+    return device["deviceName"] or device_type
+
+
+def _build_entities(coordinator: ConneeAlarmDataCoordinator, devices: list, api) -> list:
+    """Create valve entities for the given devices."""
+    entities = []
+
+    for device in devices:
+        device_type = _get_device_type(device)
+        platform = DEVICE_TYPE_MAP.get(device_type)
+
+        if platform == "valve":
+            entities.append(ConneeAlarmValve(coordinator, device, api))
+
+    return entities
 
 
 async def async_setup_entry(
@@ -45,23 +55,25 @@ async def async_setup_entry(
     coordinator = data["coordinator"]
     api = data["api"]
 
-    entities = []
-    devices = coordinator.data.get("devices", [])
-
-    for device in devices:
-        device_id = device.get("id") or device.get("deviceId")
-        if not device_id:
-            continue
-
-        device_type = _get_device_type(device)
-        platform = DEVICE_TYPE_MAP.get(device_type)
-
-        if platform == "valve":
-            entities.append(ConneeAlarmValve(coordinator, device, api))
+    entities = _build_entities(coordinator, coordinator.devices, api)
 
     _LOGGER.info("Setting up %d valve entities (read-only)", len(entities))
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new_devices(new_devices: list) -> None:
+        """Add entities for devices enrolled after setup."""
+        new_entities = _build_entities(coordinator, new_devices, api)
+        if new_entities:
+            _LOGGER.info("Adding %d valve entities for new devices", len(new_entities))
+            async_add_entities(new_entities)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_DEVICES.format(entry.entry_id), _async_add_new_devices
+        )
+    )
+
 
 class ConneeAlarmValve(CoordinatorEntity, ValveEntity):
     """Connee Alarm WaterStop valve (READ-ONLY - Ajax API does not support control)."""
@@ -72,11 +84,10 @@ class ConneeAlarmValve(CoordinatorEntity, ValveEntity):
     _attr_supported_features = ValveEntityFeature(0)
     _attr_reports_position = False
 
-    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: dict, api):
+    def __init__(self, coordinator: ConneeAlarmDataCoordinator, device: Device, api):
         """Initialize."""
         super().__init__(coordinator)
-        self._device = device
-        self._device_id = device.get("id") or device.get("deviceId")
+        self._device_id = device["id"]
         self._device_type = _get_device_type(device)
         self._api = api
 
@@ -94,8 +105,7 @@ class ConneeAlarmValve(CoordinatorEntity, ValveEntity):
     @property
     def is_closed(self) -> bool | None:
         """Return true if valve is closed."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
 
         valve_state = state.get("valveState")
         if valve_state is not None:
@@ -106,16 +116,14 @@ class ConneeAlarmValve(CoordinatorEntity, ValveEntity):
     @property
     def is_opening(self) -> bool:
         """Return true if valve is opening."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
         motor_state = state.get("motorState", "")
         return str(motor_state).upper() == "OPENING"
 
     @property
     def is_closing(self) -> bool:
         """Return true if valve is closing."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
         motor_state = state.get("motorState", "")
         return str(motor_state).upper() == "CLOSING"
 
@@ -126,14 +134,14 @@ class ConneeAlarmValve(CoordinatorEntity, ValveEntity):
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra attributes."""
-        states = self.coordinator.data.get("device_states", {})
-        state = states.get(self._device_id, {}) if isinstance(states, dict) else {}
+        state = self.coordinator.device_state(self._device_id)
 
         attrs = {
             "device_type": self._device_type,
             "connee_id": self._device_id,
             "read_only": True,
             "control_note": "Ajax API does not support remote valve control",
+            **self.coordinator.stale_attributes(DEVICE_ENDPOINTS),
         }
 
         # WaterStop specific attributes
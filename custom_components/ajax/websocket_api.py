@@ -0,0 +1,203 @@
+"""WebSocket commands exposing a compact hub snapshot and per-device diffs."""
+import logging
+from typing import Any, Callable, Dict, List
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN, SIGNAL_ENTRY_UNLOADED
+from .helpers import find_coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_WS_REGISTERED = f"{DOMAIN}_websocket_registered"
+DATA_WS_FEEDS = f"{DOMAIN}_websocket_feeds"
+
+
+def _compact_devices(coordinator) -> Dict[str, Dict[str, Any]]:
+    """Return the compact view of every (non-hub) device, keyed by id."""
+    store = coordinator.state_store
+    return {store.ids[row]: store.compact(row) for row in store.rows()}
+
+
+def _compact_hub(coordinator) -> Dict[str, Any]:
+    """Return the compact view of the hub and of the gateway connection."""
+    hub_state = coordinator.data.get("hub_state", {})
+    return {
+        "id": coordinator.hub_id,
+        "name": hub_state.get("name") or hub_state.get("hubName") or "Ajax Hub",
+        "arm_state": hub_state.get("armState", hub_state.get("state")),
+        "connection": coordinator.api.connection_status,
+        "cached": coordinator.from_cache,
+        "stale": sorted(coordinator.stale),
+    }
+
+
+def _counts(coordinator) -> Dict[str, int]:
+    """Return device totals by condition (same rules as the summary sensors)."""
+    store = coordinator.state_store
+    return {
+        "total": len(store),
+        "ok": store.count_ok(),
+        "alarm": store.count_alarm(),
+        "offline": store.count_offline(),
+    }
+
+
+class _DeviceFeed:
+    """Compact view of one coordinator, diffed once per update for all its subscribers."""
+
+    def __init__(self, hass: HomeAssistant, coordinator) -> None:
+        """Take the current view and follow the coordinator updates."""
+        self._hass = hass
+        self.coordinator = coordinator
+        self.devices = _compact_devices(coordinator)
+        self.hub = _compact_hub(coordinator)
+        self.counts = _counts(coordinator)
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._remove_listener = coordinator.async_add_listener(self._async_update)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the last view as a full snapshot."""
+        return {"hub": self.hub, "devices": list(self.devices.values()), "counts": self.counts}
+
+    @callback
+    def async_subscribe(self, send: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        """Send the changes to `send`; the returned callback stops it."""
+        self._subscribers.append(send)
+
+        @callback
+        def _async_unsubscribe() -> None:
+            """Stop sending; the last subscriber leaving detaches the feed."""
+            self._subscribers.remove(send)
+            if self._subscribers:
+                return
+            self._remove_listener()
+            feeds = self._hass.data[DATA_WS_FEEDS]
+            if feeds.get(self.coordinator.config_entry.entry_id) is self:
+                del feeds[self.coordinator.config_entry.entry_id]
+
+        return _async_unsubscribe
+
+    @callback
+    def _async_update(self) -> None:
+        """Diff against the last view and send the changes to every subscriber."""
+        coordinator = self.coordinator
+        if not coordinator.data:
+            return
+        devices = _compact_devices(coordinator)
+        hub = _compact_hub(coordinator)
+
+        changed = [d for device_id, d in devices.items() if self.devices.get(device_id) != d]
+        removed = [device_id for device_id in self.devices if device_id not in devices]
+        if not changed and not removed and hub == self.hub:
+            return
+
+        self.counts = _counts(coordinator)
+        event: Dict[str, Any] = {"changed": changed, "removed": removed, "counts": self.counts}
+        if hub != self.hub:
+            event["hub"] = hub
+        self.devices, self.hub = devices, hub
+        for send in list(self._subscribers):
+            send(event)
+
+
+@callback
+def _async_get_feed(hass: HomeAssistant, coordinator) -> _DeviceFeed:
+    """Return the feed of a coordinator, started by its first subscriber."""
+    feeds: Dict[str, _DeviceFeed] = hass.data.setdefault(DATA_WS_FEEDS, {})
+    entry_id = coordinator.config_entry.entry_id
+    feed = feeds.get(entry_id)
+    if feed is None or feed.coordinator is not coordinator:
+        feed = feeds[entry_id] = _DeviceFeed(hass, coordinator)
+    return feed
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/hub_snapshot",
+        vol.Optional("entry_id"): str,
+    }
+)
+@callback
+def websocket_hub_snapshot(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]
+) -> None:
+    """Return the whole hub as one compact snapshot."""
+    coordinator = find_coordinator(hass, msg.get("entry_id"))
+    if coordinator is None or not coordinator.data:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Hub non disponibile")
+        return
+
+    connection.send_result(
+        msg["id"],
+        {
+            "hub": _compact_hub(coordinator),
+            "devices": list(_compact_devices(coordinator).values()),
+            "counts": _counts(coordinator),
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_devices",
+        vol.Optional("entry_id"): str,
+    }
+)
+@callback
+def websocket_subscribe_devices(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]
+) -> None:
+    """Send a full snapshot, then only what changed after every refresh.
+
+    The subscription ends with an error when its config entry is unloaded or
+    reloaded: the client subscribes again to follow the new coordinator.
+    """
+    coordinator = find_coordinator(hass, msg.get("entry_id"))
+    if coordinator is None or not coordinator.data:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Hub non disponibile")
+        return
+
+    feed = _async_get_feed(hass, coordinator)
+    remove_feed = feed.async_subscribe(
+        lambda event: connection.send_message(websocket_api.event_message(msg["id"], event))
+    )
+
+    @callback
+    def _async_unsubscribe() -> None:
+        """Detach from the feed and from the unload signal."""
+        remove_feed()
+        remove_unload()
+
+    @callback
+    def _async_entry_unloaded() -> None:
+        """End the subscription: the coordinator is gone."""
+        if connection.subscriptions.pop(msg["id"], None) is None:
+            return
+        _async_unsubscribe()
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            "Integrazione scaricata o ricaricata: ripetere la sottoscrizione",
+        )
+
+    remove_unload = async_dispatcher_connect(
+        hass, SIGNAL_ENTRY_UNLOADED.format(coordinator.config_entry.entry_id), _async_entry_unloaded
+    )
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], {"snapshot": feed.snapshot()}))
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands (once for all config entries)."""
+    if hass.data.get(DATA_WS_REGISTERED):
+        return
+    hass.data[DATA_WS_REGISTERED] = True
+    websocket_api.async_register_command(hass, websocket_hub_snapshot)
+    websocket_api.async_register_command(hass, websocket_subscribe_devices)
@@ -0,0 +1,145 @@
+"""Helpers of the Connee Alarm behaviour tests.
+
+The integration runs against the in-memory gateway of the benchmarks, with a
+real ConneeAlarmApiClient and coordinator, on a bare HomeAssistant instance.
+"""
+import json
+from types import MappingProxyType
+
+from benchmarks.conftest import HUB_ID, FakeGatewaySession
+
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+import custom_components.ajax as ajax
+from custom_components.ajax.api import ConneeAlarmApiClient
+from custom_components.ajax.const import CONF_HUB_ID, DOMAIN
+from custom_components.ajax.coordinator import ConneeAlarmDataCoordinator
+
+DEVICE_ID = "test-device-id"
+
+
+class GatewayResponse:
+    """aiohttp response stand-in with a status code."""
+
+    def __init__(self, payload, status: int = 200):
+        self.status = status
+        self._body = json.dumps(payload).encode()
+        self.content_length = len(self._body)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def ok(data) -> GatewayResponse:
+    """Return a successful gateway answer carrying `data`."""
+    return GatewayResponse({"success": True, "data": data})
+
+
+def error(message: str, status: int = 200) -> GatewayResponse:
+    """Return a gateway error answer."""
+    return GatewayResponse({"success": False, "error": message}, status)
+
+
+class ScriptedGateway(FakeGatewaySession):
+    """In-memory gateway that records requests and serves scripted answers first.
+
+    Actions without a scripted answer are served from the hub payload, as in
+    the benchmarks.
+    """
+
+    def __init__(self, hub: dict):
+        super().__init__(hub)
+        self.requests: list[tuple[str, dict]] = []
+        self._script: dict[str, list] = {}
+
+    def serve(self, hub: dict) -> None:
+        """Serve another hub payload from now on (enrolment or state changes)."""
+        FakeGatewaySession.__init__(self, hub)
+
+    def script(self, action: str, *replies) -> None:
+        """Queue answers for an action: GatewayResponses, or exceptions to raise."""
+        self._script.setdefault(action, []).extend(replies)
+
+    def actions(self) -> list[str]:
+        """Return the actions requested so far, in order."""
+        return [action for action, _body in self.requests]
+
+    def request(self, method, url, json=None, headers=None, timeout=None):
+        action = url.rsplit("action=", 1)[-1]
+        self.requests.append((action, dict(json or {})))
+        queued = self._script.get(action)
+        if queued:
+            reply = queued.pop(0)
+            if isinstance(reply, BaseException):
+                raise reply
+            return reply
+        return super().request(method, url, json=json, headers=headers, timeout=timeout)
+
+
+def run(hass: HomeAssistant, coro):
+    """Run a coroutine to completion on the test loop."""
+    return hass.loop.run_until_complete(coro)
+
+
+def make_entry(hass: HomeAssistant, options: dict | None = None) -> ConfigEntry:
+    """Add a config entry for the synthetic hub, in the state setup runs in."""
+    entry = ConfigEntry(
+        data={
+            "email": "test@example.com",
+            "password": "secret",
+            "device_id": DEVICE_ID,
+            CONF_HUB_ID: HUB_ID,
+        },
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options=options or {},
+        source=config_entries.SOURCE_USER,
+        state=ConfigEntryState.SETUP_IN_PROGRESS,
+        title="Test Hub",
+        unique_id=None,
+        version=2,
+    )
+    hass.config_entries._entries[entry.entry_id] = entry
+    return entry
+
+
+def make_api(gateway: ScriptedGateway) -> ConneeAlarmApiClient:
+    """Return a client talking to the in-memory gateway."""
+    return ConneeAlarmApiClient(
+        session=gateway, email="test@example.com", password="secret", device_id=DEVICE_ID
+    )
+
+
+def make_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, api: ConneeAlarmApiClient
+) -> ConneeAlarmDataCoordinator:
+    """Return a coordinator of the synthetic hub bound to the entry, as setup builds it."""
+    api.hub_id = HUB_ID
+    token = config_entries.current_entry.set(entry)
+    try:
+        return ConneeAlarmDataCoordinator(hass, api, HUB_ID)
+    finally:
+        config_entries.current_entry.reset(token)
+
+
+async def async_setup(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Run async_setup_entry the way the config entry setup does."""
+    token = config_entries.current_entry.set(entry)
+    try:
+        return await ajax.async_setup_entry(hass, entry)
+    finally:
+        config_entries.current_entry.reset(token)
+
+
+def coordinator_of(hass: HomeAssistant, entry: ConfigEntry) -> ConneeAlarmDataCoordinator:
+    """Return the coordinator set up for the entry."""
+    return hass.data[DOMAIN][entry.entry_id]["coordinator"]
@@ -0,0 +1,73 @@
+"""Shared fixtures for the Connee Alarm behaviour tests.
+
+A bare HomeAssistant instance with config entries and device registry loaded,
+and the in-memory gateway (tests/common.py). Platforms are not loaded by
+async_setup_entry: their forwards are recorded.
+"""
+import asyncio
+
+import pytest
+
+from benchmarks.conftest import make_hub
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+import custom_components.ajax as ajax
+from custom_components.ajax import scheduler
+from custom_components.ajax.metrics_view import DATA_METRICS_REGISTERED
+
+from .common import ScriptedGateway
+
+
+@pytest.fixture(autouse=True)
+def no_login_spacing(monkeypatch):
+    """Logins of the tests do not wait for their turn."""
+    monkeypatch.setattr(scheduler, "LOGIN_SPACING", 0)
+    monkeypatch.setattr(scheduler, "LOGIN_JITTER", 0)
+
+
+@pytest.fixture
+def hass(tmp_path):
+    """Bare HomeAssistant instance with config entries and device registry."""
+    loop = asyncio.new_event_loop()
+
+    async def _make_hass() -> HomeAssistant:
+        hass = HomeAssistant(str(tmp_path))
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        await dr.async_load(hass)
+        # No http component here
+        hass.data[DATA_METRICS_REGISTERED] = True
+        return hass
+
+    hass = loop.run_until_complete(_make_hass())
+    yield hass
+    loop.run_until_complete(hass.async_stop(force=True))
+    loop.close()
+
+
+@pytest.fixture
+def gateway() -> ScriptedGateway:
+    """Gateway serving a synthetic 10-device hub."""
+    return ScriptedGateway(make_hub(10))
+
+
+@pytest.fixture
+def forwarded(hass: HomeAssistant, gateway: ScriptedGateway, monkeypatch) -> list[set]:
+    """Let async_setup_entry run on the in-memory gateway; returns the forwarded platform sets."""
+    forwarded: list[set] = []
+
+    async def _async_forward_entry_setups(entry, platforms):
+        forwarded.append(set(platforms))
+
+    async def _async_register_panel(hass):
+        return None
+
+    monkeypatch.setattr(
+        hass.config_entries, "async_forward_entry_setups", _async_forward_entry_setups
+    )
+    monkeypatch.setattr(ajax, "async_get_clientsession", lambda hass: gateway)
+    monkeypatch.setattr(ajax, "async_register_panel", _async_register_panel)
+    return forwarded
@@ -0,0 +1,106 @@
+"""Arm/disarm: applying the command result and the transitional panel states."""
+import pytest
+
+from homeassistant.components.alarm_control_panel import AlarmControlPanelState
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.exceptions import HomeAssistantError
+
+from benchmarks.conftest import HUB_ID, make_hub
+from custom_components.ajax.alarm_control_panel import ConneeAlarmControlPanel
+
+from .common import error, make_api, make_coordinator, make_entry, ok, run
+
+ENTITY_ID = "alarm_control_panel.test_hub"
+
+
+@pytest.fixture
+def coordinator(hass, gateway):
+    """Coordinator of the synthetic (disarmed) hub after a first poll."""
+    coordinator = make_coordinator(hass, make_entry(hass), make_api(gateway))
+    run(hass, coordinator.async_refresh())
+    assert coordinator.data["hub_state"]["armState"] == "DISARMED"
+    gateway.requests.clear()
+    return coordinator
+
+
+def _armed_hub() -> dict:
+    """Return the synthetic hub state, armed."""
+    return {**make_hub(10)["hub_state"], "armState": "ARMED"}
+
+
+def test_response_with_arm_state_is_applied(hass, gateway, coordinator):
+    """An arm-hub answer carrying the arm state is published without a read."""
+    run(hass, coordinator.async_apply_arm_result({"armState": "ARMED"}))
+    assert coordinator.data["hub_state"]["armState"] == "ARMED"
+    assert coordinator.data["hub_state"]["name"] == "Bench Hub"
+    assert gateway.actions() == []
+
+
+@pytest.mark.parametrize("response", [{}, {"state": "ok"}, {"armState": None}])
+def test_acknowledgement_reads_the_hub(hass, gateway, coordinator, response):
+    """An answer without a recognizable arm state is followed by one get-hub read."""
+    gateway.script("get-hub", ok(_armed_hub()))
+    run(hass, coordinator.async_apply_arm_result(response))
+    assert gateway.actions() == ["get-hub"]
+    assert coordinator.data["hub_state"]["armState"] == "ARMED"
+    assert coordinator.data["hub_state"].get("state") != "ok"
+
+
+def test_failed_read_falls_back_to_a_refresh(hass, gateway, coordinator):
+    """When the get-hub read fails too, the coordinator refreshes in full."""
+    gateway.script("get-hub", error("boom"))
+    gateway.serve({**make_hub(10), "hub_state": _armed_hub()})
+    run(hass, coordinator.async_apply_arm_result({"state": "ok"}))
+    assert gateway.actions()[0] == "get-hub"
+    assert "get-hub-devices" in gateway.actions()
+    assert coordinator.data["hub_state"]["armState"] == "ARMED"
+
+
+def _panel(hass, coordinator) -> ConneeAlarmControlPanel:
+    """Return the panel entity, writing its state under ENTITY_ID."""
+    panel = ConneeAlarmControlPanel(coordinator, coordinator.api, HUB_ID)
+    panel.hass = hass
+    panel.entity_id = ENTITY_ID
+    return panel
+
+
+def _record_states(hass) -> list:
+    """Return the list the panel states get appended to as they are written."""
+    states = []
+    hass.bus.async_listen(
+        EVENT_STATE_CHANGED, lambda event: states.append(event.data["new_state"].state)
+    )
+    return states
+
+
+def test_arm_shows_arming_until_applied(hass, gateway, coordinator):
+    """Arming shows ARMING while the command is in flight, then the new state."""
+    panel = _panel(hass, coordinator)
+    states = _record_states(hass)
+    gateway.script("arm-hub", ok({"armState": "ARMED"}))
+    run(hass, panel.async_alarm_arm_away())
+    run(hass, hass.async_block_till_done())
+    assert states == [AlarmControlPanelState.ARMING, AlarmControlPanelState.ARMED_AWAY]
+
+
+def test_disarm_shows_disarming_until_applied(hass, gateway, coordinator):
+    """Disarming shows DISARMING, then the state read back from the hub."""
+    coordinator.async_set_updated_data({"hub_state": _armed_hub()})
+    panel = _panel(hass, coordinator)
+    states = _record_states(hass)
+    gateway.script("arm-hub", ok({"state": "ok"}))
+    gateway.script("get-hub", ok(make_hub(10)["hub_state"]))
+    run(hass, panel.async_alarm_disarm())
+    run(hass, hass.async_block_till_done())
+    assert states == [AlarmControlPanelState.DISARMING, AlarmControlPanelState.DISARMED]
+
+
+def test_failed_command_clears_the_transitional_state(hass, gateway, coordinator):
+    """A rejected command raises and the panel goes back to the current state."""
+    panel = _panel(hass, coordinator)
+    states = _record_states(hass)
+    gateway.script("arm-hub", error("rejected"))
+    with pytest.raises(HomeAssistantError):
+        run(hass, panel.async_alarm_arm_night())
+    run(hass, hass.async_block_till_done())
+    assert states == [AlarmControlPanelState.ARMING, AlarmControlPanelState.DISARMED]
@@ -0,0 +1,50 @@
+"""Gateway client: decode timing."""
+import asyncio
+
+from benchmarks.conftest import HUB_ID
+from custom_components.ajax.timing import PHASE_DECODE
+
+from .common import GatewayResponse, make_api, ok, run
+
+READ_SECONDS = 0.05
+
+
+class SlowBodyResponse(GatewayResponse):
+    """Response whose body takes a while to arrive."""
+
+    async def read(self) -> bytes:
+        await asyncio.sleep(READ_SECONDS)
+        return await super().read()
+
+
+async def _async_logged_in(api):
+    """Log the client in and drop the timings of the login."""
+    assert await api.login()
+    api.timings.timers.clear()
+    return api
+
+
+def test_decode_timed_for_poll_reads_only(hass, gateway):
+    """Poll reads record a decode sample; login, commands and long-polls do not."""
+    api = make_api(gateway)
+    assert run(hass, api.login())
+    assert len(api.timings.get(PHASE_DECODE)) == 0
+
+    run(hass, api.get_hub_state(HUB_ID))
+    run(hass, api.get_hub_devices(HUB_ID))
+    run(hass, api.get_device_states(HUB_ID))
+    assert len(api.timings.get(PHASE_DECODE)) == 3
+
+    gateway.script("arm-hub", ok({"armState": "ARMED"}))
+    gateway.script("get-all-device-states", ok({"cursor": "c1", "changed": False}))
+    run(hass, api.arm_hub(HUB_ID, "ARM"))
+    run(hass, api.wait_device_states(HUB_ID, None))
+    assert len(api.timings.get(PHASE_DECODE)) == 3
+
+
+def test_decode_excludes_the_body_read(hass, gateway):
+    """The decode sample covers json.loads, not the time the body takes to arrive."""
+    api = run(hass, _async_logged_in(make_api(gateway)))
+    gateway.script("get-hub", SlowBodyResponse({"success": True, "data": {"armState": "ARMED"}}))
+    assert run(hass, api.get_hub_state(HUB_ID)) == {"armState": "ARMED"}
+    assert api.timings.get(PHASE_DECODE).last < READ_SECONDS * 1000 / 2
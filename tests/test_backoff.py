@@ -0,0 +1,103 @@
+"""Backoff persisted across restarts, and the login-storm guard."""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.ajax import backoff
+from custom_components.ajax.backoff import BackoffStore, async_get_backoff_store
+from custom_components.ajax.const import LOGIN_STORM_LIMIT, LOGIN_STORM_WINDOW
+
+from .common import make_api, run
+
+
+@pytest.fixture(autouse=True)
+def immediate_backoff_writes(monkeypatch):
+    """Backoff changes are written at once."""
+    monkeypatch.setattr(backoff, "BACKOFF_SAVE_DELAY", 0)
+
+
+def _logins(gateway) -> int:
+    """Return the number of login requests sent."""
+    return gateway.actions().count("login")
+
+
+async def _async_restarted_client(hass, gateway):
+    """Return a client restored from .storage, as setup after a restart builds it."""
+    await hass.async_block_till_done()
+    api = make_api(gateway)
+    store = BackoffStore(hass)
+    await store.async_load()
+    store.async_restore(api)
+    return api
+
+
+def test_backoff_survives_a_restart(hass, gateway):
+    """A ban that started before a restart is honoured: no login until it ends."""
+    api = make_api(gateway)
+    run(hass, async_get_backoff_store(hass)).async_restore(api)
+    api._set_backoff()
+
+    restarted = run(hass, _async_restarted_client(hass, gateway))
+    assert restarted.backoff_remaining_seconds > 0
+    assert restarted._consecutive_failures == 1
+    assert not run(hass, restarted.login())
+    assert _logins(gateway) == 0
+
+
+def test_recent_logins_survive_a_restart(hass, gateway):
+    """Logins made before a restart count towards the storm limit after it."""
+    api = make_api(gateway)
+    run(hass, async_get_backoff_store(hass)).async_restore(api)
+    for _ in range(LOGIN_STORM_LIMIT):
+        assert run(hass, api.refresh_token())
+
+    restarted = run(hass, _async_restarted_client(hass, gateway))
+    assert not run(hass, restarted.login())
+    assert _logins(gateway) == LOGIN_STORM_LIMIT
+    assert restarted.backoff_remaining_seconds > 0
+
+
+def test_expired_states_are_pruned(hass):
+    """States whose backoff and login attempts are all over are not written again."""
+    store = BackoffStore(hass)
+    now = time.time()
+    store._states = {
+        "expired": {
+            "backoff_until": now - 1,
+            "consecutive_failures": 2,
+            "login_attempts": [now - LOGIN_STORM_WINDOW - 1],
+        },
+        "banned": {"backoff_until": now + 60, "consecutive_failures": 1, "login_attempts": []},
+        "recent": {"backoff_until": None, "consecutive_failures": 0, "login_attempts": [now - 10]},
+    }
+    assert set(store._data_to_save()) == {"banned", "recent"}
+
+
+def test_login_storm_backs_off(hass, gateway):
+    """LOGIN_STORM_LIMIT logins within the window are allowed; the next one backs off."""
+    api = make_api(gateway)
+    for _ in range(LOGIN_STORM_LIMIT):
+        assert run(hass, api.refresh_token())
+    assert not run(hass, api.refresh_token())
+    assert _logins(gateway) == LOGIN_STORM_LIMIT
+    assert api.backoff_remaining_seconds > 0
+    assert api.connection_status == api.STATUS_BACKOFF
+
+
+def test_logins_outside_the_window_do_not_count(hass, gateway):
+    """Logins older than LOGIN_STORM_WINDOW are forgotten."""
+    api = make_api(gateway)
+    old = datetime.now() - timedelta(seconds=LOGIN_STORM_WINDOW + 1)
+    api._login_attempts = [old] * LOGIN_STORM_LIMIT
+    assert run(hass, api.login())
+    assert len(api._login_attempts) == 1
+
+
+def test_normal_cadence_stays_under_the_limit(hass, gateway):
+    """Token refresh, a forced re-login, a token error and three reloads fit in one window."""
+    api = make_api(gateway)
+    # 1 token refresh + 1 forced re-login + 1 re-login on a token error + 3 reloads x 2
+    for _ in range(9):
+        assert run(hass, api.refresh_token())
+    assert api.backoff_remaining_seconds == 0
@@ -0,0 +1,35 @@
+"""Binary sensors: device classes from the catalog."""
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+
+from custom_components.ajax.binary_sensor import ConneeAlarmBinarySensor
+from custom_components.ajax.const import DEVICE_TYPE_MAP
+
+from .common import make_api, make_coordinator, make_entry
+
+
+def _entity(coordinator, device_type: str) -> ConneeAlarmBinarySensor:
+    """Return the binary sensor of a device of the given type."""
+    return ConneeAlarmBinarySensor(
+        coordinator, {"id": "0000ABCD", "type": device_type, "deviceName": None}
+    )
+
+
+def test_every_catalog_type_builds(hass, gateway):
+    """Every binary_sensor type of the catalog has a valid (or no) device class."""
+    coordinator = make_coordinator(hass, make_entry(hass), make_api(gateway))
+    for device_type, platform in DEVICE_TYPE_MAP.items():
+        if platform == "binary_sensor":
+            _entity(coordinator, device_type)
+
+
+def test_dual_curtain_outdoor_phod_is_motion(hass, gateway):
+    """DualCurtainOutdoorPhod is a motion sensor, like the other DualCurtain models."""
+    coordinator = make_coordinator(hass, make_entry(hass), make_api(gateway))
+    entity = _entity(coordinator, "DualCurtainOutdoorPhod")
+    assert entity.device_class == BinarySensorDeviceClass.MOTION
+
+
+def test_button_has_no_device_class(hass, gateway):
+    """Buttons are mapped to "none": the entity has no device class."""
+    coordinator = make_coordinator(hass, make_entry(hass), make_api(gateway))
+    assert _entity(coordinator, "Button").device_class is None
@@ -0,0 +1,138 @@
+"""Coordinator: last good values served after failed calls, enrolment changes."""
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from benchmarks.conftest import HUB_ID, make_hub
+from custom_components.ajax.alarm_control_panel import ConneeAlarmControlPanel
+from custom_components.ajax.binary_sensor import ConneeAlarmBinarySensor
+from custom_components.ajax.const import CONF_STALE_LIMIT, DOMAIN, SIGNAL_NEW_DEVICES
+
+from .common import error, make_api, make_coordinator, make_entry, run
+
+STALE_LIMIT = 60
+POLL_ACTIONS = ("get-hub", "get-hub-devices", "get-all-device-states")
+
+
+@pytest.fixture
+def coordinator(hass, gateway):
+    """Coordinator of the synthetic hub after a first (good) poll."""
+    entry = make_entry(hass, {CONF_STALE_LIMIT: STALE_LIMIT})
+    coordinator = make_coordinator(hass, entry, make_api(gateway))
+    run(hass, coordinator.async_refresh())
+    assert coordinator.last_update_success
+    return coordinator
+
+
+def _fail_next_poll(gateway) -> None:
+    """Make every call of the next poll fail."""
+    for action in POLL_ACTIONS:
+        gateway.script(action, error("unavailable"))
+
+
+def _age_last_good(coordinator, seconds: float) -> None:
+    """Move the last good values `seconds` back in time."""
+    for key, (fetched_at, value) in coordinator._last_good.items():
+        coordinator._last_good[key] = (fetched_at - timedelta(seconds=seconds), value)
+
+
+def _entities(coordinator):
+    """Return a device entity and the alarm panel of the hub."""
+    device = coordinator.devices[0]
+    return ConneeAlarmBinarySensor(coordinator, device), ConneeAlarmControlPanel(
+        coordinator, coordinator.api, HUB_ID
+    )
+
+
+def test_failed_poll_serves_last_good_values(hass, gateway, coordinator):
+    """Within the limit a failed poll keeps the data and marks the entities stale."""
+    sensor, panel = _entities(coordinator)
+    assert "stale_since" not in sensor.extra_state_attributes
+    assert panel.extra_state_attributes == {}
+
+    _fail_next_poll(gateway)
+    run(hass, coordinator.async_refresh())
+    assert coordinator.last_update_success
+    assert set(coordinator.stale) == {"hub_state", "devices", "device_states"}
+    assert coordinator.data["hub_state"]["name"] == "Bench Hub"
+    assert len(coordinator.devices) == 10
+    assert sensor.extra_state_attributes["stale_since"]
+    assert panel.extra_state_attributes["stale_since"]
+
+    run(hass, coordinator.async_refresh())
+    assert coordinator.stale == {}
+    assert "stale_since" not in sensor.extra_state_attributes
+    assert panel.extra_state_attributes == {}
+
+
+def test_stale_since_is_the_oldest_endpoint(hass, gateway, coordinator):
+    """An entity fed by several stale endpoints reports the oldest fetch."""
+    _age_last_good(coordinator, 10)
+    oldest = coordinator._last_good["devices"][0]
+    gateway.script("get-hub-devices", error("unavailable"))
+    gateway.script("get-all-device-states", error("unavailable"))
+    run(hass, coordinator.async_refresh())
+    sensor, panel = _entities(coordinator)
+    assert sensor.extra_state_attributes["stale_since"] == oldest.isoformat()
+    assert panel.extra_state_attributes == {}
+
+
+def test_values_older_than_the_limit_fail_the_update(hass, gateway, coordinator):
+    """Past CONF_STALE_LIMIT the failed call fails the update instead."""
+    _age_last_good(coordinator, STALE_LIMIT + 1)
+    _fail_next_poll(gateway)
+    run(hass, coordinator.async_refresh())
+    assert not coordinator.last_update_success
+    assert "last good hub_state" in str(coordinator.last_exception)
+
+
+@pytest.fixture
+def synced(hass, coordinator):
+    """Coordinator tracking enrolment changes, with a registry device per hub device."""
+    registry = dr.async_get(hass)
+    for device_id in coordinator.state_store.ids:
+        registry.async_get_or_create(
+            config_entry_id=coordinator.config_entry.entry_id, identifiers={(DOMAIN, device_id)}
+        )
+    coordinator.async_sync_devices()
+    coordinator.async_add_listener(coordinator.async_sync_devices)
+    return coordinator
+
+
+def _registered(hass, device_id: str) -> bool:
+    """Return whether the device is in the device registry."""
+    return dr.async_get(hass).async_get_device(identifiers={(DOMAIN, device_id)}) is not None
+
+
+def test_removed_device_leaves_the_registry(hass, gateway, synced):
+    """A device gone from the catalog is detached from the entry (and so deleted)."""
+    hub = make_hub(10)
+    removed, kept = hub["devices"][0]["id"], hub["devices"][1]["id"]
+    gateway.serve({**hub, "devices": hub["devices"][1:], "device_states": hub["device_states"][1:]})
+    run(hass, synced.async_refresh())
+    assert not _registered(hass, removed)
+    assert _registered(hass, kept)
+
+
+def test_empty_catalog_keeps_the_registry(hass, gateway, synced):
+    """An empty catalog (most likely a failed call) removes nothing."""
+    gateway.serve({**make_hub(10), "devices": [], "device_states": []})
+    run(hass, synced.async_refresh())
+    assert all(_registered(hass, device_id) for device_id in synced.state_store.ids)
+
+
+def test_enrolled_device_is_announced(hass, gateway, synced):
+    """A device new in the catalog is sent to the platforms, once."""
+    announced = []
+    async_dispatcher_connect(
+        hass, SIGNAL_NEW_DEVICES.format(synced.config_entry.entry_id), announced.append
+    )
+    hub = make_hub(11)
+    gateway.serve(hub)
+    run(hass, synced.async_refresh())
+    run(hass, synced.async_refresh())
+    run(hass, hass.async_block_till_done())
+    assert [[device["id"] for device in devices] for devices in announced] == [[hub["devices"][10]["id"]]]
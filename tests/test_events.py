@@ -0,0 +1,94 @@
+"""Bus events: hub arm changes and device transitions, fired after each publish."""
+import pytest
+
+from benchmarks.conftest import HUB_ID, make_hub
+from custom_components.ajax.const import DEVICE_CLASS_MAP, EVENT_ARM, EVENT_DEVICE
+
+from .common import make_api, make_coordinator, make_entry, ok, run
+
+
+@pytest.fixture
+def events(hass) -> list:
+    """Return the list the fired arm and device events get appended to."""
+    events = []
+    for event_type in (EVENT_ARM, EVENT_DEVICE):
+        hass.bus.async_listen(event_type, events.append)
+    return events
+
+
+@pytest.fixture
+def coordinator(hass, gateway, events):
+    """Coordinator of the synthetic hub after a first poll."""
+    coordinator = make_coordinator(hass, make_entry(hass), make_api(gateway))
+    run(hass, coordinator.async_refresh())
+    return coordinator
+
+
+def _refresh(hass, coordinator) -> None:
+    """Poll once and let the event listeners run."""
+    run(hass, coordinator.async_refresh())
+    run(hass, hass.async_block_till_done())
+
+
+def _door_index(hub: dict) -> int:
+    """Return the index of the first door contact of the hub."""
+    return next(
+        index for index, device in enumerate(hub["devices"])
+        if DEVICE_CLASS_MAP.get(device["deviceType"]) == "door"
+    )
+
+
+def test_first_publish_fires_nothing(hass, coordinator, events):
+    """The first poll is the baseline, not a series of transitions."""
+    run(hass, hass.async_block_till_done())
+    assert events == []
+
+
+def test_unchanged_poll_fires_nothing(hass, coordinator, events):
+    """A poll with the same states fires no event."""
+    _refresh(hass, coordinator)
+    assert events == []
+
+
+def test_arm_change_fires_an_arm_event(hass, gateway, coordinator, events):
+    """A new arm state fires one arm event with the hub's own timestamp."""
+    hub = make_hub(10)
+    armed = {**hub["hub_state"], "armState": "ARMED", "lastEventTime": "2026-10-19T10:00:00Z"}
+    gateway.serve({**hub, "hub_state": armed})
+    _refresh(hass, coordinator)
+    (event,) = events
+    assert event.event_type == EVENT_ARM
+    assert event.data == {
+        "entry_id": coordinator.config_entry.entry_id,
+        "hub_id": HUB_ID,
+        "old": "DISARMED",
+        "new": "ARMED",
+        "source_ts": "2026-10-19T10:00:00Z",
+    }
+
+
+def test_opened_door_fires_device_events(hass, gateway, coordinator, events):
+    """Opening a door fires its open and alarm transitions, with the device details."""
+    hub = make_hub(10)
+    index = _door_index(hub)
+    device = hub["devices"][index]
+    hub["device_states"][index]["reedClosed"] = False
+    gateway.serve(hub)
+    _refresh(hass, coordinator)
+
+    assert {event.event_type for event in events} == {EVENT_DEVICE}
+    assert {event.data["kind"] for event in events} == {"open", "alarm"}
+    for event in events:
+        assert event.data["device_id"] == device["id"]
+        assert event.data["device_name"] == device["deviceName"]
+        assert event.data["hub_id"] == HUB_ID
+
+
+def test_arm_command_result_fires_the_arm_event(hass, gateway, coordinator, events):
+    """An arm state applied from a command answer fires the event too."""
+    run(hass, coordinator.async_apply_arm_result({"armState": "ARMED"}))
+    run(hass, hass.async_block_till_done())
+    assert [(event.data["old"], event.data["new"]) for event in events] == [("DISARMED", "ARMED")]
+    gateway.script("get-hub", ok({**make_hub(10)["hub_state"], "armState": "ARMED"}))
+    _refresh(hass, coordinator)
+    assert len(events) == 1
@@ -0,0 +1,114 @@
+"""External statistics: hourly rows across unloads and restarts."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from homeassistant.components.recorder import statistics as recorder_statistics
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+from benchmarks.conftest import make_hub
+from custom_components.ajax import external_statistics
+from custom_components.ajax.external_statistics import async_setup_external_statistics
+
+from .common import make_api, make_coordinator, make_entry, run
+
+HOUR = datetime(2025, 1, 1, 10, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def imported(hass, monkeypatch) -> dict:
+    """Recorder stand-in: the last row imported per statistic_id."""
+    rows: dict = {}
+
+    def _async_add_external_statistics(hass, metadata, statistics):
+        for row in statistics:
+            rows[metadata["statistic_id"]] = row
+
+    hass.config.components.add("recorder")
+    monkeypatch.setattr(
+        recorder_statistics, "async_add_external_statistics", _async_add_external_statistics
+    )
+    monkeypatch.setattr(external_statistics, "_hour_start", lambda now: HOUR)
+    return rows
+
+
+def _temperature_hub(temperature: float) -> dict:
+    """Return the synthetic hub with every device reporting one temperature."""
+    hub = make_hub(10)
+    for state in hub["device_states"]:
+        state["temperature"] = temperature
+    return hub
+
+
+async def _async_sample(hass, entry, gateway, *temperatures: float):
+    """Set up statistics on a new coordinator and poll once per temperature."""
+    coordinator = make_coordinator(hass, entry, make_api(gateway))
+    unload = await async_setup_external_statistics(hass, coordinator)
+    for temperature in temperatures:
+        gateway.serve(_temperature_hub(temperature))
+        await coordinator.async_refresh()
+    return unload
+
+
+def _temperature_rows(imported: dict) -> list:
+    """Return the imported temperature rows."""
+    rows = [row for statistic_id, row in imported.items() if ":temperature_" in statistic_id]
+    assert rows
+    return rows
+
+
+def test_reload_within_the_hour_continues_it(hass, gateway, imported):
+    """A reload in the same hour merges the samples from before and after it."""
+    entry = make_entry(hass)
+    unload = run(hass, _async_sample(hass, entry, gateway, 20.0, 22.0))
+    run(hass, unload())
+    for row in _temperature_rows(imported):
+        assert (row["start"], row["mean"], row["min"], row["max"]) == (HOUR, 21.0, 20.0, 22.0)
+
+    unload = run(hass, _async_sample(hass, entry, gateway, 27.0))
+    run(hass, unload())
+    for row in _temperature_rows(imported):
+        assert (row["start"], row["mean"], row["min"], row["max"]) == (HOUR, 23.0, 20.0, 27.0)
+
+
+def test_stop_persists_the_hour(hass, gateway, imported):
+    """Home Assistant stopping imports the partial hour and keeps it for the restart."""
+    entry = make_entry(hass)
+    run(hass, _async_sample(hass, entry, gateway, 18.0))
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    run(hass, hass.async_block_till_done())
+    assert {row["mean"] for row in _temperature_rows(imported)} == {18.0}
+
+    unload = run(hass, _async_sample(hass, entry, gateway, 24.0))
+    run(hass, unload())
+    for row in _temperature_rows(imported):
+        assert (row["mean"], row["min"], row["max"]) == (21.0, 18.0, 24.0)
+
+
+def test_earlier_hour_not_restored(hass, gateway, imported, monkeypatch):
+    """A persisted hour that is over was imported in full: the new hour starts empty."""
+    entry = make_entry(hass)
+    unload = run(hass, _async_sample(hass, entry, gateway, 20.0))
+    run(hass, unload())
+
+    next_hour = HOUR + timedelta(hours=1)
+    monkeypatch.setattr(external_statistics, "_hour_start", lambda now: next_hour)
+    unload = run(hass, _async_sample(hass, entry, gateway, 25.0))
+    run(hass, unload())
+    for row in _temperature_rows(imported):
+        assert (row["start"], row["mean"], row["min"], row["max"]) == (next_hour, 25.0, 25.0, 25.0)
+
+
+def test_hour_change_imports_the_complete_hour(hass, gateway, imported, monkeypatch):
+    """The first sample of a new hour imports the previous one."""
+    coordinator = make_coordinator(hass, make_entry(hass), make_api(gateway))
+    run(hass, async_setup_external_statistics(hass, coordinator))
+    for temperature in (19.0, 21.0):
+        gateway.serve(_temperature_hub(temperature))
+        run(hass, coordinator.async_refresh())
+    assert not imported
+
+    monkeypatch.setattr(external_statistics, "_hour_start", lambda now: HOUR + timedelta(hours=1))
+    run(hass, coordinator.async_refresh())
+    for row in _temperature_rows(imported):
+        assert (row["start"], row["mean"], row["min"], row["max"]) == (HOUR, 20.0, 19.0, 21.0)
@@ -0,0 +1,264 @@
+"""Config entry setup: platforms, cached snapshot, config flow handover."""
+import asyncio
+from datetime import datetime, timedelta
+
+from aiohttp import ClientConnectionError
+import pytest
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE, Platform
+from homeassistant.helpers.storage import Store
+
+from benchmarks.conftest import HUB_ID, make_hub
+import custom_components.ajax as ajax
+from custom_components.ajax import BASE_PLATFORMS
+from custom_components.ajax.const import (
+    DATA_HANDOVER,
+    DEVICE_TYPE_MAP,
+    HANDOVER_TTL,
+    SNAPSHOT_STORAGE_KEY,
+    SNAPSHOT_STORAGE_VERSION,
+)
+
+from .common import DEVICE_ID, async_setup, coordinator_of, make_api, make_entry, ok, run
+
+
+def _sensor_only_hub() -> dict:
+    """Return a synthetic hub whose devices only need the sensor platform."""
+    hub = make_hub(10)
+    keep = [
+        index
+        for index, device in enumerate(hub["devices"])
+        if DEVICE_TYPE_MAP[device["deviceType"]] == "sensor"
+    ]
+    hub["devices"] = [hub["devices"][index] for index in keep]
+    hub["device_states"] = [hub["device_states"][index] for index in keep]
+    return hub
+
+
+def _enroll(hub: dict, device_type: str, state: dict) -> dict:
+    """Return a copy of the hub with one more device."""
+    device_id = "0000FFFF"
+    return {
+        **hub,
+        "devices": [
+            *hub["devices"],
+            {"id": device_id, "deviceName": "New", "deviceType": device_type, "roomId": "room-0"},
+        ],
+        "device_states": [*hub["device_states"], {"deviceId": device_id, "online": True, **state}],
+    }
+
+
+def _forward_after_enrolment(hass, gateway, forwarded, device_type: str, state: dict) -> set:
+    """Set up on a binary-sensor-free hub, enroll a device, return the late-forwarded platforms."""
+    hub = _sensor_only_hub()
+    gateway.serve(hub)
+    entry = make_entry(hass)
+    assert run(hass, async_setup(hass, entry))
+    assert Platform.BINARY_SENSOR not in forwarded[0]
+
+    gateway.serve(_enroll(hub, device_type, state))
+    run(hass, coordinator_of(hass, entry).async_refresh())
+    run(hass, hass.async_block_till_done())
+    return set().union(*forwarded[1:])
+
+
+def test_new_device_kind_forwards_its_platform(hass, gateway, forwarded):
+    """A door contact enrolled after setup gets the binary_sensor platform."""
+    late = _forward_after_enrolment(hass, gateway, forwarded, "DoorProtect", {"reedClosed": True})
+    assert late == {Platform.BINARY_SENSOR}
+
+
+def test_new_unknown_contact_forwards_binary_sensor(hass, gateway, forwarded):
+    """An unknown type reporting a contact state gets binary_sensor, as at setup."""
+    late = _forward_after_enrolment(hass, gateway, forwarded, "FutureContact", {"reedClosed": False})
+    assert late == {Platform.BINARY_SENSOR}
+
+
+def test_known_platforms_not_forwarded_again(hass, gateway, forwarded):
+    """Enrolling a device of a kind already set up forwards nothing."""
+    late = _forward_after_enrolment(hass, gateway, forwarded, "LifeQuality", {"temperature": 21.0})
+    assert not late
+    assert forwarded[0] >= BASE_PLATFORMS
+
+
+async def _async_handover(hass, gateway, age: float = 0):
+    """Leave a config flow handover (logged-in client, hubs, first snapshot) for setup."""
+    api = make_api(gateway)
+    assert await api.login()
+    hass.data.setdefault(DATA_HANDOVER, {})[DEVICE_ID] = {
+        "api": api,
+        "hub_id": HUB_ID,
+        "hubs": await api.get_hubs(),
+        "snapshot": {
+            "hub_state": await api.get_hub_state(HUB_ID),
+            "devices": await api.get_hub_devices(HUB_ID),
+            "device_states": await api.get_device_states(HUB_ID),
+        },
+        "logged_in_at": datetime.now(),
+        "created_at": datetime.now() - timedelta(seconds=age),
+    }
+    gateway.requests.clear()
+    return api
+
+
+def test_handover_seeds_setup(hass, gateway, forwarded):
+    """A fresh handover is consumed: setup reuses its client and data, with no gateway call."""
+    api = run(hass, _async_handover(hass, gateway))
+    entry = make_entry(hass)
+    assert run(hass, async_setup(hass, entry))
+    coordinator = coordinator_of(hass, entry)
+    assert coordinator.api is api
+    assert len(coordinator.devices) == 10
+    assert gateway.actions() == []
+    assert not hass.data[DATA_HANDOVER]
+
+
+def test_expired_handover_is_dropped(hass, gateway, forwarded):
+    """A handover older than HANDOVER_TTL is discarded and setup logs in itself."""
+    api = run(hass, _async_handover(hass, gateway, age=HANDOVER_TTL + 1))
+    entry = make_entry(hass)
+    assert run(hass, async_setup(hass, entry))
+    assert coordinator_of(hass, entry).api is not api
+    assert "login" in gateway.actions()
+    assert not hass.data[DATA_HANDOVER]
+
+
+def test_failed_setup_drops_the_handover(hass, gateway, forwarded, monkeypatch):
+    """A setup failing early does not leave the live client behind in hass.data."""
+    run(hass, _async_handover(hass, gateway))
+
+    def _async_get_scheduler(hass):
+        raise RuntimeError("scheduler unavailable")
+
+    monkeypatch.setattr(ajax, "async_get_scheduler", _async_get_scheduler)
+    with pytest.raises(RuntimeError):
+        run(hass, async_setup(hass, make_entry(hass)))
+    assert not hass.data[DATA_HANDOVER]
+
+
+def test_handover_without_snapshot_reuses_the_session(hass, gateway, forwarded):
+    """Without a first snapshot, setup polls once but neither logs in nor lists hubs."""
+    run(hass, _async_handover(hass, gateway))
+    hass.data[DATA_HANDOVER][DEVICE_ID]["snapshot"] = None
+    entry = make_entry(hass)
+    assert run(hass, async_setup(hass, entry))
+    assert gateway.actions() == ["get-hub", "get-hub-devices", "get-all-device-states"]
+    assert len(coordinator_of(hass, entry).devices) == 10
+
+
+def test_handover_login_counts_as_the_periodic_relogin(hass, gateway, forwarded):
+    """The next poll after a seeded setup does not log in again."""
+    run(hass, _async_handover(hass, gateway))
+    entry = make_entry(hass)
+    assert run(hass, async_setup(hass, entry))
+    run(hass, coordinator_of(hass, entry).async_refresh())
+    assert "login" not in gateway.actions()
+
+
+def test_handover_snapshot_is_persisted(hass, gateway, forwarded):
+    """The seeded data is written as the startup snapshot of the next restart."""
+    run(hass, _async_handover(hass, gateway))
+    entry = make_entry(hass)
+    assert run(hass, async_setup(hass, entry))
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    run(hass, hass.async_block_till_done())
+
+    store = Store(hass, SNAPSHOT_STORAGE_VERSION, SNAPSHOT_STORAGE_KEY.format(entry.entry_id))
+    snapshot = run(hass, store.async_load())
+    assert snapshot["hub_id"] == HUB_ID
+    assert len(snapshot["data"]["devices"]) == 10
+
+
+def _save_snapshot(hass, entry, hub: dict, hub_id: str = HUB_ID) -> None:
+    """Persist a snapshot of the hub, as the coordinator writes it after a good poll."""
+    store = Store(hass, SNAPSHOT_STORAGE_VERSION, SNAPSHOT_STORAGE_KEY.format(entry.entry_id))
+    snapshot = {
+        "hub_id": hub_id,
+        "saved_at": datetime.now().isoformat(),
+        "hubs": [{"id": hub_id, "name": "Bench Hub"}],
+        "data": {
+            "hub_state": hub["hub_state"],
+            "devices": hub["devices"],
+            "device_states": {state["deviceId"]: state for state in hub["device_states"]},
+        },
+    }
+    run(hass, store.async_save(snapshot))
+
+
+def _take_down(gateway, monkeypatch) -> None:
+    """Make the gateway unreachable."""
+
+    def _unreachable(*args, **kwargs):
+        raise ClientConnectionError("unreachable")
+
+    monkeypatch.setattr(gateway, "request", _unreachable)
+
+
+def _wait_for_background_refresh(hass) -> None:
+    """Run until the first refresh started by the setup has ended."""
+    run(hass, hass.async_block_till_done(wait_background_tasks=True))
+
+
+class GatedResponse:
+    """Gateway answer held back until the test releases it."""
+
+    def __init__(self, reply, gate: asyncio.Event):
+        self._reply = reply
+        self._gate = gate
+
+    async def __aenter__(self):
+        await self._gate.wait()
+        return await self._reply.__aenter__()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_cached_snapshot_sets_up_without_the_gateway(hass, gateway, forwarded, monkeypatch):
+    """With a snapshot, entities are set up from it while the gateway is unreachable."""
+    entry = make_entry(hass)
+    _save_snapshot(hass, entry, make_hub(10))
+    _take_down(gateway, monkeypatch)
+
+    assert run(hass, async_setup(hass, entry))
+    assert Platform.SENSOR in forwarded[0]
+
+    # The first refresh fails: the snapshot keeps being served, marked stale
+    _wait_for_background_refresh(hass)
+    coordinator = coordinator_of(hass, entry)
+    assert coordinator.last_update_success
+    assert set(coordinator.stale) == {"hub_state", "devices", "device_states"}
+    assert len(coordinator.devices) == 10
+    assert coordinator.data["hub_state"]["name"] == "Bench Hub"
+
+
+def test_first_refresh_runs_after_setup(hass, gateway, forwarded):
+    """Setup returns with the cached data; the live refresh replaces it in the background."""
+    entry = make_entry(hass)
+    _save_snapshot(hass, entry, make_hub(10))
+    hub = make_hub(10)
+    gateway.serve({**hub, "hub_state": {**hub["hub_state"], "armState": "ARMED"}})
+    gate = asyncio.Event()
+    gateway.script("login", GatedResponse(ok({"sessionToken": "token", "userId": "user"}), gate))
+
+    assert run(hass, async_setup(hass, entry))
+    coordinator = coordinator_of(hass, entry)
+    assert coordinator.from_cache
+    assert coordinator.data["hub_state"]["armState"] == "DISARMED"
+
+    gate.set()
+    _wait_for_background_refresh(hass)
+    assert not coordinator.from_cache
+    assert coordinator.data["hub_state"]["armState"] == "ARMED"
+
+
+def test_snapshot_of_another_hub_is_ignored(hass, gateway, forwarded):
+    """A snapshot of another hub is not served: setup polls the gateway first."""
+    entry = make_entry(hass)
+    _save_snapshot(hass, entry, make_hub(10), hub_id="0000AAAA")
+
+    assert run(hass, async_setup(hass, entry))
+    coordinator = coordinator_of(hass, entry)
+    assert not coordinator.from_cache
+    assert coordinator.snapshot_saved_at is None
+    assert "get-hub" in gateway.actions()
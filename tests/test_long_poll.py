@@ -0,0 +1,131 @@
+"""Long-poll mode: request, loop, fallback to fixed polling and stop."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from benchmarks.conftest import HUB_ID
+from custom_components.ajax import coordinator as coordinator_module
+from custom_components.ajax.const import (
+    DEFAULT_SCAN_INTERVAL,
+    LONG_POLL_MAX_FAILURES,
+    LONG_POLL_SCAN_INTERVAL,
+    LONG_POLL_TIMEOUT,
+)
+
+from .common import error, make_api, make_coordinator, make_entry, ok, run
+
+LONG_POLL = "get-all-device-states"
+
+
+class HangingResponse:
+    """Long-poll the gateway never answers."""
+
+    async def __aenter__(self):
+        await asyncio.Event().wait()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def no_long_poll_delays(monkeypatch):
+    """Retries, resumes and back-to-back long-polls do not wait."""
+    monkeypatch.setattr(coordinator_module, "LONG_POLL_RETRY_DELAY", 0)
+    monkeypatch.setattr(coordinator_module, "LONG_POLL_RESUME_DELAY", 0)
+    monkeypatch.setattr(coordinator_module, "LONG_POLL_MIN_CYCLE", 0)
+
+
+@pytest.fixture
+def coordinator(hass, gateway):
+    """Coordinator of the synthetic hub after a first poll."""
+    coordinator = make_coordinator(hass, make_entry(hass), make_api(gateway))
+    run(hass, coordinator.async_refresh())
+    gateway.requests.clear()
+    return coordinator
+
+
+def _long_polls(gateway) -> list[dict]:
+    """Return the bodies of the long-polls sent so far."""
+    return [body for action, body in gateway.requests if action == LONG_POLL and "cursor" in body]
+
+
+def _wait_for_loop(hass):
+    """Run until the long-poll loop (a background task) has ended."""
+    run(hass, hass.async_block_till_done(wait_background_tasks=True))
+
+
+def test_long_poll_is_the_state_read_with_a_cursor(hass, gateway, coordinator):
+    """The long-poll body is the get_device_states body plus waitSeconds and cursor."""
+    api = coordinator.api
+    run(hass, api.get_device_states(HUB_ID, ("online",)))
+    gateway.script(LONG_POLL, ok({"cursor": "c1", "changed": False}))
+    run(hass, api.wait_device_states(HUB_ID, "c0", ("online",)))
+    (_, plain), (_, long_poll) = gateway.requests
+    assert long_poll == {**plain, "waitSeconds": LONG_POLL_TIMEOUT, "cursor": "c0"}
+    assert long_poll["email"] == "test@example.com"
+
+
+def test_loop_chains_cursors_and_falls_back_without_one(hass, gateway, coordinator):
+    """States are published as they arrive; a plain state list ends the loop."""
+    device_id = coordinator.state_store.ids[0]
+    gateway.script(
+        LONG_POLL,
+        ok({"cursor": "c1", "changed": True, "states": [{"deviceId": device_id, "online": False}]}),
+        ok({"cursor": "c2", "changed": False}),
+    )
+    active_at_publish = []
+    coordinator.async_add_listener(lambda: active_at_publish.append(coordinator.long_poll_active))
+
+    coordinator.async_start_long_poll()
+    _wait_for_loop(hass)
+
+    assert [body["cursor"] for body in _long_polls(gateway)] == [None, "c1", "c2"]
+    # c1 published its states, c2 had none, the plain list (no cursor) published the full states
+    assert active_at_publish == [False, True]
+    assert not coordinator.long_poll_active
+    assert coordinator.update_interval == timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+    assert coordinator._long_poll_task is None
+
+
+def test_active_long_poll_slows_fixed_polling(hass, gateway, coordinator):
+    """While long-polls succeed, fixed polling runs at the long-poll cadence."""
+    gateway.script(LONG_POLL, ok({"cursor": "c1", "changed": False}), HangingResponse())
+    coordinator.async_start_long_poll()
+    run(hass, asyncio.sleep(0.05))
+    assert coordinator.long_poll_active
+    assert coordinator.update_interval == timedelta(seconds=LONG_POLL_SCAN_INTERVAL)
+
+    coordinator.async_stop_long_poll()
+    run(hass, asyncio.sleep(0))
+    assert not coordinator.long_poll_active
+    assert coordinator.update_interval == timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+    assert coordinator._long_poll_task is None
+
+
+def test_failures_fall_back_then_resume(hass, gateway, coordinator):
+    """Repeated failures switch to fixed polling, and long-polling is tried again later."""
+    gateway.script(LONG_POLL, *[error("unavailable")] * LONG_POLL_MAX_FAILURES)
+    gateway.script(LONG_POLL, HangingResponse())
+
+    coordinator.async_start_long_poll()
+    run(hass, asyncio.sleep(0.05))
+    assert len(_long_polls(gateway)) == LONG_POLL_MAX_FAILURES + 1
+    assert coordinator._long_poll_task is not None
+    coordinator.async_stop_long_poll()
+
+
+def test_stop_cancels_a_pending_resume(hass, gateway, coordinator, monkeypatch):
+    """Unloading during the fixed-polling period leaves no long-poll behind."""
+    monkeypatch.setattr(coordinator_module, "LONG_POLL_RESUME_DELAY", 3600)
+    gateway.script(LONG_POLL, *[error("unavailable")] * LONG_POLL_MAX_FAILURES)
+
+    coordinator.async_start_long_poll()
+    _wait_for_loop(hass)
+    assert coordinator._long_poll_resume is not None
+    assert not coordinator.long_poll_active
+
+    coordinator.async_stop_long_poll()
+    assert coordinator._long_poll_resume is None
+    assert coordinator._long_poll_task is None
+    assert len(_long_polls(gateway)) == LONG_POLL_MAX_FAILURES
@@ -0,0 +1,89 @@
+"""Metadata coordinator: seeded from the data coordinator, polled on its own cadence."""
+import pytest
+
+from benchmarks.conftest import make_hub
+from custom_components.ajax.const import METADATA_STATE_FIELDS
+from custom_components.ajax.metadata import ConneeAlarmMetadataCoordinator
+
+from .common import error, make_api, make_coordinator, make_entry, run
+
+STATES = "get-all-device-states"
+
+
+@pytest.fixture
+def coordinator(hass, gateway):
+    """Data coordinator of the synthetic hub after a first poll."""
+    coordinator = make_coordinator(hass, make_entry(hass), make_api(gateway))
+    run(hass, coordinator.async_refresh())
+    gateway.requests.clear()
+    return coordinator
+
+
+@pytest.fixture
+def metadata(coordinator):
+    """Metadata coordinator seeded at setup."""
+    metadata = ConneeAlarmMetadataCoordinator(coordinator.hass, coordinator)
+    metadata.async_seed()
+    return metadata
+
+
+def _firmware(hub: dict, device_id: str) -> str:
+    """Return the firmware version the gateway serves for a device."""
+    return next(s for s in hub["device_states"] if s["deviceId"] == device_id)["firmwareVersion"]
+
+
+def test_seed_makes_no_gateway_call(gateway, coordinator, metadata):
+    """Seeding reads the data coordinator: hub and device firmware, no request."""
+    hub = make_hub(10)
+    device_id = hub["devices"][0]["id"]
+    assert gateway.actions() == []
+    assert metadata.data["hub"]["installed"] == "2.30.1"
+    assert metadata.data["hub"]["attributes"] == {"model": "Hub 2 Plus"}
+    assert metadata.data["devices"][device_id]["installed"] == _firmware(hub, device_id)
+
+
+def test_data_polls_do_not_notify_metadata_listeners(hass, coordinator, metadata):
+    """Update entities are not written on every data poll."""
+    calls = []
+    metadata.async_add_listener(lambda: calls.append(None))
+    run(hass, coordinator.async_refresh())
+    assert calls == []
+
+
+def test_poll_reads_the_firmware_projection(hass, gateway, metadata):
+    """The metadata poll reads the hub and the firmware fields of the states."""
+    hub = make_hub(10)
+    hub["hub_state"] = {**hub["hub_state"], "firmware": {"version": "2.30.1", "latestAvailableVersion": "2.31.0"}}
+    gateway.serve(hub)
+    run(hass, metadata.async_refresh())
+    assert gateway.actions() == ["get-hub", STATES]
+    assert tuple(gateway.requests[1][1]["fields"]) == METADATA_STATE_FIELDS
+    assert metadata.data["hub"]["latest"] == "2.31.0"
+
+
+def test_failed_poll_falls_back_to_the_data_coordinator(hass, gateway, metadata):
+    """A failed metadata poll keeps the firmware of the last full state fetch."""
+    gateway.script(STATES, error("unavailable"))
+    run(hass, metadata.async_refresh())
+    assert metadata.last_update_success
+    assert metadata.data["hub"]["installed"] == "2.30.1"
+
+
+def test_failed_poll_without_data_fails(hass, gateway, coordinator):
+    """With nothing to fall back to, a failed metadata poll fails the update."""
+    coordinator.data = None
+    metadata = ConneeAlarmMetadataCoordinator(hass, coordinator)
+    gateway.script("get-hub", error("unavailable"))
+    run(hass, metadata.async_refresh())
+    assert not metadata.last_update_success
+
+
+def test_enrolled_devices_are_added(hass, gateway, coordinator, metadata):
+    """Devices enrolled after setup get their metadata from the data coordinator."""
+    hub = make_hub(11)
+    gateway.serve(hub)
+    run(hass, coordinator.async_refresh())
+    new = hub["devices"][10]
+    metadata.async_add_devices([coordinator.state_store.device(coordinator.state_store.index[new["id"]])])
+    assert metadata.data["devices"][new["id"]]["installed"] == _firmware(hub, new["id"])
+    assert len(metadata.data["devices"]) == 11
@@ -0,0 +1,122 @@
+"""Payload decoding at the API boundary: shape variants and malformed payloads."""
+import pytest
+
+from benchmarks.conftest import HUB_ID
+from custom_components.ajax.models import (
+    PayloadError,
+    battery_level,
+    decode_device_states,
+    decode_devices,
+    decode_hub_state,
+    decode_hubs,
+    decode_session,
+    decode_state_changes,
+)
+
+from .common import make_api, ok, run
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"sessionToken": "t", "userId": "u"},
+        {"token": "t", "user_id": "u"},
+        {"session": {"token": "t"}, "user": {"id": "u"}},
+    ],
+)
+def test_session_shapes(payload):
+    """Every login shape gives the same session."""
+    session = decode_session(payload)
+    assert (session.token, session.user_id) == ("t", "u")
+
+
+@pytest.mark.parametrize("payload", [None, [], {"userId": "u"}, {"session": "t"}])
+def test_session_without_token_is_rejected(payload):
+    """A login answer without a token is an error, not an anonymous session."""
+    with pytest.raises(PayloadError):
+        decode_session(payload)
+
+
+def test_hubs_are_normalized():
+    """Hub ids are cleaned and win over the raw keys; hubs without one are dropped."""
+    hubs = decode_hubs({"hubs": [{"hubId": " 0000BE4C ", "id": "raw", "hubName": "Casa"}, {"name": "x"}]})
+    assert hubs == [{"id": "0000BE4C", "hubId": "0000BE4C", "name": "Casa", "hubName": "Casa"}]
+    assert decode_hubs([{"id": "0000BE4C"}])[0]["name"] == "Hub 0000BE4C"
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        [{"id": "00A1", "deviceType": "DoorProtect", "name": "Porta"}],
+        {"devices": [{"deviceId": "00A1", "type": "DoorProtect", "label": "Porta"}]},
+        {"data": [{"device": {"id": "00A1", "type": "DoorProtect", "name": "Porta"}}]},
+    ],
+)
+def test_device_shapes(payload):
+    """Every catalog shape gives the canonical id, type and name."""
+    (device,) = decode_devices(payload)
+    assert (device["id"], device["type"], device["deviceName"]) == ("00A1", "DoorProtect", "Porta")
+
+
+def test_devices_without_id_are_dropped():
+    """Devices with a missing or blank id are skipped; a missing name stays None."""
+    devices = decode_devices([{"type": "DoorProtect"}, {"id": "  "}, {"id": 161, "type": "Hub"}])
+    assert devices == [{"id": "161", "type": "Hub", "deviceName": None}]
+
+
+def test_envelope_prefers_the_non_empty_key():
+    """With both keys present, the non-empty list is read."""
+    assert len(decode_devices({"devices": [], "data": [{"id": "00A1"}]})) == 1
+
+
+def test_device_state_shapes():
+    """States are keyed by deviceId whatever id field they carry."""
+    states = decode_device_states(
+        [{"deviceId": "00A1"}, {"id": "00A2"}, {"device": {"deviceId": "00A3"}}, {"online": True}]
+    )
+    assert [state["deviceId"] for state in states] == ["00A1", "00A2", "00A3"]
+
+
+@pytest.mark.parametrize(
+    ("decode", "payload"),
+    [
+        # Error or unknown envelopes are not empty lists
+        (decode_devices, {"error": "forbidden"}),
+        (decode_hubs, {"message": "ok"}),
+        (decode_device_states, {"states": []}),
+        # Wrong container or item types
+        (decode_devices, {"devices": {"id": "00A1"}}),
+        (decode_devices, "00A1"),
+        (decode_device_states, [{"deviceId": "00A1"}, "00A2"]),
+        (decode_hub_state, ["ARMED"]),
+    ],
+)
+def test_malformed_payloads_are_rejected(decode, payload):
+    """Malformed payloads raise PayloadError instead of decoding to nothing."""
+    with pytest.raises(PayloadError):
+        decode(payload)
+
+
+def test_state_changes():
+    """Long-poll answers give (cursor, states), None states when nothing changed."""
+    cursor, states = decode_state_changes({"cursor": "c1", "states": [{"deviceId": "00A1"}]})
+    assert cursor == "c1" and [state["deviceId"] for state in states] == ["00A1"]
+    assert decode_state_changes({"cursor": "c2", "changed": False}) == ("c2", None)
+    assert decode_state_changes([{"deviceId": "00A1"}])[0] is None
+    with pytest.raises(PayloadError):
+        decode_state_changes({"cursor": " ", "changed": True})
+
+
+def test_battery_level_fields():
+    """The battery level is read from the first field that carries a number."""
+    assert battery_level({"batteryChargeLevelPercentage": "n/a", "battery": {"charge": 80}}) == 80
+    assert battery_level({"online": True}) is None
+
+
+def test_malformed_catalog_fails_the_call(hass, gateway):
+    """A rejected payload surfaces as a failed gateway call."""
+    api = make_api(gateway)
+    assert run(hass, api.login())
+    gateway.script("get-hub-devices", ok({"items": [{"id": "00A1"}]}))
+    with pytest.raises(PayloadError):
+        run(hass, api.get_hub_devices(HUB_ID))
@@ -0,0 +1,113 @@
+"""Device state store: updates, counts, compact view and the state dict cache."""
+import pytest
+
+from custom_components.ajax.store import DeviceStateStore
+
+
+def _device(device_id: str, device_type: str = "DoorProtect", name: str | None = None) -> dict:
+    """Return a decoded catalog payload."""
+    return {"id": device_id, "type": device_type, "deviceName": name, "roomId": "room-1"}
+
+
+@pytest.fixture
+def store() -> DeviceStateStore:
+    """Store with a hub and three devices, all with a full first state."""
+    store = DeviceStateStore()
+    store.set_devices([
+        _device("HUB", "Hub"),
+        _device("A", name="Front door"),
+        _device("B", "MotionProtect"),
+        _device("C", "LeaksProtect"),
+    ])
+    store.apply_states([
+        {"deviceId": "HUB", "online": False, "tampered": True},
+        {"deviceId": "A", "online": True, "reedClosed": True, "signalLevel": "STRONG", "temperature": 21.5},
+        {"deviceId": "B", "online": True, "state": "PASSIVE", "batteryChargeLevelPercentage": 80},
+        {"deviceId": "C", "online": False, "leakDetected": False},
+    ])
+    store.pop_events()
+    return store
+
+
+def test_merge_keeps_fields_of_the_full_payload(store):
+    """Projected states are laid over the last full ones."""
+    store.apply_states([{"deviceId": "A", "reedClosed": False}], merge=True)
+    assert store.state("A") == {
+        "deviceId": "A", "online": True, "reedClosed": False, "signalLevel": "STRONG", "temperature": 21.5,
+    }
+    assert store.state("B")["batteryChargeLevelPercentage"] == 80
+
+
+def test_replace_drops_missing_states(store):
+    """Without merge the states replace the previous ones; missing devices have none."""
+    store.state("B")
+    store.apply_states([{"deviceId": "A", "reedClosed": False}, {"deviceId": "Z", "online": True}])
+    assert store.state("A") == {"deviceId": "A", "reedClosed": False}
+    assert store.state("B") == {}
+    assert store.state("Z") == {}
+    assert store.online[store.index["B"]] == -1
+    assert set(store.states()) == {"A"}
+
+
+def test_counts_leave_out_the_hub(store):
+    """count_* cover the devices only, hub rows excluded."""
+    assert len(store) == 3
+    assert store.count_offline() == 1
+    assert store.count_ok() == 2
+    assert store.count_alarm() == 0
+    store.apply_states([{"deviceId": "B", "state": "ALARM"}, {"deviceId": "HUB", "online": True}], merge=True)
+    assert store.count_alarm() == 1
+    assert store.count_ok() == 1
+    assert store.labels(store.alarm, 1) == ["B"]
+
+
+def test_compact_view(store):
+    """compact() reads the hot columns, with the catalog fallbacks."""
+    assert store.compact(store.index["A"]) == {
+        "id": "A",
+        "name": "Front door",
+        "type": "DoorProtect",
+        "online": True,
+        "battery": None,
+        "temperature": 21.5,
+        "open": False,
+        "alarm": False,
+    }
+    compact = store.compact(store.index["B"])
+    assert (compact["name"], compact["battery"], compact["temperature"], compact["open"]) == (
+        "MotionProtect", 80, None, None,
+    )
+
+
+def test_transitions_become_events(store):
+    """A changed hot cell records one device event; unknown values record none."""
+    store.apply_states([{"deviceId": "A", "reedClosed": False}, {"deviceId": "C", "online": True}], merge=True)
+    events = {(event["device_id"], event["kind"]): (event["old"], event["new"]) for event in store.pop_events()}
+    assert events == {
+        ("A", "open"): (False, True),
+        ("A", "alarm"): (False, True),
+        ("C", "online"): (False, True),
+    }
+    assert store.pop_events() == []
+
+
+def test_state_dict_cached_until_the_row_changes(store):
+    """state() returns the same dict until an update touches that row."""
+    a, b = store.state("A"), store.state("B")
+    assert store.state("A") is a
+    store.apply_states([{"deviceId": "A", "reedClosed": False}], merge=True)
+    assert store.state("A") is not a
+    assert store.state("A")["reedClosed"] is False
+    assert store.state("B") is b
+
+
+def test_state_cache_follows_catalog_changes(store):
+    """A new catalog keeps the cached states of the devices still enrolled, at their new rows."""
+    b = store.state("B")
+    store.state("C")
+    store.set_devices([_device("HUB", "Hub"), _device("B", "MotionProtect"), _device("D")])
+    assert store.state("B") is b
+    assert store.state("D") == {}
+    assert store.state("C") == {}
+    store.apply_states([{"deviceId": "D", "online": True}], merge=True)
+    assert store.state("D") == {"deviceId": "D", "online": True}
@@ -0,0 +1,114 @@
+"""Device subscriptions: one diff per coordinator update, sent to every subscriber."""
+import pytest
+
+from benchmarks.conftest import make_hub
+from custom_components.ajax import websocket_api
+from custom_components.ajax.const import DOMAIN
+
+from .common import make_api, make_coordinator, make_entry, run
+
+
+class FakeConnection:
+    """Websocket connection recording what is sent to it."""
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.results = []
+        self.errors = []
+        self.events = []
+
+    def send_result(self, msg_id, result=None):
+        self.results.append((msg_id, result))
+
+    def send_error(self, msg_id, code, message):
+        self.errors.append((msg_id, code))
+
+    def send_message(self, message):
+        self.events.append(message["event"])
+
+
+@pytest.fixture
+def coordinator(hass, gateway):
+    """Coordinator of the synthetic hub after a first poll, as setup stores it."""
+    entry = make_entry(hass)
+    coordinator = make_coordinator(hass, entry, make_api(gateway))
+    run(hass, coordinator.async_refresh())
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"coordinator": coordinator}
+    return coordinator
+
+
+def _subscribe(hass, msg_id: int = 1) -> FakeConnection:
+    """Subscribe a new connection to the devices of the first hub."""
+    connection = FakeConnection()
+    websocket_api.websocket_subscribe_devices(
+        hass, connection, {"id": msg_id, "type": f"{DOMAIN}/subscribe_devices"}
+    )
+    return connection
+
+
+def _count_views(monkeypatch) -> list:
+    """Return a list growing by one every time the device view is computed."""
+    calls = []
+    compact_devices = websocket_api._compact_devices
+
+    def _counting(coordinator):
+        calls.append(coordinator)
+        return compact_devices(coordinator)
+
+    monkeypatch.setattr(websocket_api, "_compact_devices", _counting)
+    return calls
+
+
+def _refresh_with_one_device_offline(hass, gateway, coordinator) -> str:
+    """Take the first device offline at the gateway, refresh and return its id."""
+    hub = make_hub(10)
+    hub["device_states"][0]["online"] = not hub["device_states"][0]["online"]
+    gateway.serve(hub)
+    run(hass, coordinator.async_refresh())
+    return hub["device_states"][0]["deviceId"]
+
+
+def test_changes_are_computed_once_for_all_subscribers(hass, gateway, coordinator, monkeypatch):
+    """Two subscribers get the same diff, computed once per update."""
+    views = _count_views(monkeypatch)
+    first, second = _subscribe(hass, 1), _subscribe(hass, 2)
+    assert len(views) == 1
+    assert first.events[0] == second.events[0]
+    assert len(first.events[0]["snapshot"]["devices"]) == 10
+
+    device_id = _refresh_with_one_device_offline(hass, gateway, coordinator)
+    assert len(views) == 2
+    assert first.events[1] is second.events[1]
+    assert [d["id"] for d in first.events[1]["changed"]] == [device_id]
+
+    run(hass, coordinator.async_refresh())
+    assert len(first.events) == len(second.events) == 2
+
+
+def test_late_subscriber_snapshot_matches_the_diffs(hass, gateway, coordinator):
+    """A subscriber joining later starts from the view the diffs are computed against."""
+    first = _subscribe(hass, 1)
+    device_id = _refresh_with_one_device_offline(hass, gateway, coordinator)
+    second = _subscribe(hass, 2)
+    snapshot = {d["id"]: d for d in second.events[0]["snapshot"]["devices"]}
+    assert snapshot[device_id] == first.events[1]["changed"][0]
+
+
+def test_last_unsubscribe_detaches_the_feed(hass, coordinator):
+    """The feed leaves the coordinator when its last subscriber goes."""
+    listeners = len(coordinator._listeners)
+    first, second = _subscribe(hass, 1), _subscribe(hass, 2)
+    assert len(coordinator._listeners) == listeners + 1
+
+    first.subscriptions.pop(1)()
+    assert hass.data[websocket_api.DATA_WS_FEEDS]
+    second.subscriptions.pop(2)()
+    assert not hass.data[websocket_api.DATA_WS_FEEDS]
+    assert len(coordinator._listeners) == listeners
+
+
+def test_unknown_hub_is_an_error(hass):
+    """Without a loaded hub the subscription is refused."""
+    connection = _subscribe(hass)
+    assert connection.errors == [(1, "not_found")]
+    assert connection.subscriptions == {}